@@ -3,6 +3,6 @@ import sqlglot
 
 setattr(sqlglot.exp, "BlendSQLFunction", BlendSQLFunction)
 
-from .blendsql import BlendSQL
+from .blendsql import BlendSQL, PreparedQuery
 from .configure import config, GLOBAL_HISTORY
 from . import pandas_api  # noqa: F401 - registers pd.DataFrame.llmmap accessor
@@ -1,4 +1,7 @@
 import copy
+import contextlib
+import asyncio
+import threading
 import logging
 import time
 import uuid
@@ -9,7 +12,7 @@ from typing import Callable, Type, Generator
 from collections.abc import Collection, Iterable
 from dataclasses import dataclass, field
 import sqlglot
-from functools import partial
+from functools import partial, lru_cache
 from sqlglot import exp
 import string
 from pathlib import Path
@@ -20,12 +23,19 @@ from blendsql.common.utils import (
     get_temp_session_table,
     get_temp_subquery_table,
 )
+from blendsql.common.concurrency import (
+    bind_event_loop,
+    shared_event_loop,
+    run_interleaved,
+)
 from blendsql.common.exceptions import InvalidBlendSQL
 from blendsql.db.database import Database
 from blendsql.db.utils import (
     double_quote_escape,
     select_all_from_table_query,
+    row_index_twin,
     LazyTable,
+    ROW_INDEX_COLUMN,
 )
 from blendsql.parse import (
     get_dialect,
@@ -34,11 +44,13 @@ from blendsql.parse import (
     _parse_one,
     transform,
     check,
-    get_reversed_subqueries,
     get_first_child,
     get_blendsql_func_name,
     get_blendsql_fn_args,
     get_blendsql_fn_kwargs,
+    PLAN_CACHE,
+    PlanCache,
+    QueryPlan,
 )
 from blendsql.parse.cascade_filter import get_qa_cascade_filter, get_map_cascade_filter
 from blendsql.parse.constants import MODIFIERS
@@ -51,6 +63,7 @@ from blendsql.common.typing import (
     StringConcatenation,
 )
 from blendsql.models.model_base import ModelBase
+from blendsql.models.usage import ModelUsage, track_usage
 
 format_blendsql_function = lambda name: "{{" + name + "()}}"
 
@@ -247,7 +260,7 @@ def preprocess_blendsql(
             from inspect import signature
 
             current_ingredient = kitchen.get_from_name(function_name)
-            sig = signature(current_ingredient)
+            sig = signature(current_ingredient._call_impl)
             bound = sig.bind(*function_args, **function_kwargs)
             # Below we track the 'raw' representation, in case we need to pass into
             #   a recursive BlendSQL call later
@@ -324,6 +337,89 @@ def materialize_cte(
     return materialized_smoothie
 
 
+def create_map_session_view(
+    db: Database,
+    tablename: str,
+    viewname: str,
+    side_tables: list[tuple[str | None, list[str], str]],
+    outputs: list[tuple[pl.LazyFrame | None, str]],
+) -> bool:
+    """Writes each `Map` output in `outputs` as a small temp table (its distinct input values + the new column),
+    and (re)creates `viewname` as `tablename` with every side table so far `LEFT JOIN`ed on.
+    So, the base table itself is never copied.
+
+    `side_tables` holds the (side tablename, join columns, new column) of previous outputs,
+    and is extended in place.
+
+    Returns False without writing anything if an output can't be joined back onto `tablename`
+    (e.g. it was keyed on a `__concat__` column), in which case the caller should copy the table instead.
+    """
+
+    def quote(name: str) -> str:
+        return f'"{double_quote_escape(name)}"'
+
+    base_columns = db.execute_to_df(
+        f"SELECT * FROM {quote(tablename)} LIMIT 0", lazy=False
+    ).columns
+    new_side_tables = []
+    for mapped_table, new_col in outputs:
+        join_columns = []
+        if mapped_table is not None:
+            join_columns = [
+                c for c in mapped_table.collect_schema().names() if c != new_col
+            ]
+            if not set(join_columns) <= set(base_columns):
+                return False
+        new_side_tables.append((mapped_table, join_columns, new_col))
+
+    for mapped_table, join_columns, new_col in new_side_tables:
+        side_tablename = None
+        # `None` means the ingredient had no values to map, so the column is all null
+        if mapped_table is not None:
+            side_tablename = f"{viewname}_{len(side_tables)}"
+            db.to_temp_table(df=mapped_table.collect(), tablename=side_tablename)
+        side_tables.append((side_tablename, join_columns, new_col))
+
+    def map_column(col: str, *fallbacks: str) -> str:
+        # Later outputs take precedence, same as when coalescing onto a copy of the table
+        exprs = [
+            f"s{idx}.{quote(col)}"
+            for idx in reversed(range(len(side_tables)))
+            if side_tables[idx][0] is not None and side_tables[idx][2] == col
+        ] + list(fallbacks)
+        if not exprs:
+            return f"NULL AS {quote(col)}"
+        if len(exprs) == 1:
+            return f"{exprs[0]} AS {quote(col)}"
+        return f"COALESCE({', '.join(exprs)}) AS {quote(col)}"
+
+    map_columns = list(dict.fromkeys(col for *_, col in side_tables))
+    select_exprs = [
+        map_column(c, f"b.{quote(c)}") if c in map_columns else f"b.{quote(c)}"
+        for c in base_columns
+    ] + [map_column(c) for c in map_columns if c not in base_columns]
+    joins = [
+        f"LEFT JOIN {quote(side_tablename)} AS s{idx} ON "
+        + " AND ".join(f"b.{quote(c)} = s{idx}.{quote(c)}" for c in join_columns)
+        for idx, (side_tablename, join_columns, _) in enumerate(side_tables)
+        if side_tablename is not None
+    ]
+    db.create_temp_view(
+        viewname,
+        f"SELECT {', '.join(select_exprs)} FROM {quote(tablename)} AS b "
+        + " ".join(joins),
+    )
+    # Views have no `rowid`, so deterministic execution reads from a twin which
+    #   carries the base table's row order along
+    order_source, order_column = db.row_order_source(tablename)
+    db.create_temp_view(
+        row_index_twin(viewname),
+        f"SELECT {', '.join(select_exprs)}, b.{quote(order_column)} AS {quote(ROW_INDEX_COLUMN)} "
+        f"FROM {quote(order_source)} AS b " + " ".join(joins),
+    )
+    return True
+
+
 def get_sorted_blendsql_nodes(
     node: exp.Expression,
     ingredient_alias_to_parsed_dict: dict,
@@ -387,6 +483,56 @@ def get_sorted_blendsql_nodes(
         parse_results = remaining_parse_results
 
 
+def batch_blendsql_nodes(
+    sorted_nodes: Iterable[tuple[exp.Expression, bool]],
+    ingredient_alias_to_parsed_dict: dict,
+    kitchen: Kitchen,
+    batch_maps: bool = True,
+) -> Generator[list[tuple[exp.Expression, bool]], None, None]:
+    """
+    Groups the output of `get_sorted_blendsql_nodes()` into batches of ingredient calls
+        which don't depend on each other, and so can be executed together with `run_interleaved()`.
+
+    This only batches consecutive calls of the same ingredient type, within the subquery being
+        executed. It isn't a dependency graph: independent calls of different types (e.g. a `QA`
+        and a `MAP`), or in different subqueries, still run one batch after another.
+
+    - Consecutive `STRING` or `QA` ingredients are batched together, since their outputs
+        are only substituted into the query after they've all been executed
+    - Consecutive `MAP` ingredients are batched together if `batch_maps`. This should be
+        False when a `MAP` ingredient might pass a cascade filter to the next one
+    - `JOIN` ingredients modify the query as they're executed, so are always run alone
+
+    Args:
+        sorted_nodes: Output of `get_sorted_blendsql_nodes()`
+        ingredient_alias_to_parsed_dict: Mapping from ingredient alias to their parsed representations.
+        kitchen: Contains inventory of ingredients (aka BlendSQL ingredients)
+        batch_maps: Whether `MAP` ingredients can be batched together
+
+    Returns:
+        Generator yielding lists of (node, is_final_map) tuples
+    """
+    batchable_types = {IngredientType.STRING, IngredientType.QA}
+    if batch_maps:
+        batchable_types.add(IngredientType.MAP)
+    batch, batch_type = [], None
+    for function_node, is_final_map in sorted_nodes:
+        ingredient_type = kitchen.get_from_name(
+            ingredient_alias_to_parsed_dict[get_blendsql_func_name(function_node)][
+                "function"
+            ]
+        ).ingredient_type
+        if ingredient_type not in batchable_types:
+            ingredient_type = None
+        if batch and (ingredient_type is None or ingredient_type != batch_type):
+            yield batch
+            batch = []
+        batch.append((function_node, is_final_map))
+        batch_type = ingredient_type
+    if batch:
+        yield batch
+
+
 def disambiguate_and_submit_blend(
     ingredient_alias_to_parsed_dict: dict[str, dict],
     query: str,
@@ -411,35 +557,38 @@ def disambiguate_and_submit_blend(
     return _blend(query=query, **kwargs)
 
 
-def bind_params(sql: str, params: list) -> str:
-    """
-    Replace '?' placeholders with params before SQL parsing.
-    Skips '?' inside single-quoted string literals.
+PARAM_PREFIX = "bsql_p"
+_NAMED_PARAM_RE = re.compile(r":" + PARAM_PREFIX + r"(\d+)\b")
+
+
+def format_param_value(val) -> str:
+    """Format a Python value for safe SQL string interpolation."""
+    if val is None:
+        return "NULL"
+    elif isinstance(val, bool):
+        return "TRUE" if val else "FALSE"
+    elif isinstance(val, (int, float)):
+        return str(val)
+    elif isinstance(val, str):
+        # Escape single quotes
+        escaped = val.replace("'", "''")
+        return f"'{escaped}'"
+    elif isinstance(val, (list, tuple)):
+        formatted = ", ".join(format_param_value(v) for v in val)
+        return f"({formatted})"
+    elif isinstance(val, dict):
+        return f"'{json.dumps(val)}'"
+    else:
+        raise TypeError(f"Unsupported parameter type: {type(val)}")
+
+
+def _replace_placeholders(sql: str, replace_fn: Callable[[int], str]) -> str:
+    """Calls `replace_fn` with the index of each '?' placeholder in `sql`,
+    and substitutes in the result. Skips '?' inside single-quoted string literals.
     """
-
-    def _format_value(val) -> str:
-        """Format a Python value for safe SQL string interpolation."""
-        if val is None:
-            return "NULL"
-        elif isinstance(val, bool):
-            return "TRUE" if val else "FALSE"
-        elif isinstance(val, (int, float)):
-            return str(val)
-        elif isinstance(val, str):
-            # Escape single quotes
-            escaped = val.replace("'", "''")
-            return f"'{escaped}'"
-        elif isinstance(val, (list, tuple)):
-            formatted = ", ".join(_format_value(v) for v in val)
-            return f"({formatted})"
-        elif isinstance(val, dict):
-            return f"'{json.dumps(val)}'"
-        else:
-            raise TypeError(f"Unsupported parameter type: {type(val)}")
-
-    param_iter = iter(params)
     result = []
     i = 0
+    param_idx = 0
 
     while i < len(sql):
         char = sql[i]
@@ -457,13 +606,8 @@ def bind_params(sql: str, params: list) -> str:
 
         # Replace placeholder
         elif char == "?":
-            try:
-                val = next(param_iter)
-            except StopIteration:
-                raise ValueError(
-                    "Not enough parameters provided for '?' placeholders"
-                ) from None
-            result.append(_format_value(val))
+            result.append(replace_fn(param_idx))
+            param_idx += 1
 
         else:
             result.append(char)
@@ -473,6 +617,82 @@ def bind_params(sql: str, params: list) -> str:
     return "".join(result)
 
 
+def bind_params(sql: str, params: list) -> str:
+    """
+    Replace '?' placeholders with params before SQL parsing.
+    Skips '?' inside single-quoted string literals.
+    """
+    param_iter = iter(params)
+
+    def _next_value(_) -> str:
+        try:
+            val = next(param_iter)
+        except StopIteration:
+            raise ValueError(
+                "Not enough parameters provided for '?' placeholders"
+            ) from None
+        return format_param_value(val)
+
+    return _replace_placeholders(sql, _next_value)
+
+
+def name_params(sql: str) -> tuple[str, int]:
+    """
+    Replace '?' placeholders with named placeholders (`:bsql_p0`, `:bsql_p1`, ...),
+    which sqlglot parses as `exp.Placeholder` nodes and the database driver can bind.
+    Returns the rewritten query, along with the number of placeholders found.
+    """
+    num_params = 0
+
+    def _name(idx: int) -> str:
+        nonlocal num_params
+        num_params += 1
+        return f":{PARAM_PREFIX}{idx}"
+
+    return _replace_placeholders(sql, _name), num_params
+
+
+def plan_blendsql(
+    query: str,
+    dialect: sqlglot.Dialect,
+    schema: dict | None,
+    kitchen: Kitchen,
+    ingredients: Collection[Type[Ingredient]],
+    default_model: ModelBase | None = None,
+) -> QueryPlan:
+    """Runs all the sqlglot work needed before execution - parsing, column qualification,
+    ingredient aliasing and autowrapping - and returns the result as a reusable `QueryPlan`.
+    """
+    query_context = QueryContextManager(dialect)
+    query_context.parse(query, schema=schema)
+    # Replace ingredient calls with short aliases (e.g. '{{A()}}'),
+    (
+        query,
+        ingredient_alias_to_parsed_dict,
+        kitchen,
+        ingredients,
+    ) = preprocess_blendsql(
+        node=query_context.node,
+        dialect=dialect,
+        kitchen=kitchen,
+        ingredients=ingredients,
+        default_model=default_model,
+    )
+    query = autowrap_query(
+        query=query,
+        kitchen=kitchen,
+        ingredient_alias_to_parsed_dict=ingredient_alias_to_parsed_dict,
+    )
+    # Parse to our QueryContextManager object
+    query_context.parse(query)
+    return QueryPlan.from_node(
+        node=query_context.node,
+        query=query,
+        ingredient_alias_to_parsed_dict=ingredient_alias_to_parsed_dict,
+        default_model=default_model,
+    )
+
+
 def _blend(
     query: str,
     db: Database,
@@ -485,7 +705,9 @@ def _blend(
     enable_early_exit: bool = True,
     enable_constrained_decoding: bool = True,
     enable_early_deduplication: bool = True,
+    enable_map_side_tables: bool = False,
     table_to_title: dict[str, str] | None = None,
+    plan_cache: PlanCache = PLAN_CACHE,
     _prev_passed_values: int = 0,
 ) -> Smoothie:
     """Invoked from blend(), this contains the recursive logic to execute
@@ -498,38 +720,38 @@ def _blend(
 
     original_query = copy.deepcopy(query)
     dialect: sqlglot.Dialect = get_dialect(db.__class__.__name__)
+    # sqlglot will add `"".column` if we pass an empty dict as a schema instead of `None`
+    schema = db.sqlglot_schema if len(db.sqlglot_schema) > 0 else None
 
     query_context = QueryContextManager(dialect)
-    # sqlglot will add `"".column` if we pass an empty dict as a schema instead of `None`
-    query_context.parse(
-        query, schema=db.sqlglot_schema if len(db.sqlglot_schema) > 0 else None
-    )
 
     session_uuid = uuid.uuid4().hex[:4]
 
     # Create our Kitchen
     kitchen = Kitchen(db=db, session_uuid=session_uuid)
     kitchen.extend(ingredients)
-    # Replace ingredient calls with short aliases (e.g. '{{A()}}'),
+
+    # Check if we've already parsed + preprocessed this exact query before
+    plan_key = plan_cache.make_key(query, dialect, schema, ingredients)
+    plan = plan_cache.get(plan_key)
+    if plan is None:
+        plan = plan_blendsql(
+            query=query,
+            dialect=dialect,
+            schema=schema,
+            kitchen=kitchen,
+            ingredients=ingredients,
+            default_model=default_model,
+        )
+        plan_cache.put(plan_key, plan)
+    else:
+        logger.debug(Color.optimization("[ ♻️ ] Using cached query plan..."))
     (
+        query_context.node,
         query,
         ingredient_alias_to_parsed_dict,
-        kitchen,
-        ingredients,
-    ) = preprocess_blendsql(
-        node=query_context.node,
-        dialect=dialect,
-        kitchen=kitchen,
-        ingredients=ingredients,
-        default_model=default_model,
-    )
-    query = autowrap_query(
-        query=query,
-        kitchen=kitchen,
-        ingredient_alias_to_parsed_dict=ingredient_alias_to_parsed_dict,
-    )
-    # Parse to our QueryContextManager object
-    query_context.parse(query)
+        reversed_subqueries,
+    ) = plan.instantiate(default_model)
 
     # Preliminary check - we can't have anything that modifies database state
     if query_context.node.find(MODIFIERS):
@@ -551,23 +773,21 @@ def _blend(
         logger.debug(Color.warning(f"No BlendSQL ingredients found in query:"))
         logger.debug(Color.quiet_sql(query))
         logger.debug(Color.warning(f"Executing as vanilla SQL..."))
+        usage = (
+            default_model.execution_usage()
+            if default_model is not None
+            else ModelUsage()
+        )
         return Smoothie(
             _df=db.execute_to_df(query_context.to_string()),
             meta=SmoothieMeta(
                 num_values_passed=0,
-                num_generation_calls=(
-                    default_model.num_generation_calls
-                    if default_model is not None
-                    else 0
-                ),
-                prompt_tokens=(
-                    default_model.prompt_tokens if default_model is not None else 0
-                ),
-                completion_tokens=(
-                    default_model.completion_tokens if default_model is not None else 0
-                ),
-                cached_tokens=(
-                    default_model.cached_tokens if default_model is not None else 0
+                num_generation_calls=usage.num_generation_calls,
+                prompt_tokens=usage.prompt_tokens,
+                completion_tokens=usage.completion_tokens,
+                cached_tokens=usage.cached_tokens,
+                tier_usage=(
+                    default_model.tier_usage() if default_model is not None else None
                 ),
                 ingredients=[],
                 query=original_query,
@@ -580,15 +800,15 @@ def _blend(
     _get_temp_session_table: Callable = partial(get_temp_session_table, session_uuid)
     alias_function_name_to_result: dict[str, str] = {}
     session_modified_tables = set()
+    # With `enable_map_side_tables`, the side tables behind each session view
+    map_side_tables: dict[str, list[tuple[str | None, list[str], str]]] = {}
     scm = None
     weird_union_exception = False
     # TODO: Currently, as we traverse upwards from deepest subquery,
     #   if any lower subqueries have an ingredient, we deem the current
     #   as ineligible for optimization. Maybe this can be improved in the future.
     prev_subquery_has_ingredient = False
-    for subquery_idx, subquery in enumerate(
-        get_reversed_subqueries(query_context.node)
-    ):
+    for subquery_idx, subquery in enumerate(reversed_subqueries):
         if isinstance(
             subquery.parent, exp.Union
         ):  # For some reason, this gets parsed as `Union(Select(...`
@@ -760,6 +980,7 @@ def _blend(
                             enable_early_exit=enable_early_exit,
                             enable_constrained_decoding=enable_constrained_decoding,
                             enable_early_deduplication=enable_early_deduplication,
+                            enable_map_side_tables=enable_map_side_tables,
                             table_to_title=table_to_title,
                             verbose=verbose,
                             _prev_passed_values=_prev_passed_values,
@@ -776,222 +997,278 @@ def _blend(
         # Now, 1) Find all ingredients to execute (e.g. '{{f(a, b, c)}}')
         # 2) Track when we've created a new table from a MapIngredient call
         #   only at the end of parsing a subquery, we can merge to the original session_uuid table
-        tablename_to_map_out: dict[str, tuple[pd.DataFrame, str]] = {}
+        tablename_to_map_out: dict[
+            str, list[tuple[pl.LazyFrame, str, pl.LazyFrame | None]]
+        ] = {}
         cascade_filter: pl.LazyFrame = None
         previous_cascade_filter_failed = False
-        for function_node, is_final_map in get_sorted_blendsql_nodes(
-            node=scm.node,
+        # Ingredient calls within the same batch don't depend on each other's output.
+        # Map calls can only be batched if they won't pass a cascade filter between them.
+        map_cascade_filter_possible = (
+            enable_cascade_filter
+            and scm.is_eligible_for_cascade_filter()
+            and len(scm.stateful_columns_referenced_by_lm_ingredients) == 1
+        )
+        for batch in batch_blendsql_nodes(
+            get_sorted_blendsql_nodes(
+                node=scm.node,
+                ingredient_alias_to_parsed_dict=ingredient_alias_to_parsed_dict,
+                kitchen=kitchen,
+            ),
             ingredient_alias_to_parsed_dict=ingredient_alias_to_parsed_dict,
             kitchen=kitchen,
+            batch_maps=not map_cascade_filter_possible,
         ):
-            if in_cte:  # Don't execute CTEs until we need them
-                continue
-            curr_function_parsed_results = ingredient_alias_to_parsed_dict[
-                get_blendsql_func_name(function_node)
-            ]
-            curr_ingredient = kitchen.get_from_name(
-                curr_function_parsed_results["function"]
-            )
-            prev_subquery_has_ingredient = True
-            if get_blendsql_func_name(function_node) in executed_subquery_ingredients:
-                # Don't execute same ingredient twice
-                continue
-
-            executed_subquery_ingredients.add(get_blendsql_func_name(function_node))
-            kwargs_dict = curr_function_parsed_results["kwargs_dict"]
-
-            if (
-                enable_early_exit
-                and curr_ingredient.ingredient_type == IngredientType.MAP
-            ):
-                # We can ONLY apply this exit condition if we're executing the final Map function of the subquery
-                if is_final_map:
-                    # We can't apply exit conditions if a previous cascade filter application failed
-                    if not previous_cascade_filter_failed:
-                        # Fetch an exit condition, if we can extract one from the expression context
-                        # i.e. `SELECT * FROM t WHERE a() = TRUE LIMIT 5`
-                        # The exit condition would be at least 5 `a()` evaluate to `TRUE`
-                        (
-                            kwargs_dict["exit_condition_func"],
-                            kwargs_dict["exit_condition_required_values"],
-                        ) = scm.get_exit_condition(function_node)
-
-            # Immediately set false, unless proven otherwise
-            previous_cascade_filter_failed = True
-
-            Color.begin_block(curr_function_parsed_results["raw"])
-
-            if infer_gen_constraints:
-                # Latter is the winner.
-                # So if we already define something in kwargs_dict,
-                #   It's not overridden here.
-                kwargs_dict = (
-                    scm.infer_gen_constraints(
-                        function_node=function_node,
-                        schema=db.sqlglot_schema,
-                        alias_to_tablename=scm.alias_to_tablename,
-                        has_user_regex=bool(kwargs_dict.get("regex", None) is not None),
-                    )
-                    | kwargs_dict
+            pending_calls: list[tuple[exp.Expression, Ingredient, Callable]] = []
+            for function_node, is_final_map in batch:
+                if in_cte:  # Don't execute CTEs until we need them
+                    continue
+                curr_function_parsed_results = ingredient_alias_to_parsed_dict[
+                    get_blendsql_func_name(function_node)
+                ]
+                curr_ingredient = kitchen.get_from_name(
+                    curr_function_parsed_results["function"]
                 )
-
-            if table_to_title is not None:
-                kwargs_dict["table_to_title"] = table_to_title
-
-            # Optionally, recursively call blend() again to get subtable from args
-            # This applies to `context` and `options`, since they could be `Subquery` types.
-            for _i, unpack_kwarg in enumerate(["context", "options"]):
-                unpack_value = kwargs_dict.get(unpack_kwarg, None)
-                if unpack_value is None:
+                prev_subquery_has_ingredient = True
+                if (
+                    get_blendsql_func_name(function_node)
+                    in executed_subquery_ingredients
+                ):
+                    # Don't execute same ingredient twice
                     continue
 
-                if unpack_kwarg == "context":
-                    if not isinstance(unpack_value, (tuple, list)):
-                        kwargs_dict[unpack_kwarg] = (kwargs_dict[unpack_kwarg],)
-                    unpack_values = kwargs_dict[unpack_kwarg]
-                elif unpack_kwarg == "options":
-                    unpack_values = [unpack_value]
-
-                for value_idx, value in enumerate(unpack_values):
-                    if isinstance(value, Subquery):
-                        _smoothie = _blend(
-                            query=value,
-                            db=db,
-                            default_model=default_model,
-                            ingredients=ingredients,
-                            infer_gen_constraints=infer_gen_constraints,
-                            enable_cascade_filter=enable_cascade_filter,
-                            enable_early_exit=enable_early_exit,
-                            enable_constrained_decoding=enable_constrained_decoding,
-                            enable_early_deduplication=enable_early_deduplication,
-                            table_to_title=table_to_title,
-                            verbose=verbose,
-                            _prev_passed_values=_prev_passed_values,
+                executed_subquery_ingredients.add(get_blendsql_func_name(function_node))
+                kwargs_dict = curr_function_parsed_results["kwargs_dict"]
+
+                if (
+                    enable_early_exit
+                    and curr_ingredient.ingredient_type == IngredientType.MAP
+                ):
+                    # We can ONLY apply this exit condition if we're executing the final Map function of the subquery
+                    if is_final_map:
+                        # We can't apply exit conditions if a previous cascade filter application failed
+                        if not previous_cascade_filter_failed:
+                            # Fetch an exit condition, if we can extract one from the expression context
+                            # i.e. `SELECT * FROM t WHERE a() = TRUE LIMIT 5`
+                            # The exit condition would be at least 5 `a()` evaluate to `TRUE`
+                            (
+                                kwargs_dict["exit_condition_func"],
+                                kwargs_dict["exit_condition_required_values"],
+                            ) = scm.get_exit_condition(function_node)
+
+                # Immediately set false, unless proven otherwise
+                previous_cascade_filter_failed = True
+
+                Color.begin_block(curr_function_parsed_results["raw"])
+
+                if infer_gen_constraints:
+                    # Latter is the winner.
+                    # So if we already define something in kwargs_dict,
+                    #   It's not overridden here.
+                    kwargs_dict = (
+                        scm.infer_gen_constraints(
+                            function_node=function_node,
+                            schema=db.sqlglot_schema,
+                            alias_to_tablename=scm.alias_to_tablename,
+                            has_user_regex=bool(
+                                kwargs_dict.get("regex", None) is not None
+                            ),
                         )
-                        _prev_passed_values += _smoothie.meta.num_values_passed
-                        subtable = _smoothie.pl()
-                        if unpack_kwarg == "options":
-                            if len(subtable.columns) == 1 or len(subtable) == 1:
-                                # Here, we need to format as a flat set
-                                kwargs_dict[unpack_kwarg] = list(
-                                    subtable.to_numpy().flatten()
-                                )
+                        | kwargs_dict
+                    )
+
+                if table_to_title is not None:
+                    kwargs_dict["table_to_title"] = table_to_title
+
+                # Optionally, recursively call blend() again to get subtable from args
+                # This applies to `context` and `options`, since they could be `Subquery` types.
+                for _i, unpack_kwarg in enumerate(["context", "options"]):
+                    unpack_value = kwargs_dict.get(unpack_kwarg, None)
+                    if unpack_value is None:
+                        continue
+
+                    if unpack_kwarg == "context":
+                        if not isinstance(unpack_value, (tuple, list)):
+                            kwargs_dict[unpack_kwarg] = (kwargs_dict[unpack_kwarg],)
+                        unpack_values = kwargs_dict[unpack_kwarg]
+                    elif unpack_kwarg == "options":
+                        unpack_values = [unpack_value]
+
+                    for value_idx, value in enumerate(unpack_values):
+                        if isinstance(value, Subquery):
+                            _smoothie = _blend(
+                                query=value,
+                                db=db,
+                                default_model=default_model,
+                                ingredients=ingredients,
+                                infer_gen_constraints=infer_gen_constraints,
+                                enable_cascade_filter=enable_cascade_filter,
+                                enable_early_exit=enable_early_exit,
+                                enable_constrained_decoding=enable_constrained_decoding,
+                                enable_early_deduplication=enable_early_deduplication,
+                                enable_map_side_tables=enable_map_side_tables,
+                                table_to_title=table_to_title,
+                                verbose=verbose,
+                                _prev_passed_values=_prev_passed_values,
+                            )
+                            _prev_passed_values += _smoothie.meta.num_values_passed
+                            subtable = _smoothie.pl()
+                            if unpack_kwarg == "options":
+                                if len(subtable.columns) == 1 or len(subtable) == 1:
+                                    # Here, we need to format as a flat set
+                                    kwargs_dict[unpack_kwarg] = list(
+                                        subtable.to_numpy().flatten()
+                                    )
+                                else:
+                                    raise InvalidBlendSQL(
+                                        f"Invalid subquery passed to `options`!\nNeeds to return exactly one column or row, got {len(subtable.columns)} columns and {len(subtable)} rows instead"
+                                    )
+                            elif unpack_kwarg == "context":
+                                if curr_ingredient.ingredient_type == IngredientType.QA:
+                                    # `QAIngredient` can potentially receive multiple context subtables
+                                    tup = kwargs_dict[unpack_kwarg]
+                                    new_tup = (
+                                        tup[:value_idx]
+                                        + (subtable,)
+                                        + tup[value_idx + 1 :]
+                                    )
+                                    kwargs_dict[unpack_kwarg] = new_tup
+                                else:
+                                    kwargs_dict[unpack_kwarg] = subtable
                             else:
-                                raise InvalidBlendSQL(
-                                    f"Invalid subquery passed to `options`!\nNeeds to return exactly one column or row, got {len(subtable.columns)} columns and {len(subtable)} rows instead"
-                                )
-                        elif unpack_kwarg == "context":
-                            if curr_ingredient.ingredient_type == IngredientType.QA:
-                                # `QAIngredient` can potentially receive multiple context subtables
-                                tup = kwargs_dict[unpack_kwarg]
-                                new_tup = (
-                                    tup[:value_idx] + (subtable,) + tup[value_idx + 1 :]
+                                raise LMFunctionException(
+                                    f"Invalid kwarg {unpack_kwarg}\nAlso, we should have never hit this error..."
                                 )
-                                kwargs_dict[unpack_kwarg] = new_tup
-                            else:
-                                kwargs_dict[unpack_kwarg] = subtable
-                        else:
-                            raise LMFunctionException(
-                                f"Invalid kwarg {unpack_kwarg}\nAlso, we should have never hit this error..."
-                            )
 
-            if getattr(curr_ingredient, "model", None) is not None:
-                kwargs_dict["model"] = curr_ingredient.model
-
-            # Execute our ingredient function
-            function_out = curr_ingredient(
-                **kwargs_dict
-                | {
-                    "get_temp_subquery_table": _get_temp_subquery_table,
-                    "get_temp_session_table": _get_temp_session_table,
-                    "aliases_to_tablenames": scm.alias_to_tablename,
-                    "prev_subquery_map_columns": prev_subquery_map_columns,
-                    "cascade_filter": cascade_filter,
-                    "enable_constrained_decoding": enable_constrained_decoding,
-                    "enable_early_deduplication": enable_early_deduplication,
-                },
-            )
-            # Check how to handle output, depending on ingredient type
-            if curr_ingredient.ingredient_type == IngredientType.MAP:
-                # Parse so we replace this function in blendsql with 1st arg
-                #   (new_col, which is the question we asked)
-                #  But also update our underlying table, so we can execute correctly at the end
-                (new_col, tablename, colname, new_table) = function_out
-                prev_subquery_map_columns.add(new_col)
-                if tablename in tablename_to_map_out:
-                    tablename_to_map_out[tablename].append((new_table, new_col))
-                else:
-                    tablename_to_map_out[tablename] = [(new_table, new_col)]
-                session_modified_tables.add(tablename)
-                alias_function_name_to_result[
-                    get_blendsql_func_name(function_node)
-                ] = f'"{double_quote_escape(tablename)}"."{double_quote_escape(new_col)}"'
-
-                if enable_cascade_filter:
-                    if (
-                        scm.is_eligible_for_cascade_filter()
-                        and len(scm.stateful_columns_referenced_by_lm_ingredients) == 1
-                    ):
-                        previous_cascade_filter_failed = False
-                        cascade_filter = LazyTable(
-                            collect_fn=partial(
-                                get_map_cascade_filter,
-                                function_node=function_node,
-                                tablename=tablename,
-                                new_table=new_table,
-                                new_col=new_col,
-                                scm=scm,
-                            ),
-                            has_blendsql_function=True,
-                        )
+                if getattr(curr_ingredient, "model", None) is not None:
+                    kwargs_dict["model"] = curr_ingredient.model
+
+                pending_calls.append(
+                    (
+                        function_node,
+                        curr_ingredient,
+                        partial(
+                            curr_ingredient._interleaved_call,
+                            **kwargs_dict
+                            | {
+                                "get_temp_subquery_table": _get_temp_subquery_table,
+                                "get_temp_session_table": _get_temp_session_table,
+                                "aliases_to_tablenames": scm.alias_to_tablename,
+                                "prev_subquery_map_columns": prev_subquery_map_columns,
+                                "cascade_filter": cascade_filter,
+                                "enable_constrained_decoding": enable_constrained_decoding,
+                                "enable_early_deduplication": enable_early_deduplication,
+                            },
+                        ),
+                    )
+                )
 
-            elif curr_ingredient.ingredient_type in (
-                IngredientType.STRING,
-                IngredientType.QA,
+            # Execute our ingredient functions
+            # Un-materialized CTEs get popped from `db.lazy_tables` by whichever ingredient
+            #   reaches them first, so don't run concurrently if we reference any.
+            references_lazy_table = any(
+                t.name in db.lazy_tables for t in scm.node.find_all(exp.Table)
+            )
+            function_outs = run_interleaved(
+                [call() for *_, call in pending_calls],
+                max_concurrent=1 if references_lazy_table else None,
+            )
+            for (function_node, curr_ingredient, _), function_out in zip(
+                pending_calls, function_outs
             ):
-                # Here, we can simply insert the function's output
-                alias_function_name_to_result[
-                    get_blendsql_func_name(function_node)
-                ] = function_out
-                if enable_cascade_filter:
-                    if (
-                        scm.is_eligible_for_cascade_filter()
-                        and len(scm.stateful_columns_referenced_by_lm_ingredients) == 1
-                    ):
-                        previous_cascade_filter_failed = False
-                        cascade_filter = LazyTable(
-                            collect_fn=partial(
-                                get_qa_cascade_filter,
-                                function_node=function_node,
-                                function_result=function_out,
-                                scm=scm,
-                                db=db,
-                            ),
-                            has_blendsql_function=True,
+                # Check how to handle output, depending on ingredient type
+                if curr_ingredient.ingredient_type == IngredientType.MAP:
+                    # Parse so we replace this function in blendsql with 1st arg
+                    #   (new_col, which is the question we asked)
+                    #  But also update our underlying table, so we can execute correctly at the end
+                    (
+                        new_col,
+                        tablename,
+                        colname,
+                        new_table,
+                        mapped_table,
+                    ) = function_out
+                    prev_subquery_map_columns.add(new_col)
+                    if tablename in tablename_to_map_out:
+                        tablename_to_map_out[tablename].append(
+                            (new_table, new_col, mapped_table)
                         )
-            elif curr_ingredient.ingredient_type == IngredientType.JOIN:
-                # 1) Get the `JOIN` clause containing function
-                # 2) Replace with just the function alias
-                # 3) Assign `function_out` to `alias_function_str`
-                (
-                    left_tablename,
-                    right_tablename,
-                    join_clause,
-                    temp_join_tablename,
-                ) = function_out
-                # Special case for when we have more than 1 ingredient in `JOIN` node left at this point
-                join_node = query_context.node.find(exp.Join)
-                join_node.replace(
-                    exp.BlendSQLFunction(this=get_blendsql_func_name(function_node))
-                )
-                alias_function_name_to_result[
-                    get_blendsql_func_name(function_node)
-                ] = join_clause
-            else:
-                raise ValueError(
-                    f"Not sure what to do with ingredient_type '{curr_ingredient.ingredient_type}' yet\n(Also, we should have never hit this error....)"
-                )
-            Color.end_block()
+                    else:
+                        tablename_to_map_out[tablename] = [
+                            (new_table, new_col, mapped_table)
+                        ]
+                    session_modified_tables.add(tablename)
+                    alias_function_name_to_result[
+                        get_blendsql_func_name(function_node)
+                    ] = f'"{double_quote_escape(tablename)}"."{double_quote_escape(new_col)}"'
+
+                    if enable_cascade_filter:
+                        if (
+                            scm.is_eligible_for_cascade_filter()
+                            and len(scm.stateful_columns_referenced_by_lm_ingredients)
+                            == 1
+                        ):
+                            previous_cascade_filter_failed = False
+                            cascade_filter = LazyTable(
+                                collect_fn=partial(
+                                    get_map_cascade_filter,
+                                    function_node=function_node,
+                                    tablename=tablename,
+                                    new_table=new_table,
+                                    new_col=new_col,
+                                    scm=scm,
+                                ),
+                                has_blendsql_function=True,
+                            )
+
+                elif curr_ingredient.ingredient_type in (
+                    IngredientType.STRING,
+                    IngredientType.QA,
+                ):
+                    # Here, we can simply insert the function's output
+                    alias_function_name_to_result[
+                        get_blendsql_func_name(function_node)
+                    ] = function_out
+                    if enable_cascade_filter:
+                        if (
+                            scm.is_eligible_for_cascade_filter()
+                            and len(scm.stateful_columns_referenced_by_lm_ingredients)
+                            == 1
+                        ):
+                            previous_cascade_filter_failed = False
+                            cascade_filter = LazyTable(
+                                collect_fn=partial(
+                                    get_qa_cascade_filter,
+                                    function_node=function_node,
+                                    function_result=function_out,
+                                    scm=scm,
+                                    db=db,
+                                ),
+                                has_blendsql_function=True,
+                            )
+                elif curr_ingredient.ingredient_type == IngredientType.JOIN:
+                    # 1) Get the `JOIN` clause containing function
+                    # 2) Replace with just the function alias
+                    # 3) Assign `function_out` to `alias_function_str`
+                    (
+                        left_tablename,
+                        right_tablename,
+                        join_clause,
+                        temp_join_tablename,
+                    ) = function_out
+                    # Special case for when we have more than 1 ingredient in `JOIN` node left at this point
+                    join_node = query_context.node.find(exp.Join)
+                    join_node.replace(
+                        exp.BlendSQLFunction(this=get_blendsql_func_name(function_node))
+                    )
+                    alias_function_name_to_result[
+                        get_blendsql_func_name(function_node)
+                    ] = join_clause
+                else:
+                    raise ValueError(
+                        f"Not sure what to do with ingredient_type '{curr_ingredient.ingredient_type}' yet\n(Also, we should have never hit this error....)"
+                    )
+                Color.end_block()
 
         # Combine all the retrieved map outputs
         # The below assumes the `mapped_dfs` are in the same row-order!
@@ -1002,6 +1279,20 @@ def _blend(
                 continue
 
             temp_name = _get_temp_session_table(tablename)
+            if enable_map_side_tables and (
+                tablename in map_side_tables or not db.has_temp_table(temp_name)
+            ):
+                if create_map_session_view(
+                    db=db,
+                    tablename=tablename,
+                    viewname=temp_name,
+                    side_tables=map_side_tables.setdefault(tablename, []),
+                    outputs=[(mapped, col) for _, col, mapped in outputs],
+                ):
+                    session_modified_tables.add(tablename)
+                    continue
+            # The session table is now a full copy, rather than a view over the base table
+            map_side_tables.pop(tablename, None)
             source = temp_name if db.has_temp_table(temp_name) else tablename
 
             # Fetch the base table to modify with our new columns.
@@ -1011,7 +1302,7 @@ def _blend(
                 select_all_from_table_query(source), close_conn=False
             )
             base_cols = set(base.collect_schema().names())
-            mapped_dfs, new_cols = map(list, zip(*outputs))
+            mapped_dfs, new_cols, _ = map(list, zip(*outputs))
 
             # The data in `mapped_dfs` will have the new column (in `new_cols`), along with
             #   any native columns passed to the Map function.
@@ -1085,6 +1376,9 @@ def _blend(
 
     df = db.execute_to_df(query).collect()
 
+    usage = (
+        default_model.execution_usage() if default_model is not None else ModelUsage()
+    )
     return Smoothie(
         _df=df,
         meta=SmoothieMeta(
@@ -1096,26 +1390,143 @@ def _blend(
                 ]
             )
             + _prev_passed_values,
-            num_generation_calls=(
-                default_model.num_generation_calls if default_model is not None else 0
-            ),
-            prompt_tokens=(
-                default_model.prompt_tokens if default_model is not None else 0
-            ),
-            completion_tokens=(
-                default_model.completion_tokens if default_model is not None else 0
-            ),
-            cached_tokens=(
-                default_model.cached_tokens if default_model is not None else 0
+            num_generation_calls=usage.num_generation_calls,
+            prompt_tokens=usage.prompt_tokens,
+            completion_tokens=usage.completion_tokens,
+            cached_tokens=usage.cached_tokens,
+            tier_usage=(
+                default_model.tier_usage() if default_model is not None else None
             ),
             ingredients=ingredients,
             query=original_query,
             db_url=str(db.db_url),
             db_type=db.__class__.__name__,
+            concurrency_limit=(
+                default_model.limiter.limit if default_model is not None else None
+            ),
         ),
     )
 
 
+def _requires_inlined_param(placeholder: exp.Placeholder) -> bool:
+    """Some parameter values need to be known while planning + executing ingredients,
+    so they can't be left for the database driver to bind:
+
+    - Arguments to an ingredient, which end up in the prompt
+    - `LIMIT` / `OFFSET` values, which drive early exit
+    - Values in a predicate over an ingredient, used to infer generation constraints
+    """
+    if (
+        placeholder.find_ancestor(exp.BlendSQLFunction, exp.Limit, exp.Offset)
+        is not None
+    ):
+        return True
+    predicate = placeholder.find_ancestor(exp.Predicate)
+    return predicate is not None and predicate.find(exp.BlendSQLFunction) is not None
+
+
+@lru_cache(maxsize=256)
+def prepare_params(query: str, dialect: sqlglot.Dialect) -> tuple[str, int, frozenset]:
+    """Rewrites the '?' placeholders in `query` to named placeholders (see `name_params()`),
+    and finds which of them need their value inlined into the query text (see `_requires_inlined_param()`).
+
+    Returns:
+        The named query, the number of placeholders, and the indices of inlined placeholders
+    """
+    named_query, num_params = name_params(query)
+    node = _parse_one(named_query, dialect=dialect)
+    inlined_param_idxs = frozenset(
+        int(p.name[len(PARAM_PREFIX) :])
+        for p in node.find_all(exp.Placeholder)
+        if p.name.startswith(PARAM_PREFIX) and _requires_inlined_param(p)
+    )
+    return named_query, num_params, inlined_param_idxs
+
+
+def bind_named_params(
+    named_query: str, params: list, num_params: int, inlined_param_idxs: Collection[int]
+) -> tuple[str, dict]:
+    """Returns the query text to execute, along with the driver-level parameters.
+    Only inlined placeholders (and list / tuple values) are substituted into the query text,
+    so it stays the same across `params` - and so does its query plan.
+    """
+    if len(params) != num_params:
+        raise ValueError(
+            f"Expected {num_params} parameters for '?' placeholders, got {len(params)}"
+        )
+    db_params = {}
+
+    def _bind_param(match: re.Match) -> str:
+        idx = int(match.group(1))
+        val = params[idx]
+        if idx in inlined_param_idxs or isinstance(val, (list, tuple)):
+            return format_param_value(val)
+        db_params[f"{PARAM_PREFIX}{idx}"] = (
+            json.dumps(val) if isinstance(val, dict) else val
+        )
+        return match.group(0)
+
+    return _NAMED_PARAM_RE.sub(_bind_param, named_query), db_params
+
+
+@dataclass
+class PreparedQuery:
+    """A BlendSQL query which has been parsed once, and can be executed
+    repeatedly with new `params`. Created via `BlendSQL.prepare()`.
+
+    '?' placeholders are rewritten to named placeholders, and bound as driver-level
+    parameters at execution time. The query plan is built on the first execution and
+    reused after that, since the query text handed to `_blend()` doesn't change.
+    Placeholders whose values are needed to plan the query (see `_requires_inlined_param`)
+    are still substituted into the query text, and get a plan per distinct value.
+    """
+
+    bsql: "BlendSQL" = field()
+    query: str = field()
+
+    named_query: str = field(init=False)
+    num_params: int = field(init=False)
+    inlined_param_idxs: set[int] = field(init=False)
+    plan_cache: PlanCache = field(init=False)
+
+    def __post_init__(self):
+        dialect: sqlglot.Dialect = get_dialect(self.bsql.db.__class__.__name__)
+        (
+            self.named_query,
+            self.num_params,
+            inlined_param_idxs,
+        ) = prepare_params(self.query, dialect)
+        self.inlined_param_idxs = set(inlined_param_idxs)
+        self.plan_cache = PlanCache()
+
+    def bind(self, params: list | None = None) -> tuple[str, dict]:
+        """Returns the query text to execute, along with the driver-level parameters."""
+        return bind_named_params(
+            self.named_query, params or [], self.num_params, self.inlined_param_idxs
+        )
+
+    def execute(self, params: list | None = None, **kwargs) -> Smoothie:
+        """Execute the prepared query with the given `params`.
+        All other keyword arguments are passed along to `BlendSQL.execute()`.
+        """
+        query, db_params = self.bind(params)
+        return self.bsql._execute(
+            query=query, plan_cache=self.plan_cache, db_params=db_params, **kwargs
+        )
+
+    async def aexecute(self, params: list | None = None, **kwargs) -> Smoothie:
+        """Async version of `execute()`. See `BlendSQL.aexecute()`."""
+        query, db_params = self.bind(params)
+        return await asyncio.to_thread(
+            self.bsql._execute,
+            query=query,
+            plan_cache=self.plan_cache,
+            db_params=db_params,
+            event_loop=asyncio.get_running_loop(),
+            **kwargs,
+        )
+
+
 @dataclass
 class BlendSQL:
     """Core `BlendSQL` class that provides high level interface for executing BlendSQL queries.
@@ -1153,9 +1564,14 @@ class BlendSQL:
     enable_cascade_filter: bool = field(default=True)
     enable_early_exit: bool = field(default=True)
     enable_early_deduplication: bool = field(default=True)
+    enable_map_side_tables: bool = field(default=False)
 
     table_to_title: dict[str, str] | None = field(default=None)
 
+    _execution_lock: threading.RLock = field(
+        init=False, default_factory=threading.RLock, repr=False
+    )
+
     def __post_init__(self):
         if not isinstance(self.db, Database):
             self.db = self._infer_db_type(self.db)
@@ -1283,6 +1699,7 @@ class BlendSQL:
         enable_early_exit: bool | None = None,
         enable_constrained_decoding: bool | None = None,
         enable_early_deduplication: bool | None = None,
+        enable_map_side_tables: bool | None = None,
         verbose: bool | None = None,
     ) -> Smoothie:
         '''The `execute()` function is used to execute a BlendSQL query against a database and
@@ -1307,6 +1724,10 @@ class BlendSQL:
             enable_constrained_decoding: Enable constrained decoding for supported models.
             enable_early_deduplication: Apply a `SELECT DISTINCT` to aggregate the inputs to a LM function, and then do
                 a `LEFT JOIN` to align back to the base table.
+            enable_map_side_tables: Store the output of each `Map` ingredient as a small temp table, keyed on its
+                input values, and query the base table through a view which `LEFT JOIN`s these.
+                Avoids copying the whole base table after each `Map`. Rows of the view may come back
+                in a different order, unless the query has an `ORDER BY`.
 
         Returns:
             smoothie: `Smoothie` dataclass containing pd.DataFrame output and execution metadata
@@ -1391,46 +1812,174 @@ class BlendSQL:
             # └────────────┴──────────────────────┴─────────────────┴─────────────────────┘
             ```
         '''
+        return self._execute(
+            query=query,
+            params=params,
+            ingredients=ingredients,
+            model=model,
+            infer_gen_constraints=infer_gen_constraints,
+            enable_cascade_filter=enable_cascade_filter,
+            enable_early_exit=enable_early_exit,
+            enable_constrained_decoding=enable_constrained_decoding,
+            enable_early_deduplication=enable_early_deduplication,
+            enable_map_side_tables=enable_map_side_tables,
+            verbose=verbose,
+        )
+
+    async def aexecute(
+        self,
+        query: str,
+        params: list[str] | None = None,
+        ingredients: Collection[Type[Ingredient]] | None = None,
+        model: ModelBase | None = None,
+        infer_gen_constraints: bool | None = None,
+        enable_cascade_filter: bool | None = None,
+        enable_early_exit: bool | None = None,
+        enable_constrained_decoding: bool | None = None,
+        enable_early_deduplication: bool | None = None,
+        enable_map_side_tables: bool | None = None,
+        verbose: bool | None = None,
+    ) -> Smoothie:
+        """Async version of `execute()`, for use inside an already-running event loop
+        (e.g. a FastAPI endpoint). Takes the same arguments as `execute()`.
+
+        This isn't a native async pipeline: the query is still run by the synchronous
+            `execute()` machinery, via `asyncio.to_thread()`, so each pending call holds a
+            thread from the loop's default executor. Only the model requests are async: ingredient
+            calls submit them back to the caller's event loop, so concurrent queries share the
+            model's HTTP connection pool, and the blocking database work doesn't stall the loop.
+        Queries against separate `BlendSQL` objects run concurrently. Queries against the same
+            `BlendSQL` object also run concurrently if its database leases a connection per execution
+            (e.g. SQLite and PostgreSQL), and are otherwise executed one at a time.
+
+        Examples:
+            ```python
+            smoothies = await asyncio.gather(
+                bsql.aexecute("SELECT {{LLMQA('What color is the sky?')}}"),
+                other_bsql.aexecute("SELECT {{LLMQA('What color is grass?')}}"),
+            )
+            ```
+        """
+        return await asyncio.to_thread(
+            self._execute,
+            query=query,
+            params=params,
+            ingredients=ingredients,
+            model=model,
+            infer_gen_constraints=infer_gen_constraints,
+            enable_cascade_filter=enable_cascade_filter,
+            enable_early_exit=enable_early_exit,
+            enable_constrained_decoding=enable_constrained_decoding,
+            enable_early_deduplication=enable_early_deduplication,
+            enable_map_side_tables=enable_map_side_tables,
+            verbose=verbose,
+            event_loop=asyncio.get_running_loop(),
+        )
+
+    def prepare(self, query: str) -> "PreparedQuery":
+        '''Prepare a BlendSQL query for repeated execution with different parameters.
+
+        The query is parsed once, and its plan is reused across calls to `PreparedQuery.execute()`.
+        Parameters use the same auto-incrementing `?` notation as `execute()`, but are bound
+            as driver-level parameters wherever possible, instead of being pasted into the SQL text.
+
+        Args:
+            query: The BlendSQL query to prepare
+
+        Returns:
+            prepared: `PreparedQuery` handle, which can be executed with new `params`
+
+        Examples:
+            ```python
+            prepared = bsql.prepare(
+                """
+                SELECT * FROM People P
+                WHERE P.Birth_Year > ?
+                AND {{LLMMap('Is this a U.S. president?', P.Name)}} = TRUE
+                """
+            )
+            for year in [1700, 1800, 1900]:
+                smoothie = prepared.execute([year])
+            ```
+        '''
+        return PreparedQuery(bsql=self, query=query)
+
+    def _execute(
+        self,
+        query: str,
+        params: list[str] | None = None,
+        ingredients: Collection[Type[Ingredient]] | None = None,
+        model: ModelBase | None = None,
+        infer_gen_constraints: bool | None = None,
+        enable_cascade_filter: bool | None = None,
+        enable_early_exit: bool | None = None,
+        enable_constrained_decoding: bool | None = None,
+        enable_early_deduplication: bool | None = None,
+        enable_map_side_tables: bool | None = None,
+        verbose: bool | None = None,
+        plan_cache: PlanCache = PLAN_CACHE,
+        db_params: dict | None = None,
+        event_loop: asyncio.AbstractEventLoop | None = None,
+    ) -> Smoothie:
         self._toggle_verbosity(verbose if verbose is not None else self.verbose)
         logger.debug(Color.horizontal_line())
         start = time.time()
         model_in_use = model or self.model
-        try:
-            smoothie = _blend(
-                query=query,
-                params=params,
-                db=self.db,
-                default_model=model_in_use,
-                ingredients=self._merge_default_ingredients(
-                    ingredients or self.ingredients
-                ),
-                infer_gen_constraints=infer_gen_constraints
-                if infer_gen_constraints is not None
-                else self.infer_gen_constraints,
-                enable_constrained_decoding=enable_constrained_decoding
-                if enable_constrained_decoding is not None
-                else self.enable_constrained_decoding,
-                enable_cascade_filter=enable_cascade_filter
-                if enable_cascade_filter is not None
-                else self.enable_cascade_filter,
-                enable_early_exit=enable_early_exit
-                if enable_early_exit is not None
-                else self.enable_early_exit,
-                enable_early_deduplication=enable_early_deduplication
-                if enable_early_deduplication is not None
-                else self.enable_early_deduplication,
-                table_to_title=self.table_to_title,
+        if params:
+            # Bind the same way as a `PreparedQuery`, so the plan cache is keyed
+            #   on the query with its placeholders, rather than on each set of values
+            named_query, num_params, inlined_param_idxs = prepare_params(
+                query, get_dialect(self.db.__class__.__name__)
             )
-        except Exception as error:
-            raise error
-        finally:
-            # In the case of a recursive `_blend()` call,
-            #   this logic allows temp tables to persist until
-            #   the final base case is fulfilled.
-            self.db._reset_connection()
-            # Reset model stats, so future executions don't add here
-            if model_in_use is not None:
-                model_in_use.reset_stats()
+            query, named_params = bind_named_params(
+                named_query, params, num_params, inlined_param_idxs
+            )
+            db_params = (db_params or {}) | named_params
+            params = None
+        # Ingredients submit their async work to a single event loop per execution.
+        #   If we weren't handed one (via `aexecute()`), use the process-wide background loop.
+        # Each execution leases its own connection (and temp tables) from the database, if it can.
+        #   Otherwise, the connection can't be shared between concurrent executions,
+        #   so we hold `_execution_lock` throughout. Temp tables are dropped when the lease ends.
+        if event_loop is None:
+            event_loop = shared_event_loop()
+        execution_lock = (
+            contextlib.nullcontext()
+            if self.db.supports_concurrent_executions
+            else self._execution_lock
+        )
+        with execution_lock, self.db.lease():
+            # Model usage is tracked per-execution, since models may be shared with concurrent queries
+            with self.db.bind(db_params), bind_event_loop(event_loop), track_usage():
+                smoothie = _blend(
+                    query=query,
+                    params=params,
+                    db=self.db,
+                    default_model=model_in_use,
+                    ingredients=self._merge_default_ingredients(
+                        ingredients or self.ingredients
+                    ),
+                    infer_gen_constraints=infer_gen_constraints
+                    if infer_gen_constraints is not None
+                    else self.infer_gen_constraints,
+                    enable_constrained_decoding=enable_constrained_decoding
+                    if enable_constrained_decoding is not None
+                    else self.enable_constrained_decoding,
+                    enable_cascade_filter=enable_cascade_filter
+                    if enable_cascade_filter is not None
+                    else self.enable_cascade_filter,
+                    enable_early_exit=enable_early_exit
+                    if enable_early_exit is not None
+                    else self.enable_early_exit,
+                    enable_early_deduplication=enable_early_deduplication
+                    if enable_early_deduplication is not None
+                    else self.enable_early_deduplication,
+                    enable_map_side_tables=enable_map_side_tables
+                    if enable_map_side_tables is not None
+                    else self.enable_map_side_tables,
+                    table_to_title=self.table_to_title,
+                    plan_cache=plan_cache,
+                )
         smoothie.meta.process_time_seconds = time.time() - start
         logger.debug(Color.horizontal_line())
         return smoothie
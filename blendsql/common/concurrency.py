@@ -0,0 +1,213 @@
+"""Utilities for sharing one event loop across BlendSQL executions,
+and running independent ingredient calls concurrently.
+
+Most ingredient code (`Ingredient._acall()`) is synchronous, and interacts with a
+database connection that isn't safe to use from multiple threads. Only the
+generation work (`Ingredient.run()`) is async. So each ingredient call is written
+as a coroutine which hands its generation work to `defer()`, and `run_interleaved()`
+steps through a batch of calls on the executing thread: it runs each call up to its
+`defer()`, runs all the deferred work together on the execution's event loop, then
+resumes each call with its result. Database work stays serialized on one thread,
+while model requests from different ingredient calls overlap on the event loop.
+"""
+import os
+import asyncio
+import threading
+import contextvars
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Coroutine, TypeVar
+
+from blendsql.configure import ASYNC_LIMIT_KEY, DEFAULT_ASYNC_LIMIT
+
+T = TypeVar("T")
+
+# The event loop that ingredients should submit their async work to
+#   for the current BlendSQL execution. See `run_coroutine()`.
+_EXECUTION_LOOP: ContextVar[asyncio.AbstractEventLoop | None] = ContextVar(
+    "blendsql_execution_loop", default=None
+)
+_SHARED_LOOP: asyncio.AbstractEventLoop | None = None
+_SHARED_LOOP_PID: int | None = None
+_SHARED_LOOP_LOCK = threading.Lock()
+
+
+@contextmanager
+def bind_event_loop(loop: asyncio.AbstractEventLoop):
+    """Bind `loop` as the event loop to use for all coroutines
+    run via `run_coroutine()` within the context.
+    """
+    token = _EXECUTION_LOOP.set(loop)
+    try:
+        yield loop
+    finally:
+        _EXECUTION_LOOP.reset(token)
+
+
+def shared_event_loop() -> asyncio.AbstractEventLoop:
+    """Returns an event loop running in a daemon thread, shared by every
+    `BlendSQL.execute()` call in this process.
+    Since it outlives any single query, the HTTP connections that models open
+    on it stay alive from one query to the next.
+    """
+    global _SHARED_LOOP, _SHARED_LOOP_PID
+    with _SHARED_LOOP_LOCK:
+        # After a fork, the loop's thread doesn't exist in the child
+        if (
+            _SHARED_LOOP is None
+            or _SHARED_LOOP.is_closed()
+            or _SHARED_LOOP_PID != os.getpid()
+        ):
+            loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=loop.run_forever, name="blendsql-event-loop", daemon=True
+            ).start()
+            _SHARED_LOOP, _SHARED_LOOP_PID = loop, os.getpid()
+        return _SHARED_LOOP
+
+
+async def _run_in_context(coro: Coroutine, context: contextvars.Context) -> Any:
+    """Await `coro` with the context variables from `context` set,
+    e.g. the usage counters of the execution that submitted it.
+    """
+    for var, value in context.items():
+        var.set(value)
+    return await coro
+
+
+def run_coroutine(coro: Coroutine) -> Any:
+    """Run `coro` to completion from synchronous code.
+
+    - If no event loop is bound, falls back to `asyncio.run()`
+    - If the bound loop is running in another thread (as with `BlendSQL.execute()`
+        and `BlendSQL.aexecute()`), the coroutine is submitted to it, and we block until it finishes
+    - Otherwise, the bound loop is idle, and we run it until the coroutine completes
+    """
+    loop = _EXECUTION_LOOP.get()
+    if loop is None or loop.is_closed():
+        return asyncio.run(coro)
+    if loop.is_running():
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is loop:
+            coro.close()
+            raise RuntimeError(
+                "Can't block on a coroutine from inside its own event loop! "
+                "Use `BlendSQL.aexecute()` instead of `BlendSQL.execute()`."
+            )
+        # Tasks on `loop` would otherwise start from its own thread's context, not ours
+        future = asyncio.run_coroutine_threadsafe(
+            _run_in_context(coro, contextvars.copy_context()), loop
+        )
+        return future.result()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        # Same as `asyncio.run()`, don't leave any tasks running between calls
+        cancel_pending_tasks(loop)
+
+
+def cancel_pending_tasks(loop: asyncio.AbstractEventLoop) -> None:
+    """Cancel and wait on all pending tasks in an idle `loop`."""
+    pending = [t for t in asyncio.all_tasks(loop) if not t.done()]
+    if not pending:
+        return
+    for task in pending:
+        task.cancel()
+    loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+
+
+class _Deferred:
+    """Yielded up through the awaiting coroutines to `run_interleaved()`, to have it run `coro`."""
+
+    __slots__ = ("coro",)
+
+    def __init__(self, coro: Coroutine):
+        self.coro = coro
+
+    def __await__(self):
+        return (yield self)
+
+
+async def defer(coro: Coroutine[Any, Any, T]) -> T:
+    """Await `coro` on the execution's event loop, alongside the deferred work
+    of the other calls being run by the same `run_interleaved()`.
+    Only valid in coroutines driven by `run_interleaved()`.
+    """
+    return await _Deferred(coro)
+
+
+async def _gather(coros: list[Coroutine]) -> list:
+    return await asyncio.gather(*coros, return_exceptions=True)
+
+
+def _drive(calls: list[Coroutine]) -> list[tuple[Any, BaseException | None]]:
+    """Steps through `calls` together, returning (result, exception) for each."""
+    outcomes: list[tuple[Any, BaseException | None]] = [(None, None)] * len(calls)
+    # What to resume each unfinished call with, as (value, exception)
+    resume: dict[int, tuple[Any, BaseException | None]] = {
+        idx: (None, None) for idx in range(len(calls))
+    }
+    try:
+        while resume:
+            deferred: dict[int, Coroutine] = {}
+            for idx, (value, exc) in resume.items():
+                call = calls[idx]
+                try:
+                    step = call.send(value) if exc is None else call.throw(exc)
+                except StopIteration as stop:
+                    outcomes[idx] = (stop.value, None)
+                    continue
+                except Exception as e:
+                    outcomes[idx] = (None, e)
+                    continue
+                if not isinstance(step, _Deferred):
+                    call.close()
+                    outcomes[idx] = (
+                        None,
+                        RuntimeError(
+                            f"Coroutines run by `run_interleaved()` can only await `defer()`, got {step!r}"
+                        ),
+                    )
+                    continue
+                deferred[idx] = step.coro
+            if not deferred:
+                break
+            results = run_coroutine(_gather(list(deferred.values())))
+            resume = {
+                idx: (None, result)
+                if isinstance(result, BaseException)
+                else (result, None)
+                for idx, result in zip(deferred, results)
+            }
+    finally:
+        # e.g. on a `KeyboardInterrupt`, don't leave calls suspended
+        for call in calls:
+            call.close()
+    return outcomes
+
+
+def run_interleaved(
+    calls: list[Coroutine[Any, Any, T]], max_concurrent: int | None = None
+) -> list[T]:
+    """Run each of `calls`, and return their results in order.
+
+    Each call runs on this thread, except for the work it hands to `defer()`, which is
+    gathered with that of the other calls and run on the execution's event loop.
+    See the module docstring for why this makes it safe to run ingredient calls together.
+    Calls are run `max_concurrent` at a time, defaulting to `BLENDSQL_ASYNC_LIMIT`.
+    If any call raises, the first exception (in order of `calls`) is re-raised
+    once all calls have finished.
+    """
+    if max_concurrent is None:
+        max_concurrent = int(os.getenv(ASYNC_LIMIT_KEY, DEFAULT_ASYNC_LIMIT))
+    max_concurrent = max(max_concurrent, 1)
+    outcomes = []
+    for start in range(0, len(calls), max_concurrent):
+        outcomes.extend(_drive(calls[start : start + max_concurrent]))
+    for _, exc in outcomes:
+        if exc is not None:
+            raise exc
+    return [result for result, _ in outcomes]
@@ -8,3 +8,13 @@ class LMFunctionException(ValueError):
 
 class TypeResolutionException(LMFunctionException):
     pass
+
+
+class BatchPending(Exception):
+    """Raised when a query is waiting on batch jobs. Re-run it once they're complete."""
+
+    def __init__(self, job_ids: list[str]):
+        self.job_ids = job_ids
+        super().__init__(
+            f"Waiting on batch job(s) {', '.join(job_ids)}. Re-run the query once they're complete."
+        )
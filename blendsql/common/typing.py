@@ -84,11 +84,19 @@ class StringConcatenation(IngredientArgType, list):
 class GenerationItem:
     prompt: str
     grammar: str
+    # Optional prompt prefix shared across many items (e.g. instructions and few-shot examples).
+    #   Models send it as its own, byte-identical message, so that provider-side prefix caching can hit.
+    prefix: str | None = None
     image_urls: list[str] = field(default_factory=list)
     audio_urls: list[str] = field(default_factory=list)
     identifier: str | None = None
     cache_key: str | None = None
     assistant_continuation: str | None = None
+    # Whether the grammar bounds the output to a handful of tokens (e.g. a boolean, or one of a few options).
+    #   Lets models skip streaming when there's no need to cancel mid-generation.
+    short_output: bool = False
+    # Whether to request token logprobs for this item, regardless of `ModelBase.logprobs`
+    logprobs: bool = False
 
 
 @dataclass
@@ -96,3 +104,6 @@ class GenerationResult:
     identifier: str
     value: str
     completed: bool
+    # Probability of the generated tokens, if the model was asked for logprobs
+    confidence: float | None = None
+    token_logprobs: list[float] | None = None
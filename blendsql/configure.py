@@ -18,6 +18,9 @@ DEFAULT_MAX_TOKENS = 4096
 DETERMINISTIC_KEY = "BLENDSQL_DETERMINISTIC"
 DEFAULT_DETERMINISTIC = 0
 
+PLAN_CACHE_SIZE_KEY = "BLENDSQL_PLAN_CACHE_SIZE"
+DEFAULT_PLAN_CACHE_SIZE = 256
+
 
 def add_to_global_history(entry: str):
     if len(GLOBAL_HISTORY) >= MAX_HISTORY_SIZE:
@@ -42,6 +45,10 @@ def set_deterministic(v: bool):
     os.environ[DETERMINISTIC_KEY] = str(int(v))
 
 
+def set_plan_cache_size(n: int):
+    os.environ[PLAN_CACHE_SIZE_KEY] = str(n)
+
+
 class _Config:
     def __call__(self, model=None):
         global _default_model
@@ -60,5 +67,8 @@ class _Config:
     def set_deterministic(self, v: bool):
         set_deterministic(v)
 
+    def set_plan_cache_size(self, n: int):
+        set_plan_cache_size(n)
+
 
 config = _Config()
@@ -1,4 +1,5 @@
 from typing import Generator, Callable
+from contextlib import contextmanager
 import polars as pl
 from dataclasses import field
 from sqlalchemy.engine import URL
@@ -11,6 +12,11 @@ from blendsql.db.utils import LazyTables
 class Database(ABC):
     db_url: URL | str = field()
     lazy_tables: LazyTables = LazyTables()
+    # Driver-level parameters for the current execution, set via `bind()`
+    #   and used as the default `params` in `execute_to_df` / `execute_to_list`
+    bound_params: dict | None = None
+    # Whether `lease()` isolates executions from one another, so they can run concurrently
+    supports_concurrent_executions: bool = False
 
     def __str__(self):
         return f"{self.__class__} @ {self.db_url}"
@@ -18,6 +24,35 @@ class Database(ABC):
     def __repr__(self):
         return f"{self.__class__} @ {self.db_url}"
 
+    @contextmanager
+    def bind(self, params: dict | None):
+        """Bind named parameters for all statements executed within the context.
+        Only the parameters referenced by a given statement are passed to the driver.
+
+        Examples:
+            ```python
+            with db.bind({"v": "value"}):
+                db.execute_to_df("SELECT * FROM t WHERE c = :v")
+            ```
+        """
+        prev_params = self.bound_params
+        self.bound_params = params
+        try:
+            yield self
+        finally:
+            self.bound_params = prev_params
+
+    @contextmanager
+    def lease(self):
+        """Scope the database state of an execution (connection, temp tables, bound params)
+        to the context, clearing its temp tables on exit.
+        By default, there's nothing to isolate, and all executions share it.
+        """
+        try:
+            yield self
+        finally:
+            self._reset_connection()
+
     @abstractmethod
     def _reset_connection(self) -> None:
         """Reset connection, so that temp tables are cleared."""
@@ -32,6 +67,13 @@ class Database(ABC):
         """
         ...
 
+    def row_order_source(self, tablename: str) -> tuple[str, str]:
+        """Returns the relation to read the rows of `tablename` from, and the column to sort them by
+        for a stable order, used for deterministic execution. Defaults to `tablename` itself, in insertion order.
+        Backends with temp objects that have no `rowid` read those from their `row_index_twin()`.
+        """
+        return tablename, "rowid"
+
     @property
     @abstractmethod
     def sqlglot_schema(self) -> dict:
@@ -65,6 +107,13 @@ class Database(ABC):
         """Write the given pandas dataframe as a temp table 'tablename'."""
         ...
 
+    @abstractmethod
+    def create_temp_view(self, viewname: str, query: str) -> None:
+        """Create (or replace) the temporary view 'viewname', defined by `query`.
+        Like temp tables, these are cleared on `_reset_connection()`.
+        """
+        ...
+
     @abstractmethod
     def execute_to_df(
         self, query: str, lazy: bool, **kwargs
@@ -77,6 +126,7 @@ class Database(ABC):
                 https://peps.python.org/pep-0249/#paramstyle
             lazy: Whether to return a pl.LazyFrame.
             params: Dict containing mapping from name to value.
+                Defaults to the parameters bound via `bind()`.
 
         Returns:
             pd.DataFrame
@@ -91,7 +141,9 @@ class Database(ABC):
         ...
 
     @abstractmethod
-    def execute_to_list(self, query: str, to_type: Callable = lambda x: x) -> list:
+    def execute_to_list(
+        self, query: str, to_type: Callable = lambda x: x, params: dict | None = None
+    ) -> list:
         """A lower-level execute method that doesn't use the pandas processing logic.
         Returns results as a list.
         """
@@ -8,7 +8,12 @@ import polars as pl
 import pandas as pd
 
 from blendsql.db.database import Database
-from blendsql.db.utils import double_quote_escape
+from blendsql.db.utils import (
+    double_quote_escape,
+    select_referenced_params,
+    row_index_twin,
+    ROW_INDEX_COLUMN,
+)
 from blendsql.common.logger import logger, Color
 
 _has_duckdb = importlib.util.find_spec("duckdb") is not None
@@ -48,6 +53,11 @@ class DuckDB(Database):
             }
         )
         ```
+
+    Set `register_temp_tables=True` to register the Arrow buffers of intermediate results (map outputs,
+    abstracted subqueries, etc.) as views, instead of copying them into DuckDB temp tables.
+    This avoids a copy for each one, at the cost of DuckDB scanning Arrow data when querying them.
+    E.g. `BlendSQL({"w": df}).db.register_temp_tables = True`.
     """
 
     # Can be either a dict from name -> pd.DataFrame
@@ -57,6 +67,10 @@ class DuckDB(Database):
 
     # We use below to track which tables we should drop on '_reset_connection'
     temp_tables: set[str] = field(default_factory=set)
+    # Whether temp tables are views over the Arrow data of each frame, rather than copies
+    register_temp_tables: bool = field(default=False)
+    # Views created with `create_temp_view()`, also dropped on '_reset_connection'
+    temp_views: set[str] = field(default_factory=set)
 
     @classmethod
     def from_pandas(
@@ -115,10 +129,25 @@ class DuckDB(Database):
 
     def _reset_connection(self):
         """Reset connection, so that temp tables are cleared."""
+        # Views may reference temp tables, so drop them first
+        for viewname in self.temp_views:
+            self.con.sql(f'DROP VIEW IF EXISTS "{viewname}"')
+        self.temp_views = set()
         for tablename in self.temp_tables:
-            self.con.sql(f'DROP TABLE IF EXISTS "{tablename}"')
+            if self.register_temp_tables:
+                # Releases our reference to the frame's Arrow buffers
+                self.con.unregister(tablename)
+            else:
+                self.con.sql(f'DROP TABLE IF EXISTS "{tablename}"')
         self.temp_tables = set()
 
+    def row_order_source(self, tablename: str) -> tuple[str, str]:
+        twin = row_index_twin(tablename)
+        if twin in self.temp_views or twin in self.temp_tables:
+            # Views (including registered Arrow data) have no `rowid`
+            return twin, ROW_INDEX_COLUMN
+        return super().row_order_source(tablename)
+
     def has_temp_table(self, tablename: str) -> bool:
         return tablename in self.execute_to_list("SHOW TABLES")
 
@@ -158,11 +187,29 @@ class DuckDB(Database):
         # TODO
         return None
 
-    def to_temp_table(self, df: pd.DataFrame, tablename: str):
+    def to_temp_table(self, df: pl.DataFrame | pl.LazyFrame, tablename: str):
         """Technically, when duckdb is run in-memory (as is the default),
         all created tables are temporary tables (since they expire at the
         end of the session). So, we don't really need to insert 'TEMP' keyword here?
         """
+        self._drop_temp_view(tablename)
+        if self.register_temp_tables:
+            if isinstance(df, pl.LazyFrame):
+                df = df.collect()
+            # Polars frames are already Arrow under the hood, so only string columns
+            #   are converted (from string views, which pyarrow can't push filters into).
+            #   Registering over an existing name replaces that view.
+            # The data is registered with a row index, for `row_order_source()`,
+            #   and `tablename` is a view over it without the index.
+            twin = row_index_twin(tablename)
+            self.con.register(twin, df.with_row_index(ROW_INDEX_COLUMN).to_arrow())
+            self.temp_tables.add(twin)
+            self.create_temp_view(
+                tablename,
+                f'SELECT * EXCLUDE ("{ROW_INDEX_COLUMN}") FROM "{double_quote_escape(twin)}"',
+            )
+            logger.debug(Color.update(f"Registered temp view {tablename}"))
+            return
         # DuckDB has this cool 'CREATE OR REPLACE' syntax
         # https://duckdb.org/docs/sql/statements/create_table.html#create-or-replace
         create_table_stmt = (
@@ -173,23 +220,57 @@ class DuckDB(Database):
         self.temp_tables.add(tablename)
         logger.debug(Color.update(f"Created temp table {tablename}"))
 
+    def create_temp_view(self, viewname: str, query: str) -> None:
+        create_view_stmt = f'CREATE OR REPLACE TEMP VIEW "{viewname}" AS {query}'
+        logger.debug(Color.quiet_sql(create_view_stmt))
+        self.con.sql(create_view_stmt)
+        self.temp_views.add(viewname)
+
+    def _drop_temp_view(self, viewname: str):
+        """Drops `viewname`, if we created it, along with its `row_index_twin()`."""
+        twin = row_index_twin(viewname)
+        if viewname in self.temp_views:
+            self.con.sql(f'DROP VIEW "{viewname}"')
+            self.temp_views.discard(viewname)
+        if twin in self.temp_views:
+            self.con.sql(f'DROP VIEW "{twin}"')
+            self.temp_views.discard(twin)
+        elif twin in self.temp_tables:
+            self.con.unregister(twin)
+            self.temp_tables.discard(twin)
+
     def execute_to_df(
-        self, query: str, lazy=True, close_conn=True, **_
+        self,
+        query: str,
+        params: dict | None = None,
+        lazy=True,
+        close_conn=True,
+        **_,
     ) -> pl.LazyFrame:
         """On params with duckdb: https://github.com/duckdb/duckdb/issues/9853#issuecomment-1832732933
+        Named parameters are referenced with `$name` syntax, and default to those bound via `bind()`.
 
         If `close_conn==True` and `lazy=True`, we can't call `self.con.sql(query).pl(lazy=True)`,
             since this leaves an open connection that blocks future queries.
             Instead, we create a pl.DataFrame and call `.lazy()` on it.
         """
+        params = select_referenced_params(
+            query, params if params is not None else self.bound_params, marker="$"
+        )
         if close_conn:
-            res = self.con.sql(query).pl()
+            res = self.con.sql(query, params=params).pl()
             return res.lazy() if lazy else res
         else:
-            return self.con.sql(query).pl(lazy=lazy)
+            return self.con.sql(query, params=params).pl(lazy=lazy)
 
     def execute_to_list(
-        self, query: str, to_type: Callable | None = lambda x: x
+        self,
+        query: str,
+        to_type: Callable | None = lambda x: x,
+        params: dict | None = None,
     ) -> list:
-        result = self.con.sql(query).fetchall()
+        params = select_referenced_params(
+            query, params if params is not None else self.bound_params, marker="$"
+        )
+        result = self.con.sql(query, params=params).fetchall()
         return [to_type(row[0]) for row in result]
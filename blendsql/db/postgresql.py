@@ -1,10 +1,13 @@
 import importlib.util
+import io
+import polars as pl
 from sqlalchemy.engine import make_url, URL
 import logging
 from functools import cached_property
 
 from blendsql.common.logger import Color
 from blendsql.db.sqlalchemy import SQLAlchemyDatabase
+from blendsql.db.utils import double_quote_escape, to_bulk_loadable
 
 _has_psycopg2 = importlib.util.find_spec("psycopg2") is not None
 
@@ -21,6 +24,8 @@ class PostgreSQL(SQLAlchemyDatabase):
         ```
     """
 
+    temp_schema = "pg_temp"
+
     def __init__(self, db_path: str):
         if not _has_psycopg2:
             raise ImportError(
@@ -40,12 +45,33 @@ class PostgreSQL(SQLAlchemyDatabase):
             "SELECT table_name FROM information_schema.tables WHERE table_schema LIKE 'pg_temp_%'"
         )
 
+    def _bulk_insert(self, df: pl.DataFrame, tablename: str):
+        """Streams rows as CSV written by polars into `COPY ... FROM STDIN`,
+        instead of inserting them through pandas.
+        """
+        loadable_df = to_bulk_loadable(df)
+        if loadable_df is None:
+            return super()._bulk_insert(df, tablename)
+        # Nulls are written unquoted and empty strings quoted, which `COPY` tells apart
+        buffer = io.BytesIO()
+        loadable_df.write_csv(buffer, include_header=False)
+        buffer.seek(0)
+        columns = ", ".join(f'"{double_quote_escape(c)}"' for c in loadable_df.columns)
+        cursor = self.con.connection.cursor()
+        try:
+            cursor.copy_expert(
+                f'COPY "{double_quote_escape(tablename)}" ({columns}) FROM STDIN WITH (FORMAT csv)',
+                buffer,
+            )
+        finally:
+            cursor.close()
+
     @cached_property
     def sqlglot_schema(self) -> dict:
         schema: dict[str, dict] = {}
         for tablename in self.tables():
             schema[tablename] = {}
-            for _, row in self.execute_to_df(
+            for row in self.execute_to_df(
                 """
                     SELECT column_name as name, data_type as type 
                     FROM information_schema.columns 
@@ -53,6 +79,7 @@ class PostgreSQL(SQLAlchemyDatabase):
                     AND table_schema = 'public'
                     """,
                 {"t": tablename},
-            ).iterrows():
+                lazy=False,
+            ).iter_rows(named=True):
                 schema[tablename][row["name"]] = row["type"]
         return schema
@@ -1,11 +1,14 @@
 from collections.abc import Collection
-from typing import Generator, Callable
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Generator, Callable, ClassVar
 import pandas as pd
 import polars as pl
 import warnings
 from dataclasses import dataclass, field
 from sqlalchemy.schema import CreateTable
 from sqlalchemy import create_engine, inspect, MetaData
+from sqlalchemy.pool import SingletonThreadPool, StaticPool
 from sqlalchemy.sql import text
 from sqlalchemy.engine import Engine, Connection, URL
 from pandas.io.sql import get_schema
@@ -13,27 +16,155 @@ import re
 
 from .database import Database
 from blendsql.common.logger import logger, Color
-from blendsql.db.utils import double_quote_escape, truncate_df_content, LazyTables
+from blendsql.db.utils import (
+    double_quote_escape,
+    truncate_df_content,
+    select_referenced_params,
+    LazyTables,
+    deduplicate_columnnames,
+    frame_from_rows,
+    row_index_twin,
+    ROW_INDEX_COLUMN,
+)
+
+
+@dataclass
+class _Lease:
+    """Everything scoped to one connection checked out from the engine's pool."""
+
+    con: Connection
+    lazy_tables: LazyTables = field(default_factory=LazyTables)
+    bound_params: dict | None = None
+    temp_tables: set[str] = field(default_factory=set)
+    # We use below to tell temp views apart from temp tables, since they're dropped differently
+    temp_views: set[str] = field(default_factory=set)
 
 
 @dataclass
 class SQLAlchemyDatabase(Database):
+    """Executions each lease their own pooled connection (see `lease()`), so
+    one `BlendSQL` object can run concurrent queries without their temp tables colliding.
+    Outside of a lease, a single default connection is used.
+
+    An in-memory SQLite database only exists on the connection that created it,
+    so there, every execution uses the default connection, one at a time.
+    """
+
     db_url: URL = field()
 
     engine: Engine = field(init=False)
-    con: Connection = field(init=False)
+    _lease: ContextVar[_Lease | None] = field(init=False, repr=False)
+    _default_lease: _Lease = field(init=False, repr=False)
+
+    # Where temp tables live, so we can drop them without touching a regular table of the same name
+    temp_schema: ClassVar[str] = "temp"
 
     def __post_init__(self):
-        self.lazy_tables = LazyTables()
-        self.engine = create_engine(self.db_url)
-        self.con = self.engine.connect()
+        if self.db_url.get_backend_name() == "sqlite" and self.db_url.database in (
+            None,
+            "",
+            ":memory:",
+        ):
+            # Share the one connection holding the database across threads
+            self.engine = create_engine(
+                self.db_url,
+                poolclass=StaticPool,
+                connect_args={"check_same_thread": False},
+            )
+        else:
+            self.engine = create_engine(self.db_url)
+        self._lease = ContextVar(f"blendsql_lease_{id(self)}", default=None)
+        self._default_lease = _Lease(con=self.engine.connect())
         self.metadata = MetaData()
         self.metadata.reflect(bind=self.engine)
 
+    @property
+    def supports_concurrent_executions(self) -> bool:
+        # With these pools, a new connection isn't a new session on the same database
+        return not isinstance(self.engine.pool, (SingletonThreadPool, StaticPool))
+
+    @property
+    def _current_lease(self) -> _Lease:
+        return self._lease.get() or self._default_lease
+
+    @property
+    def con(self) -> Connection:
+        return self._current_lease.con
+
+    @property
+    def lazy_tables(self) -> LazyTables:
+        return self._current_lease.lazy_tables
+
+    @property
+    def bound_params(self) -> dict | None:
+        return self._current_lease.bound_params
+
+    @bound_params.setter
+    def bound_params(self, params: dict | None):
+        self._current_lease.bound_params = params
+
+    @property
+    def temp_views(self) -> set[str]:
+        return self._current_lease.temp_views
+
+    @contextmanager
+    def lease(self):
+        """Check out a connection from the engine's pool for the duration of the context.
+        Temp tables are scoped to a connection, so each lease only sees its own.
+        They're dropped when the context exits.
+
+        Examples:
+            ```python
+            with db.lease():
+                db.to_temp_table(df, "t")
+            ```
+        """
+        if not self.supports_concurrent_executions:
+            # Use the default connection, which callers take turns on
+            try:
+                yield self
+            finally:
+                self._reset_connection()
+            return
+        lease = _Lease(con=self.engine.connect())
+        token = self._lease.set(lease)
+        try:
+            yield self
+        finally:
+            try:
+                self._reset_connection()
+            finally:
+                self._lease.reset(token)
+                lease.con.close()
+
     def _reset_connection(self):
-        """Reset connection, so that temp tables are cleared."""
-        self.con.close()
-        self.con = self.engine.connect()
+        """Reset connection, so that temp tables are cleared.
+        Closing a connection only returns it to the pool (where SQLite keeps its temp tables),
+        so we drop the ones we created.
+        """
+        lease = self._current_lease
+        lease.con.rollback()
+        for viewname in lease.temp_views:
+            lease.con.execute(
+                text(
+                    f'DROP VIEW IF EXISTS {self.temp_schema}."{double_quote_escape(viewname)}"'
+                )
+            )
+        for tablename in lease.temp_tables:
+            lease.con.execute(
+                text(
+                    f'DROP TABLE IF EXISTS {self.temp_schema}."{double_quote_escape(tablename)}"'
+                )
+            )
+        lease.con.commit()
+        lease.temp_views, lease.temp_tables = set(), set()
+
+    def row_order_source(self, tablename: str) -> tuple[str, str]:
+        twin = row_index_twin(tablename)
+        if twin in self.temp_views:
+            # Views have no `rowid`
+            return twin, ROW_INDEX_COLUMN
+        return super().row_order_source(tablename)
 
     def tables(self) -> list[str]:
         return inspect(self.engine).get_table_names()
@@ -142,17 +273,46 @@ class SQLAlchemyDatabase(Database):
         if isinstance(df, pl.LazyFrame):
             df = df.collect()
 
-        pd_df = df.to_pandas(use_pyarrow_extension_array=True)
-
+        self._drop_temp_view(tablename)
         self.con.execute(text(f'DROP TABLE IF EXISTS "{tablename}"'))
 
-        create_table_stmt = get_schema(pd_df, name=tablename, con=self.con).strip()
+        # Column types are all we need for the DDL, so don't convert the whole frame
+        create_table_stmt = get_schema(
+            df.head(0).to_pandas(use_pyarrow_extension_array=True),
+            name=tablename,
+            con=self.con,
+        ).strip()
         # Insert 'TEMP' keyword
         create_table_stmt = re.sub(
             r"^CREATE TABLE", "CREATE TEMP TABLE", create_table_stmt
         )
         logger.debug(Color.quiet_sql(create_table_stmt))
         self.con.execute(text(create_table_stmt))
+        self._current_lease.temp_tables.add(tablename)
+        if df.height > 0:
+            self._bulk_insert(df, tablename)
+
+    def create_temp_view(self, viewname: str, query: str) -> None:
+        self._drop_temp_view(viewname)
+        create_view_stmt = (
+            f'CREATE TEMP VIEW "{double_quote_escape(viewname)}" AS {query}'
+        )
+        logger.debug(Color.quiet_sql(create_view_stmt))
+        self.con.execute(text(create_view_stmt))
+        self.temp_views.add(viewname)
+
+    def _drop_temp_view(self, viewname: str):
+        """Drops `viewname` (and its `row_index_twin()`), if we created it."""
+        for name in (viewname, row_index_twin(viewname)):
+            if name in self.temp_views:
+                self.con.execute(text(f'DROP VIEW "{double_quote_escape(name)}"'))
+                self.temp_views.discard(name)
+
+    def _bulk_insert(self, df: pl.DataFrame, tablename: str):
+        """Inserts the rows of `df` into the existing table `tablename`.
+        Subclasses override this with a faster loader for their dialect.
+        """
+        pd_df = df.to_pandas(use_pyarrow_extension_array=True)
         # Polars today just uses `pd.to_sql` if we pass a sqlalchemy connection
         # https://docs.pola.rs/api/python/stable/reference/api/polars.DataFrame.write_database.html
         # So, `polars.DataFrame.write_database` isn't any faster
@@ -172,9 +332,11 @@ class SQLAlchemyDatabase(Database):
             query: The SQL query to execute. Can use `named` paramstyle from PEP 249
                 https://peps.python.org/pep-0249/#paramstyle
             params: Dict containing mapping from name to value.
+                Defaults to the parameters bound via `bind()`.
+            lazy: Whether to return a `pl.LazyFrame`, instead of a `pl.DataFrame`
 
         Returns:
-            pd.DataFrame
+            pl.LazyFrame | pl.DataFrame
 
         Examples:
             ```python
@@ -183,20 +345,36 @@ class SQLAlchemyDatabase(Database):
             db.execute_query("SELECT * FROM t WHERE c = :v", {"v": "value"})
             ```
         """
+        params = select_referenced_params(
+            query, params if params is not None else self.bound_params
+        )
+        result = self.con.execute(text(query), params)
         # DuckDB doesn't allow duplicate column names, but other databases do
         # So on a join, where we have the same colum in diff tables,
         #   we may get the same columnname appearing twice. Polars raises an error at this.
-        df_pandas = pd.read_sql(text(query), self.con, params=params)
-        cols = pd.Series(df_pandas.columns)
-        for dup in cols[cols.duplicated()].unique():
-            mask = cols == dup
-            cols[mask] = [f"{dup}_{i}" if i != 0 else dup for i in range(mask.sum())]
-        df_pandas.columns = cols
-        return pl.LazyFrame(df_pandas) if lazy else pl.DataFrame(df_pandas)
-
-    def execute_to_list(self, query: str, to_type: Callable = lambda x: x) -> list:
+        columnnames = deduplicate_columnnames(list(result.keys()))
+        cursor = result.cursor
+        if result.returns_rows and hasattr(cursor, "fetch_arrow_table"):
+            # Drivers like ADBC hand over columnar Arrow data, without any Python rows
+            df = pl.from_arrow(cursor.fetch_arrow_table().rename_columns(columnnames))
+        else:
+            # Build the frame straight from the driver's rows, skipping SQLAlchemy's
+            #   per-row `Row` objects and a round-trip through pandas
+            rows = cursor.fetchall() if result.returns_rows else []
+            df = frame_from_rows(rows, columnnames)
+        result.close()
+        # Columns with no values to infer a type from are strings, as with `pd.read_sql`
+        df = df.with_columns(pl.col(pl.Null).cast(pl.String))
+        return df.lazy() if lazy else df
+
+    def execute_to_list(
+        self, query: str, to_type: Callable = lambda x: x, params: dict | None = None
+    ) -> list:
         """A lower-level execute method that doesn't use the pandas processing logic.
         Returns results as a tuple.
         """
-        result = self.con.execute(text(query)).fetchall()
+        params = select_referenced_params(
+            query, params if params is not None else self.bound_params
+        )
+        result = self.con.execute(text(query), params).fetchall()
         return [to_type(row[0]) for row in result]
@@ -1,13 +1,18 @@
 from pathlib import Path
+import polars as pl
 from sqlalchemy.engine import make_url, URL
 from functools import cached_property
 
 from blendsql.db.sqlalchemy import SQLAlchemyDatabase
+from blendsql.db.utils import double_quote_escape, to_bulk_loadable
+
+# Rows passed to each `executemany()` call when loading a temp table
+BULK_INSERT_CHUNK_SIZE = 100_000
 
 
 class SQLite(SQLAlchemyDatabase):
     """A SQLite database connection.
-    Can be initialized viae a path to the database file.
+    Can be initialized viae a path to the database file, or `":memory:"` for an in-memory database.
 
     Examples:
         ```python
@@ -17,13 +22,37 @@ class SQLite(SQLAlchemyDatabase):
     """
 
     def __init__(self, db_path: str):
-        db_url: URL = make_url(f"sqlite:///{Path(db_path).resolve()}")
+        if db_path == ":memory:":
+            db_url: URL = make_url("sqlite://")
+        else:
+            db_url = make_url(f"sqlite:///{Path(db_path).resolve()}")
         super().__init__(db_url=db_url)
 
     def has_temp_table(self, tablename: str) -> bool:
         return tablename in self.execute_to_list(
-            "SELECT name FROM sqlite_temp_master WHERE type='table';"
+            "SELECT name FROM sqlite_temp_master WHERE type IN ('table', 'view');"
+        )
+
+    def _bulk_insert(self, df: pl.DataFrame, tablename: str):
+        """Inserts rows straight from polars' column buffers with `executemany()`,
+        in the connection's open transaction, instead of via pandas.
+        """
+        loadable_df = to_bulk_loadable(df)
+        if loadable_df is None:
+            return super()._bulk_insert(df, tablename)
+        # Store dates the way SQLAlchemy's SQLite `DATE` and `DATETIME` types do
+        loadable_df = loadable_df.with_columns(
+            pl.col(pl.Date).dt.to_string("%Y-%m-%d"),
+            pl.col(pl.Datetime).dt.to_string("%Y-%m-%d %H:%M:%S%.6f"),
         )
+        insert_stmt = f'INSERT INTO "{double_quote_escape(tablename)}" VALUES ({", ".join("?" * loadable_df.width)})'
+        # Skip SQLAlchemy's per-row parameter handling, and go straight to the driver
+        cursor = self.con.connection.cursor()
+        try:
+            for chunk in loadable_df.iter_slices(BULK_INSERT_CHUNK_SIZE):
+                cursor.executemany(insert_stmt, chunk.rows())
+        finally:
+            cursor.close()
 
     @cached_property
     def sqlglot_schema(self) -> dict:
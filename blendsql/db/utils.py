@@ -68,10 +68,91 @@ def format_tuple(value: tuple, wrap_in_parentheses: bool | None = True):
     return formatted
 
 
+def select_referenced_params(
+    query: str, params: dict | None, marker: str = ":"
+) -> dict | None:
+    """Returns the subset of `params` whose names are referenced in `query`
+    via `{marker}name` placeholders. Some drivers (e.g. DuckDB) raise an error when
+    passed parameters the statement doesn't use.
+    """
+    if not params:
+        return None
+    referenced = set(re.findall(re.escape(marker) + r"(\w+)", query))
+    return {k: v for k, v in params.items() if k in referenced} or None
+
+
 def select_all_from_table_query(tablename: str) -> str:
     return f'SELECT * FROM "{double_quote_escape(tablename)}";'
 
 
+# Temp objects without a `rowid` of their own (registered Arrow data, views) keep a twin relation,
+#   named by `row_index_twin()`, holding the same rows plus their position in this column.
+#   Reading from the twin gives deterministic execution the same insertion order as a temp table.
+ROW_INDEX_COLUMN = "__blendsql_row_index__"
+
+
+def row_index_twin(tablename: str) -> str:
+    return f"{tablename}__row_index"
+
+
+def deduplicate_columnnames(columnnames: list[str]) -> list[str]:
+    """Renames repeated column names to `{name}_{i}`, keeping the first as-is.
+    E.g. a join selecting `id` from two tables gives `["id", "id_1"]`.
+    """
+    seen: dict[str, int] = {}
+    deduplicated = []
+    for name in columnnames:
+        count = seen.get(name, 0)
+        seen[name] = count + 1
+        deduplicated.append(f"{name}_{count}" if count else name)
+    return deduplicated
+
+
+def frame_from_rows(rows: list[tuple], columnnames: list[str]) -> pl.DataFrame:
+    """Builds a frame from driver rows.
+    SQLite lets a column hold values of different types (e.g. integers and blobs),
+    which may have no common polars type. Those columns are read as strings.
+    """
+    try:
+        return pl.DataFrame(
+            rows, schema=columnnames, orient="row", infer_schema_length=None
+        )
+    except pl.exceptions.PolarsError:
+        pass
+    columns = []
+    for idx, name in enumerate(columnnames):
+        values = [row[idx] for row in rows]
+        column = pl.Series(name, values, strict=False)
+        if column.dtype == pl.Object:
+            column = pl.Series(
+                name,
+                [
+                    None
+                    if v is None
+                    else v.decode(errors="replace")
+                    if isinstance(v, bytes)
+                    else str(v)
+                    for v in values
+                ],
+                dtype=pl.String,
+            )
+        columns.append(column)
+    return pl.DataFrame(columns)
+
+
+def to_bulk_loadable(df: pl.DataFrame) -> pl.DataFrame | None:
+    """Returns `df` with only scalar columns a bulk loader can write as-is
+    (categoricals become strings), or `None` if it has columns they can't.
+    """
+    if any(
+        dtype.is_nested()
+        or dtype.base_type() in (pl.Object, pl.Binary, pl.Decimal, pl.Time, pl.Duration)
+        for dtype in df.dtypes
+    ):
+        return None
+    return df.with_columns(pl.col(pl.Categorical, pl.Enum).cast(pl.String))
+
+
 def truncate_df_content(df: pl.DataFrame, truncation_limit: int) -> pl.DataFrame:
     # Truncate long strings
     return df.with_columns(
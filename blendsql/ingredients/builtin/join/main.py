@@ -1,4 +1,3 @@
-import os
 from typing import Callable
 import json
 from pathlib import Path
@@ -7,7 +6,6 @@ from textwrap import dedent
 import asyncio
 from guidance._grammar import select
 
-from blendsql.configure import DEFAULT_ASYNC_LIMIT, ASYNC_LIMIT_KEY
 from blendsql.models.model_base import ModelBase
 from blendsql.common.logger import logger, Color
 from blendsql.common.typing import GenerationResult, GenerationItem
@@ -139,9 +137,7 @@ class LLMJoin(JoinIngredient):
             # Default to 1 few-shot example in LLMJoin
             few_shot_retriever = lambda *_: DEFAULT_JOIN_FEW_SHOT[:1]
 
-        n_parallel = int(os.getenv(ASYNC_LIMIT_KEY, DEFAULT_ASYNC_LIMIT))
         cancel_event = asyncio.Event()
-        semaphore = asyncio.Semaphore(n_parallel)
         left_values = sorted(list(left_values))
         right_values = sorted(list(right_values))
         current_example = JoinExample(
@@ -177,18 +173,25 @@ class LLMJoin(JoinIngredient):
 
         items_to_process: list[GenerationItem] = []
 
-        for left_value in left_values:
-            cache_key = None
-            if model.caching:
-                cache_key = model.make_cache_key(
+        cache_keys: dict[str, str] = {}
+        cached_responses: dict[str, str] = {}
+        if model.caching:
+            cache_keys = {
+                left_value: model._create_key(
                     MAIN_INSTRUCTION,
                     curr_example_str,
                     few_shot_str,
                     left_value=left_value,
                 )
-                if cache_key in model.cache:
-                    mapping[left_value] = model.cache[cache_key]
-                    continue
+                for left_value in left_values
+            }
+            cached_responses = model.check_cache_many(list(cache_keys.values()))
+
+        for left_value in left_values:
+            cache_key = cache_keys.get(left_value)
+            if cache_key in cached_responses:
+                mapping[left_value] = cached_responses[cache_key]
+                continue
 
             items_to_process.append(
                 GenerationItem(
@@ -207,25 +210,24 @@ class LLMJoin(JoinIngredient):
         # Track active tasks
         active_tasks: dict[asyncio.Task, GenerationItem] = {}
         items_submitted = 0
-        items_completed = 0
+        pending_cache_writes: dict[str, str] = {}
 
         async def process_item(item: GenerationItem) -> GenerationResult | None:
-            async with semaphore:
-                if cancel_event.is_set():
-                    return None
+            if cancel_event.is_set():
+                return None
 
-                # Generate with constrained grammar
-                return await model.generate(
-                    item,
-                    cancel_event=cancel_event,
-                )
+            # Generate with constrained grammar
+            return await model.limited_generate(
+                item,
+                cancel_event=cancel_event,
+            )
 
         def submit_next_items():
-            """Submit items up to n_parallel concurrency."""
+            """Submit items up to the model's current concurrency limit."""
             nonlocal items_submitted
 
             while (
-                len(active_tasks) < n_parallel
+                len(active_tasks) < model.limiter.limit
                 and items_submitted < len(items_to_process)
                 and not cancel_event.is_set()
             ):
@@ -238,37 +240,45 @@ class LLMJoin(JoinIngredient):
         submit_next_items()
 
         # Process as tasks complete
-        while active_tasks:
-            done, _ = await asyncio.wait(
-                active_tasks.keys(),
-                return_when=asyncio.FIRST_COMPLETED,
-            )
-
-            for task in done:
-                item = active_tasks.pop(task)
+        try:
+            while active_tasks:
+                done, _ = await asyncio.wait(
+                    active_tasks.keys(),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
 
-                try:
-                    result = task.result()
-                except asyncio.CancelledError:
-                    continue
+                for task in done:
+                    item = active_tasks.pop(task)
 
-                if result is None:
-                    continue
+                    try:
+                        result = task.result()
+                    except asyncio.CancelledError:
+                        continue
 
-                items_completed += 1
+                    if result is None:
+                        continue
 
-                mapping[result.identifier] = result.value.removeprefix(grammar_prefix)
+                    mapping[result.identifier] = result.value.removeprefix(
+                        grammar_prefix
+                    )
 
-                # Cache the result
-                if model.caching and item.cache_key is not None:
-                    model.cache[item.cache_key] = result.matched_value
+                    # Cache the result
+                    if model.caching and item.cache_key is not None:
+                        pending_cache_writes[item.cache_key] = mapping[
+                            result.identifier
+                        ]
 
-            if cancel_event.is_set():
-                break
+                if cancel_event.is_set():
+                    break
 
-            submit_next_items()
+                submit_next_items()
+        finally:
+            # On an error, don't leave requests running on the shared event loop
+            for t in active_tasks:
+                t.cancel()
 
-        model.num_generation_calls += items_completed
+        if pending_cache_writes:
+            model.cache.set_many(pending_cache_writes)
 
         final_mapping = {k: v for k, v in mapping.items() if v != "-"}
         logger.debug(
@@ -1,7 +1,10 @@
 import logging
 import os
+import math
 import asyncio
-from typing import Callable, Generator, Literal
+from collections import deque
+from contextlib import nullcontext
+from typing import Any, Callable, Generator, Iterable, Literal
 import json
 import polars as pl
 import pandas as pd
@@ -15,11 +18,12 @@ from guidance.library import substring
 from guidance import regex as guidance_regex
 
 from blendsql.models.model_base import ModelBase
+from blendsql.models.cache import CACHE_BATCH_SIZE
 from rich.markup import escape
 from blendsql.common.logger import logger, Color
 from blendsql.common.constants import DEFAULT_CONTEXT_FORMATTER
 from blendsql.ingredients.ingredient import MapIngredient
-from blendsql.common.exceptions import LMFunctionException
+from blendsql.common.exceptions import LMFunctionException, BatchPending
 from blendsql.common.typing import (
     DataType,
     QuantifierType,
@@ -30,6 +34,7 @@ from blendsql.common.typing import (
 from blendsql.ingredients.utils import (
     partialclass,
     gen_list,
+    gen_batch,
     _wrap_with_quotes,
     get_python_type,
     parse_quantifier,
@@ -41,8 +46,6 @@ from blendsql.configure import (
     DEFAULT_MAX_OPTIONS_IN_PROMPT,
     MAX_TOKENS_KEY,
     DEFAULT_MAX_TOKENS,
-    ASYNC_LIMIT_KEY,
-    DEFAULT_ASYNC_LIMIT,
 )
 from blendsql.types import prepare_datatype, apply_type_conversion
 from blendsql.search.searcher import Searcher
@@ -50,9 +53,30 @@ from .prompts import (
     FeatureType,
     BASE_RETURN_TYPE_TO_EXAMPLE,
     BASE_RETURN_TYPE_TO_INSTRUCTION,
+    BATCH_INSTRUCTION,
 )
 
 
+def _parse_batch_answers(s: str, n: int) -> list | None:
+    """Parses the JSON array (or object) of `n` answers to a batched prompt.
+    Returns None if we didn't get exactly `n` answers back.
+    """
+    s = s.strip().removeprefix("```json").removeprefix("```").removesuffix("```")
+    try:
+        answers = json.loads(s)
+    except json.JSONDecodeError:
+        return None
+    if isinstance(answers, dict):
+        answers = list(answers.values())
+    if not isinstance(answers, list) or len(answers) != n:
+        return None
+    # `apply_type_conversion` expects the string form of each answer
+    return [
+        a if isinstance(a, str) else json.dumps(a) if isinstance(a, list) else str(a)
+        for a in answers
+    ]
+
+
 @dataclass
 class LLMMap(MapIngredient):
     model: ModelBase = field(default=None)
@@ -61,6 +85,9 @@ class LLMMap(MapIngredient):
         default=DEFAULT_CONTEXT_FORMATTER,
     )
     prompt_style: Literal["basic", "python"] = "basic"
+    share_prompt_prefix: bool = field(default=False)
+    batch_size: int | None = field(default=None)
+    early_exit_priority: Callable[[str], float] | None = field(default=None)
 
     @classmethod
     def from_args(
@@ -71,6 +98,9 @@ class LLMMap(MapIngredient):
         options_searcher: Searcher | None = None,
         context_searcher: Searcher | None = None,
         prompt_style: Literal["basic", "python"] = "basic",
+        share_prompt_prefix: bool = False,
+        batch_size: int | None = None,
+        early_exit_priority: Callable[[str], float] | None = None,
     ):
         """Creates a partial class with predefined arguments.
 
@@ -86,6 +116,17 @@ class LLMMap(MapIngredient):
                 )
                 ```
             prompt_style: One of 'python' or 'xml'. Controls the prompt format sent to the model.
+            share_prompt_prefix: Send the instructions and examples shared by all values as a separate,
+                byte-identical system message, with only the per-value continuation in the user message.
+                This lets provider-side prefix caching (e.g. vLLM automatic prefix caching, Anthropic prompt caching)
+                hit reliably. Savings are reported in `SmoothieMeta.cached_tokens`.
+            batch_size: If set, packs up to `batch_size` values into a single prompt, constraining the output
+                to a JSON array with one answer per value. Values from a batch that fails to parse are retried
+                one at a time. Not used for `substring` or JSON return types, `regex`, `options_searcher`, or image/audio values.
+            early_exit_priority: When the query lets us exit early (e.g. `WHERE {{LLMMap(...)}} = TRUE LIMIT 5`),
+                values are sent in ascending order of this score, so the exit condition is met with as few generations as possible.
+                Takes a value, and returns a score, e.g. its distance to the question in a search index.
+                Defaults to sending the shortest inputs (the cheapest to generate for) first.
 
         Returns:
             Type[MapIngredient]: A partial class of MapIngredient with predefined arguments.
@@ -132,6 +173,9 @@ class LLMMap(MapIngredient):
                 return_type_to_example=return_type_to_example,
                 context_searcher=context_searcher,
                 prompt_style=prompt_style,
+                share_prompt_prefix=share_prompt_prefix,
+                batch_size=batch_size,
+                early_exit_priority=early_exit_priority,
             )
         )
 
@@ -153,6 +197,8 @@ class LLMMap(MapIngredient):
         quantifier: QuantifierType = None,
         return_type: DataType | str | None = None,
         regex: str | None = None,
+        min_confidence: float | None = None,
+        return_confidence: bool = False,
         exit_condition_func: Callable = None,
         exit_condition_required_values: int = None,
         enable_constrained_decoding: bool = True,
@@ -168,6 +214,14 @@ class LLMMap(MapIngredient):
             example_outputs: This gives the Model an example of the output we expect.
             return_type: In the absence of example_outputs, give the Model some signal as to what we expect as output.
             regex: Optional regex to constrain answer generation.
+            min_confidence: If set, answers the model gives with a lower probability (judged by its token logprobs)
+                are left `NULL`, so they can be filtered out (or found for review) in SQL, e.g.
+                `{{LLMMap('Is this a famous singer?', p.Name, min_confidence=0.8)}} = TRUE`.
+                Answers are cached along with their confidence, so changing the threshold doesn't re-generate them.
+                Requires an OpenAI-compatible endpoint which returns logprobs.
+            return_confidence: If True, returns how sure the model is of its answer to each value (a probability
+                between 0 and 1, from its token logprobs) instead of the answer itself. Shares the cached answers
+                (and their confidence) of the same `LLMMap` with `min_confidence`.
 
         Returns:
             Iterable[Any] containing the output of the Model for each value.
@@ -256,6 +310,8 @@ class LLMMap(MapIngredient):
             filtered_options = self.options_searcher(documents)
 
         is_list_output = resolved_return_type.quantifier is not None
+        # Return types like `bool` carry their own regex, which batching can handle
+        has_custom_regex = regex is not None
         regex = regex or resolved_return_type.regex
         quantifier = resolved_return_type.quantifier
 
@@ -266,7 +322,9 @@ class LLMMap(MapIngredient):
                 "MapIngredient exception!\nCan't have both `options` and `regex` argument passed."
             )
 
-        n_parallel = int(os.getenv(ASYNC_LIMIT_KEY, DEFAULT_ASYNC_LIMIT))
+        # Hard cap on concurrent requests from this call.
+        #   Otherwise, `model.limiter` decides how many requests are in flight.
+        n_parallel: int | None = None
 
         grammar = None
         grammar_suffix = "\n"
@@ -388,6 +446,13 @@ class LLMMap(MapIngredient):
             elif not _grammar_depends_on_value:
                 _precomputed_grammar = grammar(None)
 
+        # With constrained decoding, these come back as a handful of tokens,
+        #   so models can skip streaming them
+        is_short_output = not is_list_output and (
+            options is not None
+            or resolved_return_type.name in ("bool", "int", "float", "DateString")
+        )
+
         return_type_to_example = BASE_RETURN_TYPE_TO_EXAMPLE | (
             self.return_type_to_example or dict()
         )
@@ -496,12 +561,84 @@ class LLMMap(MapIngredient):
                 f"Unknown prompt style: {self.prompt_style}\nValid arguments are ['python', 'basic']"
             )
         lm_mapping: dict = {}  # Final type-cast results
-        all_processed_identifiers: list[str] = []
+        # Identifier of each value, by its position in `values`
+        processed_identifiers: list[str | None] = [None] * len(values)
 
-        def generate_items() -> Generator[GenerationItem, None, None]:
-            """Lazily yields items, checking cache as we go."""
-            grammar_is_collection = hasattr(grammar, "__getitem__")
-            for idx, (q, v, a, a_columnnames, a_tablenames, c, o) in enumerate(
+        if model.batch is not None and return_confidence:
+            raise LMFunctionException(
+                "`return_confidence` isn't supported in batch mode, since batch jobs don't return logprobs"
+            )
+        if min_confidence is not None and model.batch is not None:
+            logger.warning(
+                Color.warning(
+                    "`min_confidence` isn't supported in batch mode, keeping all answers"
+                )
+            )
+            min_confidence = None
+        # With `min_confidence` or `return_confidence`, answers are cached along with their confidence
+        #   (under their own keys), so a cached answer is checked against the threshold instead of being generated again
+        cache_confidence = min_confidence is not None or return_confidence
+        confidence_key = ("confidence",) if cache_confidence else ()
+        num_low_confidence = 0
+        warned_missing_logprobs = False
+
+        def is_below_min_confidence(confidence: float | None) -> bool:
+            return (
+                min_confidence is not None
+                and confidence is not None
+                and confidence < min_confidence
+            )
+
+        def with_cache_lookups(rows: Iterable[tuple]) -> Generator[tuple, None, None]:
+            """Adds the cache key and cached response (if any) to each of `rows`.
+            Lookups are done in batches of `CACHE_BATCH_SIZE`, instead of one round-trip per value.
+            """
+            rows = iter(rows)
+            while chunk := list(islice(rows, CACHE_BATCH_SIZE)):
+                if not model.caching:
+                    yield from ((row, None, None) for row in chunk)
+                    continue
+                cache_keys = [
+                    model._create_key(
+                        prompt,
+                        self.prompt_style,
+                        self.share_prompt_prefix,
+                        question,
+                        regex,
+                        options,
+                        quantifier,
+                        kwargs.get(
+                            "max_tokens",
+                            int(os.getenv(MAX_TOKENS_KEY, DEFAULT_MAX_TOKENS)),
+                        ),
+                        v,
+                        a,
+                        c,
+                        o,
+                        # Use the grammar string if we've already built it,
+                        #   else `_create_key` fingerprints the grammar function
+                        _precomputed_grammars[idx]
+                        if _precomputed_grammars is not None
+                        else _precomputed_grammar or grammar,
+                        *confidence_key,
+                    )
+                    for idx, (_, v, a, _, _, c, o) in chunk
+                ]
+                cached_responses = model.check_cache_many(cache_keys)
+                for row, cache_key in zip(chunk, cache_keys):
+                    yield row, cache_key, cached_responses.get(cache_key)
+
+        def input_size(row: tuple) -> int:
+            q, v, a, _, _, c, _ = row
+            return (
+                len(v)
+                + len(q or "")
+                + len(c or "")
+                + sum(len(str(_a)) for _a in a or ())
+            )
+
+        def input_rows() -> Iterable[tuple]:
+            rows = enumerate(
                 zip(
                     unpacked_questions,
                     values,
@@ -513,7 +650,27 @@ class LLMMap(MapIngredient):
                     context,
                     filtered_options,
                 )
-            ):
+            )
+            if exit_condition_func is None:
+                return rows
+            # We may only need a few of these values, so start with
+            #   the cheapest (or most promising) ones to generate for
+            if self.early_exit_priority is not None:
+                return sorted(rows, key=lambda r: self.early_exit_priority(r[1][1]))
+            return sorted(rows, key=lambda r: input_size(r[1]))
+
+        def generate_items() -> Generator[GenerationItem, None, None]:
+            """Lazily yields items, checking cache as we go."""
+            nonlocal n_satisfied, num_low_confidence
+            rows = with_cache_lookups(input_rows())
+            if exit_condition_func is not None:
+                # Cached values may satisfy the exit condition for free, so see those first
+                rows = sorted(rows, key=lambda r: r[2] is None)
+            for (
+                (idx, (q, v, a, a_columnnames, a_tablenames, c, o)),
+                cache_key,
+                cached_response,
+            ) in rows:
                 # Build identifier
                 curr_identifier = v
                 if a is not None:
@@ -521,37 +678,25 @@ class LLMMap(MapIngredient):
                 if c is not None:
                     curr_identifier += f"_{c}"
 
-                all_processed_identifiers.append(curr_identifier)
-
-                # Check cache
-                cache_key = None
-                if model.caching:
-                    cached_response, cache_key = model.check_cache(
-                        prompt,
-                        self.prompt_style,
-                        question,
-                        regex,
-                        options,
-                        quantifier,
-                        kwargs.get(
-                            "max_tokens",
-                            int(os.getenv(MAX_TOKENS_KEY, DEFAULT_MAX_TOKENS)),
-                        ),
-                        v,
-                        a,
-                        c,
-                        o,
-                        funcs=[
-                            grammar[idx]
-                            if grammar_is_collection and enable_constrained_decoding
-                            else grammar,
-                        ]
-                        if grammar is not None
-                        else None,
-                    )
-                    if cached_response is not None:
-                        lm_mapping[curr_identifier] = cached_response
-                        continue  # Skip - already cached
+                processed_identifiers[idx] = curr_identifier
+
+                if cached_response is not None:
+                    if cache_confidence:
+                        cached_response, confidence = cached_response
+                        if is_below_min_confidence(confidence):
+                            cached_response = None
+                            num_low_confidence += 1
+                        if return_confidence:
+                            cached_response = confidence
+                    lm_mapping[curr_identifier] = cached_response
+                    # Cached values count towards the exit condition, too
+                    if (
+                        exit_condition_func
+                        and cached_response is not None
+                        and exit_condition_func(cached_response)
+                    ):
+                        n_satisfied += 1
+                    continue  # Skip - already cached
 
                 image_urls = []
                 audio_urls = []
@@ -586,7 +731,7 @@ class LLMMap(MapIngredient):
 
                 # Build per-item prompt/continuation.
                 if self.prompt_style == "python":
-                    item_prompt = prompt + format_python_continuation(
+                    continuation = format_python_continuation(
                         value=v,
                         additional_args=a,
                         context=c,
@@ -600,7 +745,7 @@ class LLMMap(MapIngredient):
                         _context = context
                     elif context_in_use_type == FeatureType.LOCAL:
                         _context = c
-                    item_prompt = prompt + format_basic_continuation(
+                    continuation = format_basic_continuation(
                         value=v,
                         column_name=column_name,
                         table_name=table_name,
@@ -616,7 +761,7 @@ class LLMMap(MapIngredient):
 
                 # Get grammar
                 if enable_constrained_decoding and grammar:
-                    if grammar_is_collection:
+                    if _grammar_is_collection:
                         grammar_str = _precomputed_grammars[idx]
                     elif _grammar_depends_on_value:
                         grammar_str = grammar(v)
@@ -625,19 +770,124 @@ class LLMMap(MapIngredient):
                 else:
                     grammar_str = None
 
+                if self.share_prompt_prefix:
+                    item_prefix, item_prompt = prompt, continuation
+                else:
+                    item_prefix, item_prompt = None, prompt + continuation
+
                 yield GenerationItem(
                     identifier=curr_identifier,
                     prompt=item_prompt,
+                    prefix=item_prefix,
                     image_urls=image_urls,
                     audio_urls=audio_urls,
                     assistant_continuation=assistant_continuation,
                     grammar=grammar_str,
                     cache_key=cache_key,
+                    short_output=is_short_output and grammar_str is not None,
+                    logprobs=cache_confidence,
                 )
 
+        batch_size = self.batch_size or 1
+        if batch_size > 1 and (
+            resolved_return_type.name in ("json", "substring")
+            or has_custom_regex
+            or _grammar_is_collection
+            # A batch's logprobs don't tell us how sure the model is of each answer
+            or cache_confidence
+        ):
+            logger.debug(
+                Color.warning(
+                    f"Can't batch values with return type `{resolved_return_type.name}`, regex, options_searcher, min_confidence or return_confidence, ignoring `batch_size={batch_size}`"
+                )
+            )
+            batch_size = 1
+        # Maps `id()` of each batched item to the items of its values
+        batch_members: dict[int, list[GenerationItem]] = {}
+        # Values from batches which failed to parse, to be retried individually
+        retry_items: deque[GenerationItem] = deque()
+        batch_grammars: dict[int, str] = {}
+
+        def make_batch(members: list[GenerationItem]) -> GenerationItem:
+            n = len(members)
+            if enable_constrained_decoding and n not in batch_grammars:
+                item_type = get_python_type(
+                    data_type=resolved_return_type, options=options
+                )
+                if is_list_output:
+                    item_type = list[item_type]
+                batch_grammars[n] = (
+                    gen_batch(item_type, n) + grammar_suffix
+                ).ll_grammar()
+            batch_prompt = BATCH_INSTRUCTION.format(n=n) + "\n\n"
+            for i, member in enumerate(members, start=1):
+                # Strip the shared prompt, if it was prepended to the continuation
+                continuation = (
+                    member.prompt
+                    if member.prefix is not None
+                    else member.prompt[len(prompt) :]
+                )
+                batch_prompt += f"INPUT {i}:\n{continuation.strip()}\n\n"
+            item = GenerationItem(
+                prompt=batch_prompt
+                if self.share_prompt_prefix
+                else prompt + batch_prompt,
+                prefix=prompt if self.share_prompt_prefix else None,
+                grammar=batch_grammars.get(n),
+            )
+            batch_members[id(item)] = members
+            return item
+
+        def batch_items(
+            items: Iterable[GenerationItem],
+        ) -> Generator[GenerationItem, None, None]:
+            """Packs consecutive items into batches of `batch_size`.
+            Items with image or audio inputs are always sent alone.
+            """
+            batch = []
+            for item in items:
+                if item.image_urls or item.audio_urls:
+                    yield item
+                    continue
+                batch.append(item)
+                if len(batch) == batch_size:
+                    yield make_batch(batch)
+                    batch = []
+            if batch:
+                yield make_batch(batch) if len(batch) > 1 else batch[0]
+
+        # Values which satisfied the exit condition, including cached ones
+        n_satisfied = 0
+        # Values we've generated for, and how many of them satisfied the exit condition
+        n_generated_values = 0
+        n_generated_satisfied = 0
         # Track active tasks and their items
         active_tasks: dict[asyncio.Task, GenerationItem] = {}
         item_generator = generate_items()
+        if model.batch is not None:
+            # Offline batch mode: every uncached value goes into a single batch job,
+            #   and we only generate once all of them are finished (via the cache)
+            offline_items = list(item_generator)
+            batch_outputs, pending_job_ids = await model.batch.run(model, offline_items)
+            batch_cache_writes: dict[str, Any] = {}
+            for item in offline_items:
+                if item.cache_key not in batch_outputs:
+                    continue
+                raw_value = batch_outputs[item.cache_key]
+                if grammar_suffix:
+                    raw_value = raw_value.split(grammar_suffix)[0]
+                converted_value = apply_type_conversion(
+                    raw_value, return_type=resolved_return_type, db=self.db
+                )
+                lm_mapping[item.identifier] = converted_value
+                batch_cache_writes[item.cache_key] = converted_value
+            if batch_cache_writes:
+                model.cache.set_many(batch_cache_writes)
+            if pending_job_ids:
+                raise BatchPending(pending_job_ids)
+            item_generator = iter(())
+        elif batch_size > 1:
+            item_generator = batch_items(item_generator)
         generator_exhausted = False
 
         _sentinel = object()
@@ -658,30 +908,63 @@ class LLMMap(MapIngredient):
                         n_parallel = 1
 
         cancel_event = asyncio.Event()
-        semaphore = asyncio.Semaphore(n_parallel)
-        n_satisfied = 0
+        semaphore = (
+            asyncio.Semaphore(n_parallel) if n_parallel is not None else nullcontext()
+        )
         items_submitted = 0
         items_completed = 0
+        # Cache writes are flushed in batches of `CACHE_BATCH_SIZE`
+        pending_cache_writes: dict[str, Any] = {}
 
-        async def process_item(item: GenerationItem) -> GenerationResult | None:
+        async def process_item(
+            item: GenerationItem, is_retry: bool = False
+        ) -> GenerationResult | None:
             async with semaphore:
                 if cancel_event.is_set():
                     return None
-                self.num_values_passed += 1
-                return await model.generate(item, cancel_event)
+                # Values retried individually were already counted with their batch
+                if not is_retry:
+                    self.num_values_passed += len(batch_members.get(id(item), [item]))
+                # Only hand over `cancel_event` if we might actually exit early,
+                #   since it forces a streaming request
+                return await model.limited_generate(
+                    item, cancel_event if exit_condition_func else None
+                )
+
+        def exit_condition_satisfied() -> bool:
+            return bool(exit_condition_func) and (
+                n_satisfied >= exit_condition_required_values
+            )
+
+        def submission_window() -> int:
+            """Keep a few times the current concurrency limit submitted,
+            so there's always an item waiting when a slot frees up.
+
+            If we can exit early, only keep enough submitted to satisfy the rest of
+            the exit condition, judging by how often it's been satisfied so far.
+            """
+            window = (n_parallel or model.limiter.limit) * 3
+            if not exit_condition_func:
+                return window
+            remaining = exit_condition_required_values - n_satisfied
+            # With no results yet, this starts at 1/2
+            satisfaction_rate = (n_generated_satisfied + 1) / (n_generated_values + 2)
+            needed = math.ceil(remaining / satisfaction_rate / batch_size)
+            return max(1, min(window, needed))
 
         def submit_next_items():
-            """Submit items up to n_parallel concurrency."""
             nonlocal generator_exhausted, items_submitted
 
             while (
-                len(active_tasks) < n_parallel * 3
-                and not generator_exhausted
+                len(active_tasks) < submission_window()
+                and (retry_items or not generator_exhausted)
                 and not cancel_event.is_set()
+                and not exit_condition_satisfied()
             ):
                 try:
-                    item = next(item_generator)
-                    task = asyncio.create_task(process_item(item))
+                    is_retry = bool(retry_items)
+                    item = retry_items.popleft() if is_retry else next(item_generator)
+                    task = asyncio.create_task(process_item(item, is_retry))
                     active_tasks[task] = item
                     items_submitted += 1
                 except StopIteration:
@@ -691,7 +974,8 @@ class LLMMap(MapIngredient):
         async with model:
             if logger.level <= logging.DEBUG:
                 pbar = tqdm(
-                    desc=Color.prefix + f"LLMMap with n_parallel={n_parallel}",
+                    desc=Color.prefix
+                    + f"LLMMap with n_parallel={n_parallel or model.limiter.limit}",
                     total=len(values),
                 )
                 # Update for cached items
@@ -722,62 +1006,124 @@ class LLMMap(MapIngredient):
 
                         items_completed += 1
 
-                        # Type conversion
-                        converted_value = apply_type_conversion(
+                        is_low_confidence = False
+                        if cache_confidence and result.completed:
+                            if result.confidence is None:
+                                if not warned_missing_logprobs:
+                                    logger.warning(
+                                        Color.warning(
+                                            f"`min_confidence` or `return_confidence` was passed, but {model.model_name_or_path} didn't return logprobs. Keeping all answers, with a NULL confidence."
+                                        )
+                                    )
+                                    warned_missing_logprobs = True
+                            elif is_below_min_confidence(result.confidence):
+                                is_low_confidence = True
+                                num_low_confidence += 1
+
+                        raw_value = (
                             result.value.split(grammar_suffix)[0]
                             if grammar_suffix
-                            else result.value,
-                            return_type=resolved_return_type,
-                            db=self.db,
+                            else result.value
                         )
-
-                        lm_mapping[result.identifier] = converted_value
-
-                        # Cache result
-                        if model.caching and item.cache_key is not None:
-                            model.cache[item.cache_key] = converted_value
-
-                        if logger.level <= logging.DEBUG:
-                            pbar.update(1)
-
-                        # Check exit condition
-                        if exit_condition_func and result.completed:
-                            if exit_condition_func(converted_value):
-                                n_satisfied += 1
-
-                                if n_satisfied >= exit_condition_required_values:
-                                    logger.debug(
-                                        Color.optimization(
-                                            f"[ 🚪] Exit condition satisfied. Exiting early after processing {items_completed:,} out of {items_submitted:,} items, {len(lm_mapping)} total (including cached)."
-                                        )
+                        members = batch_members.pop(id(item), None)
+                        if members is None:
+                            outputs = [(item, raw_value)]
+                        else:
+                            answers = _parse_batch_answers(raw_value, len(members))
+                            if answers is None:
+                                logger.debug(
+                                    Color.warning(
+                                        f"Failed to parse batched answers, retrying {len(members)} values individually..."
                                     )
-                                    cancel_event.set()
-
-                                    # Cancel pending tasks
-                                    for t in active_tasks:
-                                        t.cancel()
-
-                                    # Wait for cancellations
-                                    if active_tasks:
-                                        await asyncio.gather(
-                                            *active_tasks.keys(), return_exceptions=True
-                                        )
-                                    active_tasks.clear()
-                                    break
+                                )
+                                retry_items.extend(members)
+                                continue
+                            outputs = list(zip(members, answers))
+
+                        for output_item, output_value in outputs:
+                            # Type conversion
+                            converted_value = apply_type_conversion(
+                                output_value,
+                                return_type=resolved_return_type,
+                                db=self.db,
+                            )
+                            cached_value = (
+                                (converted_value, result.confidence)
+                                if cache_confidence
+                                else converted_value
+                            )
+                            if is_low_confidence:
+                                # Leave it `NULL`, instead of keeping an answer the model isn't sure of
+                                converted_value = None
+                            if return_confidence:
+                                converted_value = result.confidence
+
+                            lm_mapping[output_item.identifier] = converted_value
+
+                            # Cache result
+                            if model.caching and output_item.cache_key is not None:
+                                pending_cache_writes[
+                                    output_item.cache_key
+                                ] = cached_value
+                                if len(pending_cache_writes) >= CACHE_BATCH_SIZE:
+                                    model.cache.set_many(pending_cache_writes)
+                                    pending_cache_writes.clear()
+
+                            if logger.level <= logging.DEBUG:
+                                pbar.update(1)
+
+                            # Check exit condition
+                            if exit_condition_func and result.completed:
+                                n_generated_values += 1
+                                if not is_low_confidence and exit_condition_func(
+                                    converted_value
+                                ):
+                                    n_satisfied += 1
+                                    n_generated_satisfied += 1
+
+                        if exit_condition_satisfied():
+                            logger.debug(
+                                Color.optimization(
+                                    f"[ 🚪] Exit condition satisfied. Exiting early after processing {items_completed:,} out of {items_submitted:,} items, {len(lm_mapping)} total (including cached)."
+                                )
+                            )
+                            cancel_event.set()
+
+                            # Cancel pending tasks
+                            for t in active_tasks:
+                                t.cancel()
+
+                            # Wait for cancellations
+                            if active_tasks:
+                                await asyncio.gather(
+                                    *active_tasks.keys(), return_exceptions=True
+                                )
+                            active_tasks.clear()
+                            break
                     if cancel_event.is_set():
                         break
 
                     submit_next_items()
             finally:
+                # On an error, don't leave requests running on the shared event loop
+                for t in active_tasks:
+                    t.cancel()
+                if pending_cache_writes:
+                    model.cache.set_many(pending_cache_writes)
                 if logger.level <= logging.DEBUG:
                     pbar.close()
 
+        # Values we never got to (after exiting early) are `None`
         mapped_values = [
-            lm_mapping.get(identifier, None) for identifier in all_processed_identifiers
+            lm_mapping.get(identifier, None) for identifier in processed_identifiers
         ]
-        # Find difference in length, and fill `None`
-        mapped_values.extend([None] * (len(values) - len(all_processed_identifiers)))
 
+        if num_low_confidence:
+            logger.debug(
+                Color.warning(
+                    f"Left {num_low_confidence:,} answers below `min_confidence` as NULL"
+                )
+            )
         logger.debug(
             lambda: Color._apply_prefix(
                 "[bold yellow]Finished LLMMap[/bold yellow]"
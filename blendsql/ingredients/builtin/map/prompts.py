@@ -14,6 +14,11 @@ PYTHON_INSTRUCTION = (
     "An example is shown below."
 )
 
+BATCH_INSTRUCTION = (
+    "Now, do the same for each of the {n} inputs below. "
+    "Return a JSON array containing exactly {n} answers, in the same order as the inputs."
+)
+
 BASIC_INSTRUCTION = "You are a helpful assistant. You will be presented with some context and a question. "
 BASE_RETURN_TYPE_TO_INSTRUCTION: dict[str, str] = {
     "bool": BASIC_INSTRUCTION
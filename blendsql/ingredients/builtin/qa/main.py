@@ -392,8 +392,10 @@ class LLMQA(QAIngredient):
         else:
             grammar_str = None
 
-        result = await model.generate(
-            GenerationItem(prompt=full_instruction, grammar=grammar_str)
+        result = await model.limited_generate(
+            GenerationItem(
+                prompt=full_instruction, grammar=grammar_str, cache_key=cache_key
+            )
         )
         converted_value = apply_type_conversion(
             result.value.removesuffix(grammar_suffix),
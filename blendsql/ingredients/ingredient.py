@@ -1,13 +1,12 @@
 import os
 import re
-import asyncio
 from dataclasses import dataclass, field
 from abc import abstractmethod
 import pandas as pd
 from sqlglot import exp
 import json
 from typing import Type, Callable, Any
-from collections.abc import Collection, Iterable
+from collections.abc import Collection, Coroutine, Iterable
 import uuid
 import polars as pl
 import inspect
@@ -15,6 +14,7 @@ import inspect
 from blendsql.common.exceptions import LMFunctionException
 from blendsql.common.logger import logger, Color
 from blendsql.common import utils
+from blendsql.common.concurrency import defer, run_interleaved
 from blendsql.common.typing import (
     IngredientType,
     ColumnRef,
@@ -64,13 +64,40 @@ class Ingredient:
     def run(self, *args, **kwargs) -> Any:
         ...
 
-    @abstractmethod
     def __call__(self, *args, **kwargs) -> Any:
+        return run_interleaved([self._acall(*args, **kwargs)])[0]
+
+    @abstractmethod
+    async def _acall(self, *args, **kwargs) -> Any:
+        """The body of `__call__()`. Synchronous apart from `_arun()`,
+        so that `run_interleaved()` can run it alongside other ingredient calls.
+        """
         ...
 
-    def _run(self, *args, **kwargs):
+    @property
+    def _call_impl(self) -> Callable:
+        """What a call to this ingredient runs, and so whose signature its arguments are bound to:
+        `_acall()`, unless a subclass wraps `__call__()`.
+        """
+        if type(self).__call__ is Ingredient.__call__:
+            return self._acall
+        return self.__call__
+
+    def _interleaved_call(self, *args, **kwargs) -> Coroutine:
+        """Returns this call as a coroutine for `run_interleaved()`."""
+        call_impl = self._call_impl
+        if inspect.iscoroutinefunction(call_impl):
+            return call_impl(*args, **kwargs)
+
+        # A subclass wraps `__call__()`, so its generation work can't be deferred
+        async def call():
+            return call_impl(*args, **kwargs)
+
+        return call()
+
+    async def _arun(self, *args, **kwargs):
         result = self.run(*args, **kwargs)
-        return asyncio.run(result) if inspect.iscoroutinefunction(self.run) else result
+        return await defer(result) if inspect.iscoroutinefunction(self.run) else result
 
     @staticmethod
     def _maybe_set_name_to_var_name(partial_cls):
@@ -140,13 +167,11 @@ class Ingredient:
                 .to_list()
             )
         else:
-            unpacked_values: list = [
-                str(i)
-                for i in self.db.execute_to_list(
-                    f'SELECT DISTINCT "{colname}" FROM "{tablename}"'
-                    + (" ORDER BY rowid" if deterministic else "")
-                )
-            ]
+            query = f'SELECT DISTINCT "{colname}" FROM "{tablename}"'
+            if deterministic:
+                source, order_column = self.db.row_order_source(tablename)
+                query = f'SELECT DISTINCT "{colname}" FROM "{double_quote_escape(source)}" ORDER BY "{order_column}"'
+            unpacked_values: list = [str(i) for i in self.db.execute_to_list(query)]
         return unpacked_values
 
     def maybe_get_temp_table(
@@ -221,8 +246,8 @@ class AliasIngredient(Ingredient):
     ingredient_type: str = IngredientType.ALIAS.value
     allowed_output_types: tuple[Type] = (tuple[str, Collection[Ingredient]],)
 
-    def __call__(self, *args, **kwargs):
-        return self._run(*args, **kwargs)
+    async def _acall(self, *args, **kwargs):
+        return await self._arun(*args, **kwargs)
 
 
 @dataclass
@@ -275,7 +300,7 @@ class MapIngredient(Ingredient):
     def unpack_default_kwargs(self, **kwargs):
         return unpack_default_kwargs(**kwargs)
 
-    def __call__(
+    async def _acall(
         self,
         question: str | None = None,
         values: ColumnRef | None = None,
@@ -283,8 +308,11 @@ class MapIngredient(Ingredient):
         context: str | pd.DataFrame | None = None,
         options: ColumnRef | list | None = None,
         **kwargs,
-    ) -> tuple[str, str, str, pl.LazyFrame]:
-        """Returns tuple with format (arg, tablename, colname, new_table)"""
+    ) -> tuple[str, str, str, pl.LazyFrame, pl.LazyFrame | None]:
+        """Returns tuple with format (arg, tablename, colname, new_table, mapped_table),
+        where `mapped_table` has the new column for each distinct combination of input values,
+        or is `None` if there were no values to map.
+        """
         in_deterministic_mode = bool(
             int(os.getenv(DETERMINISTIC_KEY, DEFAULT_DETERMINISTIC))
         )
@@ -447,8 +475,9 @@ class MapIngredient(Ingredient):
                 self.num_values_passed += materialized_smoothie.meta.num_values_passed
                 original_table = materialized_smoothie.pl().lazy()
             else:
+                source, order_column = self.db.row_order_source(tablename)
                 original_table = self.db.execute_to_df(
-                    f"""SELECT {select_distinct_arg} FROM "{tablename}" ORDER BY rowid"""
+                    f'SELECT {select_distinct_arg} FROM "{double_quote_escape(source)}" ORDER BY "{order_column}"'
                 )
         # Need to be sure the new column doesn't already exist here
         new_arg_column = question or uuid.uuid4().hex[:4]
@@ -458,10 +487,17 @@ class MapIngredient(Ingredient):
             or new_arg_column in prev_subquery_map_columns
         ):
             new_arg_column = "_" + new_arg_column
-
-        suffix = ""
-        if in_deterministic_mode:
-            suffix = " ORDER BY rowid"
+        # Reserve the name, in case another `MapIngredient` is running concurrently
+        prev_subquery_map_columns.add(new_arg_column)
+
+        def ordered(source_tablename: str, where: str = "") -> str:
+            """`FROM` (and, in deterministic mode, `ORDER BY`) clauses to select the rows of `source_tablename`."""
+            if not in_deterministic_mode:
+                return f'FROM "{source_tablename}"{where}'
+            source, order_column = self.db.row_order_source(source_tablename)
+            return (
+                f'FROM "{double_quote_escape(source)}"{where} ORDER BY "{order_column}"'
+            )
 
         distinct_modifier = "DISTINCT" if enable_early_deduplication else ""
 
@@ -475,20 +511,22 @@ class MapIngredient(Ingredient):
             #   if a previous subquery already got to certain values
             if new_arg_column in temp_session_table.collect_schema().names():
                 distinct_values = select_distinct_fn(
-                    f'SELECT {distinct_modifier} {select_distinct_arg} FROM "{temp_session_tablename}" WHERE "{new_arg_column}" IS NULL'
-                    + suffix
+                    f"SELECT {distinct_modifier} {select_distinct_arg} "
+                    + ordered(
+                        temp_session_tablename, f' WHERE "{new_arg_column}" IS NULL'
+                    )
                 )
             # Base case: this is the first time we've used this particular ingredient
             # BUT, temp_session_tablename still exists
             else:
                 distinct_values = select_distinct_fn(
-                    f'SELECT {distinct_modifier} {select_distinct_arg} FROM "{temp_session_tablename}"'
-                    + suffix
+                    f"SELECT {distinct_modifier} {select_distinct_arg} "
+                    + ordered(temp_session_tablename)
                 )
         else:
             distinct_values = select_distinct_fn(
-                f'SELECT {distinct_modifier} {select_distinct_arg} FROM "{value_source_tablename}"'
-                + suffix
+                f"SELECT {distinct_modifier} {select_distinct_arg} "
+                + ordered(value_source_tablename)
             )
 
         if cascade_filter is not None:
@@ -538,7 +576,7 @@ class MapIngredient(Ingredient):
             original_table = original_table.with_columns(
                 pl.lit(None).alias(new_arg_column)
             )
-            return (new_arg_column, tablename, colname, original_table)
+            return (new_arg_column, tablename, colname, original_table, None)
 
         unpacked_options = None
         if options is not None:
@@ -604,7 +642,7 @@ class MapIngredient(Ingredient):
             == 1
         )
 
-        mapped_values = self._run(
+        mapped_values = await self._arun(
             question=question,
             unpacked_questions=unpacked_questions,
             values=unpacked_values,
@@ -625,29 +663,34 @@ class MapIngredient(Ingredient):
 
         # Add new_table to original table
         if additional_args_passed:
+            # We DON'T need to join on cascade_filter_colnames, since these weren't neccesarily operated on in the map call.
+            join_colnames = set([colname]) | set(
+                [i.columnname for i in resolved_additional_args]
+            )
             _mapped_subtable = pl.concat(
                 [distinct_values, mapped_subtable.select(new_arg_column)],
                 how="horizontal",
             )
             if not enable_early_deduplication:
                 _mapped_subtable = _mapped_subtable.unique(
-                    subset=set([colname])
-                    | set([i.columnname for i in resolved_additional_args]),
+                    subset=join_colnames,
                     keep="first",
                 )
             new_table = original_table.join(
                 _mapped_subtable,
                 how="left",
-                # We DON'T need to join on cascade_filter_colnames, since these weren't neccesarily operated on in the map call.
-                on=set([colname])
-                | set([i.columnname for i in resolved_additional_args]),
+                on=join_colnames,
             )
+            mapped_table = _mapped_subtable.select(
+                *join_colnames, new_arg_column
+            ).unique(subset=join_colnames, keep="first")
         else:
             if not enable_early_deduplication:
                 mapped_subtable = mapped_subtable.unique(subset=[colname], keep="first")
             new_table = original_table.join(mapped_subtable, how="left", on=colname)
+            mapped_table = mapped_subtable
         # Now, new table has original columns + column with the name of the question we answered
-        return (new_arg_column, tablename, colname, new_table)
+        return (new_arg_column, tablename, colname, new_table, mapped_table)
 
     @abstractmethod
     def run(self, *args, **kwargs) -> Iterable[Any]:
@@ -689,7 +732,7 @@ class JoinIngredient(Ingredient):
     ingredient_type: str = IngredientType.JOIN.value
     allowed_output_types: tuple[Type] = (dict,)
 
-    def __call__(
+    async def _acall(
         self,
         left_on: str | None = None,
         right_on: str | None = None,
@@ -818,7 +861,7 @@ class JoinIngredient(Ingredient):
             # Some alignment still left to do
             self.num_values_passed += len(left_values) + len(right_values)
 
-            _predicted_mapping: dict[str, str] = self._run(
+            _predicted_mapping: dict[str, str] = await self._arun(
                 left_values=left_values,
                 right_values=right_values,
                 join_criteria=join_criteria,
@@ -869,7 +912,7 @@ class QAIngredient(Ingredient):
     ingredient_type: str = IngredientType.QA.value
     allowed_output_types: tuple[Type] = (str | int | float | tuple | bool,)
 
-    def __call__(
+    async def _acall(
         self,
         question: str | None = None,
         *context: str | pl.DataFrame,
@@ -948,7 +991,7 @@ class QAIngredient(Ingredient):
             # This will now override whatever context we passed
             subtables = []
 
-        response: [str | int | float | tuple] = self._run(
+        response: [str | int | float | tuple] = await self._arun(
             question=question,
             context=subtables if subtables else None,
             options=options,
@@ -975,13 +1018,13 @@ class StringIngredient(Ingredient):
     def unpack_default_kwargs(self, **kwargs):
         return unpack_default_kwargs(**kwargs)
 
-    def __call__(self, identifier: str, *args, **kwargs) -> str:
+    async def _acall(self, identifier: str, *args, **kwargs) -> str:
         tablename, colname = utils.get_tablename_colname(identifier)
         kwargs["tablename"] = tablename
         kwargs["colname"] = colname
         # Don't pass identifier arg, we don't need it anymore
         args = tuple()
-        new_str = self._run(*args, **kwargs)
+        new_str = await self._arun(*args, **kwargs)
         if not isinstance(new_str, str):
             raise LMFunctionException(
                 f"{self.name}.run() should return str\nGot{type(new_str)}"
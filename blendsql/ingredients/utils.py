@@ -146,6 +146,18 @@ def gen_list(
     return guidance_json(schema=schema)
 
 
+def gen_batch(item_type: Any, n: int):
+    """Grammar for a JSON array of exactly `n` answers of type `item_type`."""
+    from pydantic import Field
+    from typing import Annotated
+
+    return guidance_json(
+        schema=TypeAdapter(
+            Annotated[list[item_type], Field(min_length=n, max_length=n)]
+        )
+    )
+
+
 def get_quantifier_wrapper(
     quantifier: str | None,
 ) -> Callable:
@@ -1,6 +1,11 @@
 from .model_base import ModelBase
+from .cache import ModelCache, MemoryCache, DiskCache, KeyValueCache
+from .limiter import ConcurrencyLimiter
+from .batch import BatchBackend, OpenAIBatch, AnthropicBatch, LocalBatch
 from .vllm import VLLM
 from .openai import OpenAI
 from .anthropic import Anthropic
 from .ollama import Ollama
 from .gemini import Gemini
+from .load_balancer import LoadBalancedModel
+from .cascade import CascadeModel
@@ -1,7 +1,9 @@
 import os
 import asyncio
+import httpx
 
 from blendsql.models.model_base import ModelBase
+from blendsql.models.limiter import estimate_tokens
 from blendsql.common.typing import GenerationItem, GenerationResult
 from blendsql.configure import MAX_TOKENS_KEY, DEFAULT_MAX_TOKENS, add_to_global_history
 from .utils import get_base64_string
@@ -25,8 +27,6 @@ class Anthropic(ModelBase):
     def __init__(
         self, model_name_or_path: str, api_key: str | None = None, *args, **kwargs
     ):
-        import anthropic as anthropic_sdk
-
         api_key = api_key or os.getenv("ANTHROPIC_API_KEY")
         super().__init__(
             model_name_or_path=model_name_or_path,
@@ -34,7 +34,18 @@ class Anthropic(ModelBase):
             *args,
             **kwargs,
         )
-        self.client = anthropic_sdk.AsyncAnthropic(api_key=api_key)
+
+    def _create_http_client(self) -> httpx.AsyncClient:
+        from anthropic import DefaultAsyncHttpxClient
+
+        return DefaultAsyncHttpxClient(**self._http_client_kwargs)
+
+    def _create_client(self, http_client: httpx.AsyncClient):
+        from anthropic import AsyncAnthropic
+
+        return AsyncAnthropic(
+            base_url=self.base_url, api_key=self.api_key, http_client=http_client
+        )
 
     async def _format_inputs(
         self, extra_body: dict, item: GenerationItem
@@ -87,35 +98,70 @@ class Anthropic(ModelBase):
 
         return messages, extra_body
 
+    async def _request_body(self, item: GenerationItem) -> dict:
+        messages, _ = await self._format_inputs({}, item)
+        request_kwargs = dict(
+            model=self.model_name_or_path,
+            max_tokens=int(os.getenv(MAX_TOKENS_KEY, DEFAULT_MAX_TOKENS)),
+            messages=messages,
+        )
+        if item.prefix is not None:
+            # Mark the shared prefix as cacheable
+            request_kwargs["system"] = [
+                {
+                    "type": "text",
+                    "text": item.prefix,
+                    "cache_control": {"type": "ephemeral"},
+                }
+            ]
+        return request_kwargs
+
     async def generate(
-        self, item: GenerationItem, cancel_event: asyncio.Event | None = None
+        self,
+        item: GenerationItem,
+        cancel_event: asyncio.Event | None = None,
+        max_retries: int = 3,
     ) -> GenerationResult:
-        max_tokens = int(os.getenv(MAX_TOKENS_KEY, DEFAULT_MAX_TOKENS))
-        messages, _ = await self._format_inputs({}, item)
+        request_kwargs = await self._request_body(item)
+        estimated_tokens = estimate_tokens(item)
+
+        async def attempt() -> GenerationResult:
+            buffer = ""
+            if cancel_event is None and item.short_output:
+                # Nothing to cancel, and only a few tokens to wait for, so skip streaming
+                message = await self.client.messages.create(**request_kwargs)
+                self._record_message_usage(message, estimated_tokens)
+                buffer = "".join(
+                    block.text for block in message.content if block.type == "text"
+                )
+            else:
+                async with self.client.messages.stream(**request_kwargs) as stream:
+                    async for text in stream.text_stream:
+                        if cancel_event and cancel_event.is_set():
+                            self._record_usage(None, estimated_tokens, buffer)
+                            return GenerationResult(
+                                item.identifier, buffer, completed=False
+                            )
+                        buffer += text
+
+                    message = await stream.get_final_message()
+                    self._record_message_usage(message, estimated_tokens)
+
+            add_to_global_history(
+                f"[USER]{item.prefix or ''}{item.prompt}[/USER]\n\n[ASSISTANT]{buffer}[/ASSISTANT]"
+            )
+            return GenerationResult(item.identifier, buffer, completed=True)
 
-        buffer = ""
+        return await self._generate_with_retries(attempt, estimated_tokens, max_retries)
 
-        async with self.client.messages.stream(
-            model=self.model_name_or_path,
-            max_tokens=max_tokens,
-            messages=messages,
-        ) as stream:
-            self.num_generation_calls += 1
-            async for text in stream.text_stream:
-                if cancel_event and cancel_event.is_set():
-                    return GenerationResult(item.identifier, buffer, completed=False)
-                buffer += text
-
-            message = await stream.get_final_message()
-            self.prompt_tokens += message.usage.input_tokens
-            self.completion_tokens += message.usage.output_tokens
-            if (
-                hasattr(message.usage, "cache_read_input_tokens")
-                and message.usage.cache_read_input_tokens
-            ):
-                self.cached_tokens += message.usage.cache_read_input_tokens
-
-        add_to_global_history(
-            f"[USER]{item.prompt}[/USER]\n\n[ASSISTANT]{buffer}[/ASSISTANT]"
+    def _record_message_usage(self, message, estimated_tokens: int) -> None:
+        self.record_usage(
+            num_generation_calls=1,
+            prompt_tokens=message.usage.input_tokens,
+            completion_tokens=message.usage.output_tokens,
+            cached_tokens=getattr(message.usage, "cache_read_input_tokens", None) or 0,
+        )
+        self.rate_limiter.reconcile(
+            estimated_tokens,
+            message.usage.input_tokens + message.usage.output_tokens,
         )
-        return GenerationResult(item.identifier, buffer, completed=True)
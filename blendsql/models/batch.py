@@ -0,0 +1,322 @@
+"""Offline batch mode, for large jobs where cost matters more than latency.
+
+When a model is given a `batch` backend, `LLMMap` sends every value it doesn't have cached
+in a single batch job (e.g. the OpenAI or Anthropic batch APIs), instead of one request per value,
+and raises `BatchPending`. Results are written to the model cache once the job is done,
+so re-running the same query picks them up and completes.
+
+Job handles are persisted under the backend's `directory`, keyed by cache key,
+so a query can be resumed from another process. Runs sharing a directory (in this process or another)
+take turns, through an OS lock on `jobs.json.lock`.
+"""
+import os
+import json
+import uuid
+import asyncio
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from pathlib import Path
+from typing import IO
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from blendsql.common.logger import logger, Color
+from blendsql.common.typing import GenerationItem
+
+
+def _lock_file(path: Path) -> IO:
+    """Blocks until we hold an exclusive lock on `path`, across threads and processes.
+    The lock is held until the returned file is passed to `_unlock_file()`.
+    """
+    f = open(path, "a+")
+    try:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # `LK_LOCK` gives up after ~10 seconds
+                    continue
+    except BaseException:
+        f.close()
+        raise
+    return f
+
+
+def _unlock_file(f: IO) -> None:
+    try:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    finally:
+        f.close()
+
+
+class BatchBackend(ABC):
+    """Submits batch jobs to a provider, and collects their results.
+
+    Args:
+        directory: Where to persist the handles of submitted jobs
+    """
+
+    def __init__(self, directory: str | Path):
+        self.directory = Path(directory).expanduser()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.jobs_path = self.directory / "jobs.json"
+        self.lock_path = self.directory / "jobs.json.lock"
+
+    @abstractmethod
+    async def submit(self, model, requests: dict[str, dict]) -> str:
+        """Submits `requests` (request bodies, by ID) as a batch job, and returns its ID."""
+        ...
+
+    @abstractmethod
+    async def poll(
+        self, model, job_id: str
+    ) -> dict[str, tuple[str, dict[str, int] | None]] | None:
+        """Returns the output and token usage (if reported) of each successful request (by ID)
+        once the job has finished, or `None` if it's still running.
+        """
+        ...
+
+    def _load_jobs(self) -> dict[str, str]:
+        if not self.jobs_path.exists():
+            return {}
+        return json.loads(self.jobs_path.read_text())
+
+    def _save_jobs(self, jobs: dict[str, str]) -> None:
+        tmp_path = self.jobs_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(jobs))
+        os.replace(tmp_path, self.jobs_path)
+
+    async def run(
+        self, model, items: list[GenerationItem]
+    ) -> tuple[dict[str, str], list[str]]:
+        """Collects outputs for `items` from finished jobs, and submits a new job
+        for items which haven't been submitted yet (or whose request failed).
+
+        Returns:
+            The output for each finished item, by cache key, and the IDs of unfinished jobs
+        """
+        # `jobs.json` is read and rewritten across awaits, so hold its lock throughout.
+        #   Wait for it in a thread, so we don't block the event loop.
+        acquire = asyncio.ensure_future(asyncio.to_thread(_lock_file, self.lock_path))
+        try:
+            lock = await asyncio.shield(acquire)
+        except asyncio.CancelledError:
+            # Release the lock once the thread gets it
+            acquire.add_done_callback(
+                lambda task: task.cancelled()
+                or task.exception()
+                or _unlock_file(task.result())
+            )
+            raise
+        try:
+            return await self._run(model, items)
+        finally:
+            _unlock_file(lock)
+
+    async def _run(
+        self, model, items: list[GenerationItem]
+    ) -> tuple[dict[str, str], list[str]]:
+        jobs = self._load_jobs()
+        outputs: dict[str, str] = {}
+        pending_jobs: set[str] = set()
+        to_submit: dict[str, GenerationItem] = {}
+        items_by_job: dict[str, list[GenerationItem]] = defaultdict(list)
+        for item in items:
+            if item.cache_key in jobs:
+                items_by_job[jobs[item.cache_key]].append(item)
+            else:
+                to_submit[item.cache_key] = item
+        for job_id, job_items in items_by_job.items():
+            job_outputs = await self.poll(model, job_id)
+            if job_outputs is None:
+                pending_jobs.add(job_id)
+                continue
+            for item in job_items:
+                jobs.pop(item.cache_key)
+                if item.cache_key in job_outputs:
+                    output, usage = job_outputs[item.cache_key]
+                    outputs[item.cache_key] = output
+                    # Only count usage for what we collect, since a job can be shared
+                    #   by items we don't collect here
+                    if usage:
+                        model.record_usage(**usage)
+                else:
+                    to_submit[item.cache_key] = item
+        if to_submit:
+            requests = {
+                key: await model._request_body(item) for key, item in to_submit.items()
+            }
+            job_id = await self.submit(model, requests)
+            logger.debug(
+                Color.update(
+                    f"Submitted batch job {job_id} with {len(requests):,} requests"
+                )
+            )
+            jobs.update({key: job_id for key in requests})
+            pending_jobs.add(job_id)
+        self._save_jobs(jobs)
+        model.record_usage(num_generation_calls=len(outputs))
+        return outputs, sorted(pending_jobs)
+
+
+class OpenAIBatch(BatchBackend):
+    """Uses the OpenAI Batch API, via the model's client."""
+
+    async def submit(self, model, requests: dict[str, dict]) -> str:
+        lines = [
+            json.dumps(
+                {
+                    "custom_id": key,
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": body,
+                }
+            )
+            for key, body in requests.items()
+        ]
+        batch_file = await model.client.files.create(
+            file=("blendsql-batch.jsonl", "\n".join(lines).encode()),
+            purpose="batch",
+        )
+        batch = await model.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        return batch.id
+
+    async def poll(
+        self, model, job_id: str
+    ) -> dict[str, tuple[str, dict[str, int] | None]] | None:
+        batch = await model.client.batches.retrieve(job_id)
+        if batch.status in ("validating", "in_progress", "finalizing", "cancelling"):
+            return None
+        if batch.status != "completed":
+            logger.warning(
+                Color.warning(
+                    f"Batch job {job_id} ended with status `{batch.status}`, resubmitting its requests"
+                )
+            )
+        if batch.output_file_id is None:
+            return {}
+        content = await model.client.files.content(batch.output_file_id)
+        outputs = {}
+        for line in content.text.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            response = record.get("response") or {}
+            if response.get("status_code") != 200:
+                continue
+            body = response["body"]
+            usage = body.get("usage")
+            outputs[record["custom_id"]] = (
+                body["choices"][0]["message"]["content"],
+                {
+                    "prompt_tokens": usage["prompt_tokens"],
+                    "completion_tokens": usage["completion_tokens"],
+                }
+                if usage
+                else None,
+            )
+        return outputs
+
+
+class AnthropicBatch(BatchBackend):
+    """Uses the Anthropic Message Batches API, via the model's client."""
+
+    async def submit(self, model, requests: dict[str, dict]) -> str:
+        batch = await model.client.messages.batches.create(
+            requests=[
+                {"custom_id": key, "params": params} for key, params in requests.items()
+            ]
+        )
+        return batch.id
+
+    async def poll(
+        self, model, job_id: str
+    ) -> dict[str, tuple[str, dict[str, int] | None]] | None:
+        batch = await model.client.messages.batches.retrieve(job_id)
+        if batch.processing_status != "ended":
+            return None
+        outputs = {}
+        async for entry in await model.client.messages.batches.results(job_id):
+            if entry.result.type != "succeeded":
+                continue
+            message = entry.result.message
+            outputs[entry.custom_id] = (
+                "".join(
+                    block.text for block in message.content if block.type == "text"
+                ),
+                {
+                    "prompt_tokens": message.usage.input_tokens,
+                    "completion_tokens": message.usage.output_tokens,
+                },
+            )
+        return outputs
+
+
+class LocalBatch(BatchBackend):
+    """File-based stand-in for a batch API, for testing batch mode without a provider.
+
+    Each submitted job is written to `{directory}/{job_id}.input.jsonl`. The job is finished once
+    `{directory}/{job_id}.output.jsonl` exists, with lines like `{"custom_id": ..., "content": ...}`
+    (and optionally `"usage": {"prompt_tokens": ..., "completion_tokens": ...}`).
+    `complete()` writes that file, given a function to answer each request body.
+    """
+
+    async def submit(self, model, requests: dict[str, dict]) -> str:
+        job_id = f"local-{uuid.uuid4().hex[:12]}"
+        with open(self.directory / f"{job_id}.input.jsonl", "w") as f:
+            for key, body in requests.items():
+                f.write(json.dumps({"custom_id": key, "body": body}) + "\n")
+        return job_id
+
+    async def poll(
+        self, model, job_id: str
+    ) -> dict[str, tuple[str, dict[str, int] | None]] | None:
+        output_path = self.directory / f"{job_id}.output.jsonl"
+        if not output_path.exists():
+            return None
+        with open(output_path) as f:
+            records = [json.loads(line) for line in f if line.strip()]
+        return {r["custom_id"]: (r["content"], r.get("usage")) for r in records}
+
+    def pending_jobs(self) -> list[str]:
+        return sorted(
+            p.name.removesuffix(".input.jsonl")
+            for p in self.directory.glob("*.input.jsonl")
+            if not (self.directory / p.name.replace(".input.", ".output.")).exists()
+        )
+
+    def complete(self, answer, job_id: str | None = None) -> None:
+        """Finishes `job_id` (or all pending jobs), calling `answer` on each request body to get its output."""
+        for pending_job_id in [job_id] if job_id else self.pending_jobs():
+            with open(self.directory / f"{pending_job_id}.input.jsonl") as f:
+                records = [json.loads(line) for line in f if line.strip()]
+            tmp_path = self.directory / f"{pending_job_id}.output.tmp"
+            with open(tmp_path, "w") as f:
+                for record in records:
+                    f.write(
+                        json.dumps(
+                            {
+                                "custom_id": record["custom_id"],
+                                "content": answer(record["body"]),
+                            }
+                        )
+                        + "\n"
+                    )
+            os.replace(tmp_path, self.directory / f"{pending_job_id}.output.jsonl")
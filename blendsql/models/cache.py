@@ -0,0 +1,482 @@
+"""Backends for `ModelBase.cache`, which stores converted model responses keyed by
+`ModelBase._create_key()`.
+
+All backends support a default time-to-live (`ttl`, in seconds) and some form of
+size-based eviction, so that long-running (or distributed) workers stay within
+a bounded footprint.
+"""
+import math
+import pickle
+import hashlib
+import inspect
+import threading
+import time
+import fnmatch
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from textwrap import dedent
+from types import CodeType
+from typing import Any, Callable, Iterable, Iterator
+
+import diskcache
+
+_MISSING = object()
+
+# How many entries ingredients look up (or write) per `get_many` / `set_many` call
+CACHE_BATCH_SIZE = 1024
+
+
+def _sizeof(key: str, value: Any) -> int:
+    return len(key) + len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+@lru_cache(maxsize=1024)
+def _fingerprint_code(code: CodeType) -> bytes:
+    try:
+        source = dedent(inspect.getsource(code)).encode()
+    except (OSError, TypeError):
+        source = code.co_code + repr(code.co_consts).encode()
+    return hashlib.blake2b(source, digest_size=16).digest()
+
+
+def fingerprint_callable(func: Callable) -> bytes:
+    """A fingerprint of a function's source code (and default arguments).
+    New closures created from the same code share a fingerprint, and only the
+    first lookup for a given code object reads its source.
+    """
+    code = getattr(func, "__code__", None)
+    if code is None:
+        return repr(func).encode()
+    return _fingerprint_code(code) + _encode(getattr(func, "__defaults__", None))
+
+
+def _encode(obj: Any) -> bytes:
+    """A canonical byte encoding of `obj`, with type tags and length prefixes
+    so that different values can't encode to the same bytes.
+    Sets and dicts are encoded in sorted order.
+    """
+    if obj is None:
+        return b"N"
+    if isinstance(obj, bool):
+        return b"T" if obj else b"F"
+    if isinstance(obj, str):
+        data = obj.encode()
+        return b"s%d:%s" % (len(data), data)
+    if isinstance(obj, bytes):
+        return b"b%d:%s" % (len(obj), obj)
+    if isinstance(obj, (int, float)):
+        data = repr(obj).encode()
+        return b"n%d:%s" % (len(data), data)
+    if isinstance(obj, (list, tuple)):
+        return b"l%d:" % len(obj) + b"".join(_encode(o) for o in obj)
+    if isinstance(obj, (set, frozenset)):
+        return b"S%d:" % len(obj) + b"".join(sorted(_encode(o) for o in obj))
+    if isinstance(obj, dict):
+        return b"d%d:" % len(obj) + b"".join(
+            sorted(_encode(k) + _encode(v) for k, v in obj.items())
+        )
+    if callable(obj):
+        return b"f" + fingerprint_callable(obj)
+    data = str(obj).encode()
+    return b"o%d:%s" % (len(data), data)
+
+
+def hash_key(*parts: Any) -> str:
+    """Hashes the canonical encoding of `parts` into a cache key."""
+    return hashlib.blake2b(_encode(parts), digest_size=16).hexdigest()
+
+
+class ModelCache(ABC):
+    """Parent class for all model cache backends.
+
+    Subclasses implement `get`, `set`, `delete` and `clear`. The dict-style
+    methods (`key in cache`, `cache[key]`, `cache[key] = value`) are derived from those.
+    Subclasses should also override `get_many` and `set_many` if they can
+    fetch or store a batch of entries in a single round-trip.
+
+    Args:
+        ttl: Default time-to-live for new entries, in seconds. `None` means entries never expire.
+    """
+
+    def __init__(self, ttl: float | None = None):
+        self.ttl = ttl
+
+    @abstractmethod
+    def get(self, key: str, default: Any = None) -> Any:
+        """Returns the value stored at `key`, or `default` if it's missing or expired."""
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: Any, expire: float | None = None) -> None:
+        """Stores `value` at `key`. `expire` overrides the default `ttl` of the cache."""
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> bool:
+        """Removes `key`, returning whether it was present."""
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, Any]:
+        """Returns a dict with the value of each key in `keys` that's present in the cache."""
+        found = {}
+        for key in keys:
+            value = self.get(key, _MISSING)
+            if value is not _MISSING:
+                found[key] = value
+        return found
+
+    def set_many(self, mapping: dict[str, Any], expire: float | None = None) -> None:
+        """Stores each of the key-value pairs in `mapping`."""
+        for key, value in mapping.items():
+            self.set(key, value, expire=expire)
+
+    def close(self) -> None:
+        pass
+
+    def _expire_or_default(self, expire: float | None) -> float | None:
+        return self.ttl if expire is None else expire
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self.set(key, value)
+
+    def __delitem__(self, key: str) -> None:
+        if not self.delete(key):
+            raise KeyError(key)
+
+
+class MemoryCache(ModelCache):
+    """An in-process LRU cache with a byte budget.
+
+    Entry sizes are measured by their pickled size. Once the total exceeds `max_bytes`,
+    the least recently used entries are evicted. A single entry larger than
+    `max_bytes` is never stored.
+
+    Args:
+        max_bytes: Upper bound on the total size of cached entries. Defaults to 64 MiB.
+        ttl: Default time-to-live for new entries, in seconds.
+
+    Examples:
+        ```python
+        from blendsql.models import VLLM, MemoryCache
+
+        model = VLLM("RedHatAI/gemma-3-12b-it-quantized.w4a16", caching=True, cache=MemoryCache(max_bytes=2**20))
+        ```
+    """
+
+    def __init__(self, max_bytes: int = 64 * 2**20, ttl: float | None = None):
+        super().__init__(ttl=ttl)
+        self.max_bytes = max_bytes
+        self.num_bytes = 0
+        # key -> (value, size, expires_at)
+        self._entries: OrderedDict[str, tuple[Any, int, float | None]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            value, _, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._pop(key)
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, Any]:
+        found = {}
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                if entry[2] is not None and entry[2] <= now:
+                    self._pop(key)
+                    continue
+                self._entries.move_to_end(key)
+                found[key] = entry[0]
+        return found
+
+    def set(self, key: str, value: Any, expire: float | None = None) -> None:
+        self.set_many({key: value}, expire=expire)
+
+    def set_many(self, mapping: dict[str, Any], expire: float | None = None) -> None:
+        sizes = {key: _sizeof(key, value) for key, value in mapping.items()}
+        expire = self._expire_or_default(expire)
+        expires_at = None if expire is None else time.monotonic() + expire
+        with self._lock:
+            for key, value in mapping.items():
+                self._pop(key)
+                if sizes[key] > self.max_bytes:
+                    continue
+                self._entries[key] = (value, sizes[key], expires_at)
+                self.num_bytes += sizes[key]
+            while self.num_bytes > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            return self._pop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.num_bytes = 0
+
+    def _pop(self, key: str) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self.num_bytes -= entry[1]
+        return True
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DiskCache(ModelCache):
+    """A persistent, per-host cache built on [diskcache](https://grantjenks.com/docs/diskcache/).
+    This is the default backend for all models.
+
+    Args:
+        directory: Where to store the cache
+        size_limit: Approximate upper bound on the size of the cache on disk, in bytes. Defaults to 1 GiB.
+        ttl: Default time-to-live for new entries, in seconds.
+        eviction_policy: Which entries to evict once `size_limit` is exceeded.
+            See https://grantjenks.com/docs/diskcache/tutorial.html#eviction-policies
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        size_limit: int = 2**30,
+        ttl: float | None = None,
+        eviction_policy: str = "least-recently-stored",
+    ):
+        super().__init__(ttl=ttl)
+        self._cache = diskcache.Cache(
+            str(directory), size_limit=size_limit, eviction_policy=eviction_policy
+        )
+
+    @property
+    def directory(self) -> str:
+        return self._cache.directory
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._cache.get(key, default=default)
+
+    def set(self, key: str, value: Any, expire: float | None = None) -> None:
+        self._cache.set(key, value, expire=self._expire_or_default(expire))
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, Any]:
+        found = {}
+        with self._cache.transact():
+            for key in keys:
+                value = self._cache.get(key, default=_MISSING)
+                if value is not _MISSING:
+                    found[key] = value
+        return found
+
+    def set_many(self, mapping: dict[str, Any], expire: float | None = None) -> None:
+        expire = self._expire_or_default(expire)
+        with self._cache.transact():
+            for key, value in mapping.items():
+                self._cache.set(key, value, expire=expire)
+
+    def delete(self, key: str) -> bool:
+        return self._cache.delete(key)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def close(self) -> None:
+        self._cache.close()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+
+class KeyValueCache(ModelCache):
+    """A cache shared over the network through a Redis-compatible key-value store,
+    so that a fleet of workers can reuse each other's results.
+
+    Values are pickled, and keys are prefixed with `namespace`. Size-based eviction is
+    left to the server (e.g. Redis with `maxmemory` and `maxmemory-policy allkeys-lru`).
+
+    Args:
+        client: Anything implementing the `get`, `mget`, `set(..., px=...)`, `pipeline`,
+            `delete` and `scan_iter` methods of `redis.Redis`. See `LocalKeyValueStore` for a local stand-in.
+        namespace: Prefix for all keys written by this cache
+        ttl: Default time-to-live for new entries, in seconds.
+
+    Examples:
+        ```python
+        from blendsql.models import VLLM, KeyValueCache
+
+        model = VLLM(
+            "RedHatAI/gemma-3-12b-it-quantized.w4a16",
+            caching=True,
+            cache=KeyValueCache.from_url("redis://cache-host:6379/0", ttl=24 * 60 * 60),
+        )
+        ```
+    """
+
+    def __init__(self, client, namespace: str = "blendsql", ttl: float | None = None):
+        super().__init__(ttl=ttl)
+        self.client = client
+        self.namespace = namespace
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "KeyValueCache":
+        try:
+            import redis
+        except ImportError:
+            raise ImportError(
+                "`KeyValueCache.from_url()` requires redis. Install it with `pip install redis`."
+            ) from None
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def _name(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        data = self.client.get(self._name(key))
+        if data is None:
+            return default
+        return pickle.loads(data)
+
+    def set(self, key: str, value: Any, expire: float | None = None) -> None:
+        expire = self._expire_or_default(expire)
+        self.client.set(
+            self._name(key),
+            pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL),
+            px=None if expire is None else max(1, math.ceil(expire * 1000)),
+        )
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, Any]:
+        keys = list(keys)
+        if not keys:
+            return {}
+        values = self.client.mget([self._name(key) for key in keys])
+        return {
+            key: pickle.loads(data)
+            for key, data in zip(keys, values)
+            if data is not None
+        }
+
+    def set_many(self, mapping: dict[str, Any], expire: float | None = None) -> None:
+        if not mapping:
+            return
+        expire = self._expire_or_default(expire)
+        px = None if expire is None else max(1, math.ceil(expire * 1000))
+        pipe = self.client.pipeline(transaction=False)
+        for key, value in mapping.items():
+            pipe.set(
+                self._name(key),
+                pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL),
+                px=px,
+            )
+        pipe.execute()
+
+    def delete(self, key: str) -> bool:
+        return bool(self.client.delete(self._name(key)))
+
+    def clear(self) -> None:
+        names = list(self.client.scan_iter(match=self._name("*")))
+        if names:
+            self.client.delete(*names)
+
+    def close(self) -> None:
+        if hasattr(self.client, "close"):
+            self.client.close()
+
+
+class LocalKeyValueStore:
+    """An in-process stand-in for the subset of the `redis.Redis` client used by `KeyValueCache`.
+    Evicts the least recently used keys once the stored values exceed `maxmemory` bytes,
+    like Redis' `allkeys-lru` policy.
+    """
+
+    def __init__(self, maxmemory: int | None = None):
+        self.maxmemory = maxmemory
+        self.used_memory = 0
+        # name -> (value, expires_at)
+        self._data: OrderedDict[str, tuple[bytes, float | None]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> bytes | None:
+        with self._lock:
+            entry = self._data.get(name)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._pop(name)
+                return None
+            self._data.move_to_end(name)
+            return value
+
+    def mget(self, names: Iterable[str]) -> list[bytes | None]:
+        return [self.get(name) for name in names]
+
+    def pipeline(self, transaction: bool = True) -> "_LocalPipeline":
+        return _LocalPipeline(self)
+
+    def set(self, name: str, value: bytes, px: int | None = None) -> bool:
+        expires_at = None if px is None else time.monotonic() + px / 1000
+        with self._lock:
+            self._pop(name)
+            self._data[name] = (value, expires_at)
+            self.used_memory += len(name) + len(value)
+            while self.maxmemory is not None and self.used_memory > self.maxmemory:
+                self._pop(next(iter(self._data)))
+        return True
+
+    def delete(self, *names: str) -> int:
+        with self._lock:
+            return sum(self._pop(name) for name in names)
+
+    def scan_iter(self, match: str = "*") -> Iterator[str]:
+        with self._lock:
+            names = list(self._data)
+        return (name for name in names if fnmatch.fnmatchcase(name, match))
+
+    def _pop(self, name: str) -> bool:
+        entry = self._data.pop(name, None)
+        if entry is None:
+            return False
+        self.used_memory -= len(name) + len(entry[0])
+        return True
+
+
+class _LocalPipeline:
+    """Buffers `set` calls until `execute()`, like `redis.client.Pipeline`."""
+
+    def __init__(self, store: LocalKeyValueStore):
+        self.store = store
+        self._commands: list[tuple[str, bytes, int | None]] = []
+
+    def set(self, name: str, value: bytes, px: int | None = None) -> "_LocalPipeline":
+        self._commands.append((name, value, px))
+        return self
+
+    def execute(self) -> list[bool]:
+        results = [self.store.set(*command) for command in self._commands]
+        self._commands.clear()
+        return results
@@ -0,0 +1,127 @@
+import asyncio
+import inspect
+from dataclasses import replace
+from typing import Awaitable, Callable
+
+from blendsql.common.logger import logger, Color
+from blendsql.common.typing import GenerationItem, GenerationResult
+from blendsql.models.model_base import ModelBase
+
+Verifier = Callable[[GenerationItem, GenerationResult], "bool | Awaitable[bool]"]
+
+
+class CascadeModel(ModelBase):
+    """Sends each generation request to the cheapest model first, and only passes it on
+    to the next (more expensive) model if the answer looks uncertain.
+
+    By default, an answer is uncertain if its probability (from the model's token logprobs) is below
+    `min_confidence`, so requests to every tier but the last ask for logprobs. This requires an OpenAI-compatible
+    endpoint which returns them (e.g. vLLM); answers without logprobs are always escalated.
+    Alternatively, pass a `verifier`, which takes the item and a tier's result, and returns whether to accept it.
+
+    Each tier's calls, tokens and escalations are reported in `SmoothieMeta.tier_usage`.
+
+    Args:
+        tiers: The models to try, from cheapest to most expensive
+        min_confidence: Probability an answer needs to be accepted, either for all tiers
+            or one per tier (excluding the last, whose answers are always accepted)
+        verifier: Optional callable (or coroutine function) deciding whether to accept a tier's result.
+            Used instead of `min_confidence`.
+        caching: Whether to cache model responses
+
+    Examples:
+        ```python
+        from blendsql.models import VLLM, OpenAI, CascadeModel
+
+        model = CascadeModel(
+            [
+                VLLM("Qwen/Qwen3-0.6B", base_url="http://localhost:8000/v1/"),
+                OpenAI("gpt-4o"),
+            ],
+            min_confidence=0.9,
+        )
+        ```
+    """
+
+    def __init__(
+        self,
+        tiers: list[ModelBase],
+        min_confidence: float | list[float] = 0.9,
+        verifier: Verifier | None = None,
+        *args,
+        **kwargs,
+    ):
+        if len(tiers) < 2:
+            raise ValueError("CascadeModel needs at least two tiers!")
+        if isinstance(min_confidence, (int, float)):
+            min_confidence = [min_confidence] * (len(tiers) - 1)
+        if len(min_confidence) != len(tiers) - 1:
+            raise ValueError(
+                f"Expected one `min_confidence` for each of the first {len(tiers) - 1} tiers, got {len(min_confidence)}"
+            )
+        super().__init__(
+            model_name_or_path="+".join(t.model_name_or_path for t in tiers),
+            *args,
+            **kwargs,
+        )
+        self.tiers = tiers
+        self.min_confidence = list(min_confidence)
+        self.verifier = verifier
+        for tier in tiers:
+            tier._usage_parent = self
+
+    async def accepts(
+        self, tier_idx: int, item: GenerationItem, result: GenerationResult
+    ) -> bool:
+        """Whether `result`, from `self.tiers[tier_idx]`, is certain enough to keep."""
+        if self.verifier is not None:
+            verdict = self.verifier(item, result)
+            if inspect.isawaitable(verdict):
+                verdict = await verdict
+            return bool(verdict)
+        return (
+            result.confidence is not None
+            and result.confidence >= self.min_confidence[tier_idx]
+        )
+
+    async def generate(
+        self,
+        item: GenerationItem,
+        cancel_event: asyncio.Event | None = None,
+        *args,
+        **kwargs,
+    ) -> GenerationResult:
+        last_idx = len(self.tiers) - 1
+        for tier_idx, tier in enumerate(self.tiers):
+            # Ask for logprobs on this request only, so the tier's own settings are left alone
+            tier_item = (
+                replace(item, logprobs=True)
+                if self.verifier is None and tier_idx < last_idx
+                else item
+            )
+            # Each tier admits requests through its own limiter, since they
+            #   can have very different capacities (e.g. a local model and an API)
+            result = await tier._generate_within_limits(tier_item, cancel_event)
+            if (
+                not result.completed
+                or tier_idx == last_idx
+                or await self.accepts(tier_idx, item, result)
+            ):
+                return result
+            tier.record_usage(num_escalations=1)
+            logger.debug(
+                Color.quiet_update(
+                    f"Escalating '{item.identifier}' from {tier.model_name_or_path} (confidence={result.confidence})"
+                )
+            )
+
+    def tier_usage(self) -> list[dict]:
+        return [
+            {"model": tier.model_name_or_path, **tier.execution_usage().as_dict()}
+            for tier in self.tiers
+        ]
+
+    async def close(self):
+        for tier in self.tiers:
+            await tier.close()
+        await super().close()
@@ -0,0 +1,311 @@
+"""Limits on the requests sent to a model endpoint.
+
+`RateLimiter` keeps requests within requests-per-minute and tokens-per-minute quotas.
+
+`ConcurrencyLimiter` adapts the number of concurrent requests to the endpoint's load.
+Each `ModelBase` owns a `ConcurrencyLimiter`, shared by every ingredient call using
+that model. Its limit follows AIMD (additive increase, multiplicative decrease):
+
+- While latency stays close to the best latency we've seen, and we're actually
+    using the current limit, the limit grows by ~1 for each round of requests
+- Once latency starts climbing, the endpoint is queueing our requests, so we hold steady
+- On a rate limit (429), server error (5xx) or timeout, the limit is cut by `backoff_ratio`
+"""
+import os
+import time
+import asyncio
+import threading
+import httpx
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from blendsql.configure import ASYNC_LIMIT_KEY, DEFAULT_ASYNC_LIMIT
+from blendsql.common.typing import GenerationItem
+
+
+def is_overload_error(exc: BaseException) -> bool:
+    """Whether `exc` signals an overloaded endpoint: a 429, 5xx, or a timeout.
+    Works with the OpenAI and Anthropic SDK errors (via `status_code`), aiohttp (via `status`),
+    and timeouts from asyncio or httpx.
+    """
+    if isinstance(exc, (TimeoutError, asyncio.TimeoutError)):
+        return True
+    if "timeout" in type(exc).__name__.lower():
+        return True
+    status = getattr(exc, "status_code", None) or getattr(exc, "status", None)
+    return isinstance(status, int) and (status == 429 or status >= 500)
+
+
+def is_transient_error(exc: BaseException) -> bool:
+    """Whether a request which failed with `exc` is worth sending again:
+    an overload (see `is_overload_error()`), a retry hint from the server, or a dropped stream.
+    Failures to connect at all surface as the SDKs' `APIConnectionError`, which they've already retried.
+    """
+    if is_overload_error(exc) or retry_after_seconds(exc) is not None:
+        return True
+    return isinstance(exc, (ConnectionError, httpx.TransportError))
+
+
+class ConcurrencyLimiter:
+    """Limits concurrent requests to a model, adapting the limit to the endpoint's load.
+    Safe to share across event loops and threads.
+
+    For a fixed limit, set `min_limit == max_limit`.
+
+    Args:
+        initial_limit: Limit to start from. Defaults to `BLENDSQL_ASYNC_LIMIT`
+        min_limit: The limit never drops below this
+        max_limit: The limit never grows above this
+        backoff_ratio: Multiplied with the limit on each overload error
+        latency_tolerance: We only grow the limit while smoothed latency is
+            within this factor of the baseline (best recent) latency
+        smoothing: Weight of the newest latency sample in the moving average
+    """
+
+    def __init__(
+        self,
+        initial_limit: int | None = None,
+        min_limit: int = 1,
+        max_limit: int = 256,
+        backoff_ratio: float = 0.5,
+        latency_tolerance: float = 2.0,
+        smoothing: float = 0.2,
+    ):
+        if initial_limit is None:
+            initial_limit = int(os.getenv(ASYNC_LIMIT_KEY, DEFAULT_ASYNC_LIMIT))
+        if not 1 <= min_limit <= max_limit:
+            raise ValueError(
+                f"Expected 1 <= min_limit <= max_limit, got min_limit={min_limit}, max_limit={max_limit}"
+            )
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_ratio = backoff_ratio
+        self.latency_tolerance = latency_tolerance
+        self.smoothing = smoothing
+
+        self._limit: float = float(min(max(initial_limit, min_limit), max_limit))
+        self._in_flight: int = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._lock = threading.Lock()
+        self._latency: float | None = None
+        self._baseline_latency: float | None = None
+        self._last_backoff: float = float("-inf")
+        self.num_backoffs: int = 0
+
+    @property
+    def limit(self) -> int:
+        """The current concurrency limit."""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        """Number of requests currently holding a slot."""
+        return self._in_flight
+
+    async def acquire(self) -> None:
+        """Wait for a free slot. Every `acquire()` must be paired with a `release()`."""
+        with self._lock:
+            if not self._waiters and self._in_flight < self.limit:
+                self._in_flight += 1
+                return
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    raise
+            if waiter.done() and not waiter.cancelled():
+                # We were handed a slot just before being cancelled
+                self.release()
+            raise
+
+    def release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._wake_waiters()
+
+    def on_success(self, latency: float) -> None:
+        """Report the latency of a completed request, made while holding a slot."""
+        with self._lock:
+            if self._latency is None:
+                self._latency = self._baseline_latency = latency
+            else:
+                self._latency += self.smoothing * (latency - self._latency)
+                # Let the baseline drift up slowly, so one unusually fast
+                #   response doesn't stop us from growing forever
+                self._baseline_latency = min(latency, self._baseline_latency * 1.01)
+            latency_is_flat = (
+                self._latency <= self.latency_tolerance * self._baseline_latency
+            )
+            # Don't grow a limit we aren't using
+            limit_is_used = self._in_flight * 2 >= self._limit
+            if latency_is_flat and limit_is_used:
+                self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+                self._wake_waiters()
+
+    def on_overload(self) -> None:
+        """Report a rate limit, server error or timeout (see `is_overload_error()`)."""
+        with self._lock:
+            now = time.monotonic()
+            # Requests sent in the same round tend to fail together,
+            #   so only back off once per round
+            if now - self._last_backoff < (self._latency or 0.0):
+                return
+            self._last_backoff = now
+            self._limit = max(self.min_limit, self._limit * self.backoff_ratio)
+            self.num_backoffs += 1
+
+    def _wake_waiters(self) -> None:
+        while self._waiters and self._in_flight < self.limit:
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self._in_flight += 1
+            waiter.get_loop().call_soon_threadsafe(self._grant, waiter)
+
+    def _grant(self, waiter: asyncio.Future) -> None:
+        if waiter.done():
+            # Cancelled while the slot was on its way
+            self.release()
+        else:
+            waiter.set_result(None)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(limit={self.limit}, in_flight={self.in_flight})"
+
+
+def retry_after_seconds(exc: BaseException) -> float | None:
+    """The server's retry hint attached to `exc`, in seconds, if any.
+    Reads `retry-after-ms` and `retry-after` (as seconds, or an HTTP date) from the
+    response headers of OpenAI/Anthropic SDK errors, or aiohttp's `ClientResponseError`.
+    """
+    headers = getattr(exc, "headers", None)
+    if headers is None:
+        headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms is not None:
+        try:
+            return max(0.0, float(retry_after_ms) / 1000)
+        except ValueError:
+            pass
+    retry_after = headers.get("retry-after")
+    if retry_after is None:
+        return None
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def estimate_tokens(item: GenerationItem) -> int:
+    """Rough count of the prompt tokens in `item`, at ~4 characters per token."""
+    num_chars = (
+        len(item.prefix or "")
+        + len(item.prompt)
+        + len(item.assistant_continuation or "")
+    )
+    return num_chars // 4 + 1
+
+
+class _TokenBucket:
+    """Refills at `rate_per_minute`, holding at most `burst_seconds` worth of capacity.
+    The level may go negative, when a request turns out larger than its estimate.
+    """
+
+    def __init__(self, rate_per_minute: float, burst_seconds: float):
+        self.rate = rate_per_minute / 60
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def time_until(self, amount: float) -> float:
+        # Requests larger than the whole bucket go through once it's full
+        needed = min(amount, self.capacity) - self.level
+        return max(0.0, needed / self.rate)
+
+
+class RateLimiter:
+    """Admits requests to a model through requests-per-minute and tokens-per-minute
+    token buckets, so large batches run at the quota instead of bursting into 429s.
+    Safe to share across event loops and threads.
+
+    Args:
+        requests_per_minute: Request quota. `None` for no limit
+        tokens_per_minute: Token quota (prompt + completion). `None` for no limit
+        burst_seconds: How many seconds of quota can be spent in a single burst
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float | None = None,
+        tokens_per_minute: float | None = None,
+        burst_seconds: float = 10.0,
+    ):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = (
+            _TokenBucket(requests_per_minute, burst_seconds)
+            if requests_per_minute
+            else None
+        )
+        self._tokens = (
+            _TokenBucket(tokens_per_minute, burst_seconds)
+            if tokens_per_minute
+            else None
+        )
+        self._paused_until: float = 0.0
+        self._lock = threading.Lock()
+
+    async def acquire(self, num_tokens: int = 0) -> None:
+        """Wait until a request with `num_tokens` estimated tokens fits within the quotas."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait = self._paused_until - now
+                for bucket, amount in (
+                    (self._requests, 1),
+                    (self._tokens, num_tokens),
+                ):
+                    if bucket is not None:
+                        bucket.refill(now)
+                        wait = max(wait, bucket.time_until(amount))
+                if wait <= 0:
+                    if self._requests is not None:
+                        self._requests.level -= 1
+                    if self._tokens is not None:
+                        self._tokens.level -= num_tokens
+                    return
+            await asyncio.sleep(wait)
+
+    def reconcile(self, estimated_tokens: int, actual_tokens: int) -> None:
+        """Charge (or refund) the difference between a request's estimated and actual token usage."""
+        if self._tokens is None:
+            return
+        with self._lock:
+            self._tokens.refill(time.monotonic())
+            self._tokens.level = min(
+                self._tokens.capacity,
+                self._tokens.level - (actual_tokens - estimated_tokens),
+            )
+
+    def pause(self, seconds: float) -> None:
+        """Hold all requests for `seconds`, e.g. when the server sends a `Retry-After`."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
@@ -0,0 +1,187 @@
+import time
+import asyncio
+import hashlib
+import threading
+from dataclasses import dataclass, field
+from typing import Collection, Literal
+
+from blendsql.common.logger import logger, Color
+from blendsql.common.typing import GenerationItem, GenerationResult
+from blendsql.models.model_base import ModelBase
+from blendsql.models.limiter import is_overload_error
+
+
+def _is_replica_failure(exc: BaseException) -> bool:
+    """Whether `exc` means the replica itself is struggling, rather than the request being bad."""
+    return (
+        is_overload_error(exc)
+        or isinstance(exc, (ConnectionError, OSError))
+        or "connection" in type(exc).__name__.lower()
+    )
+
+
+@dataclass
+class _ReplicaState:
+    outstanding: int = field(default=0)
+    # Smoothed latency of successful requests, in seconds
+    latency: float | None = field(default=None)
+    consecutive_failures: int = field(default=0)
+    ejected_until: float = field(default=0.0)
+
+
+class LoadBalancedModel(ModelBase):
+    """Spreads generation requests across replicas of the same model,
+    e.g. several vLLM servers behind separate URLs.
+
+    Requests go to the replica with the fewest outstanding requests (`strategy="least_outstanding"`),
+    or the lowest expected wait, given each replica's recent latency (`strategy="latency"`).
+    Items with a shared prompt `prefix` (see `LLMMap.from_args(share_prompt_prefix=True)`) are pinned to
+    the same replica, so its KV-cache can be reused, unless that replica is much busier than the rest.
+
+    When a replica fails with a connection error, rate limit, 5xx or timeout, the request is retried
+    on the other replicas. A replica which fails `max_failures` times in a row is ejected for `ejection_seconds`.
+
+    Token and call counts from all replicas are also recorded on this model, so they show up in `SmoothieMeta`.
+
+    Args:
+        replicas: The models to balance across. Should all serve the same model
+        strategy: How to choose a replica for each request
+        max_failures: Consecutive failures before a replica is ejected
+        ejection_seconds: How long an ejected replica is skipped for
+        caching: Whether to cache model responses
+
+    Examples:
+        ```python
+        from blendsql.models import VLLM, LoadBalancedModel
+
+        model = LoadBalancedModel(
+            [
+                VLLM("Qwen/Qwen3-4B", base_url=f"http://replica-{i}:8000/v1/")
+                for i in range(4)
+            ]
+        )
+        ```
+    """
+
+    def __init__(
+        self,
+        replicas: list[ModelBase],
+        strategy: Literal["least_outstanding", "latency"] = "least_outstanding",
+        max_failures: int = 3,
+        ejection_seconds: float = 30.0,
+        *args,
+        **kwargs,
+    ):
+        if not replicas:
+            raise ValueError("LoadBalancedModel needs at least one replica!")
+        if strategy not in ("least_outstanding", "latency"):
+            raise ValueError(f"Unknown load balancing strategy `{strategy}`")
+        super().__init__(
+            model_name_or_path=replicas[0].model_name_or_path, *args, **kwargs
+        )
+        self.replicas = replicas
+        for replica in replicas:
+            replica._usage_parent = self
+        self.strategy = strategy
+        self.max_failures = max_failures
+        self.ejection_seconds = ejection_seconds
+        self._states = [_ReplicaState() for _ in replicas]
+        # Executions on different event loops (e.g. `aexecute()` and `execute()`) share the replica states
+        self._states_lock = threading.Lock()
+
+    def _healthy_replicas(self, exclude: Collection[int]) -> list[int]:
+        now = time.monotonic()
+        candidates = [i for i in range(len(self.replicas)) if i not in exclude]
+        healthy = [i for i in candidates if self._states[i].ejected_until <= now]
+        # If everything is ejected, better to try an ejected replica than to fail outright
+        return healthy or candidates
+
+    def _cost(self, idx: int) -> float:
+        state = self._states[idx]
+        if self.strategy == "latency":
+            # Replicas we haven't heard back from yet look as fast as the fastest one
+            known = [s.latency for s in self._states if s.latency is not None]
+            latency = state.latency or (min(known) if known else 1.0)
+            return (state.outstanding + 1) * latency
+        return state.outstanding
+
+    def choose_replica(
+        self, item: GenerationItem, exclude: Collection[int] = ()
+    ) -> int:
+        """Returns the index of the replica to send `item` to.
+        Callers should hold `self._states_lock`, so the choice isn't stale by the time it's counted.
+        """
+        candidates = self._healthy_replicas(exclude)
+        if item.prefix is None or len(candidates) == 1:
+            return min(candidates, key=self._cost)
+        # Rendezvous hashing, so a prefix keeps its replica as others come and go.
+        #   We move on to the next-preferred replica if the preferred one is
+        #   carrying much more than its share of outstanding requests.
+        preferred = sorted(
+            candidates,
+            key=lambda i: hashlib.blake2b(
+                f"{i}:{item.prefix}".encode(), digest_size=8
+            ).digest(),
+        )
+        mean_outstanding = sum(self._states[i].outstanding for i in candidates) / len(
+            candidates
+        )
+        for idx in preferred:
+            if self._states[idx].outstanding <= 1.25 * mean_outstanding + 1:
+                return idx
+        return min(candidates, key=self._cost)
+
+    async def generate(
+        self,
+        item: GenerationItem,
+        cancel_event: asyncio.Event | None = None,
+        *args,
+        **kwargs,
+    ) -> GenerationResult:
+        tried: set[int] = set()
+        while True:
+            with self._states_lock:
+                idx = self.choose_replica(item, exclude=tried)
+                replica, state = self.replicas[idx], self._states[idx]
+                state.outstanding += 1
+            start = time.monotonic()
+            try:
+                # Each replica admits requests through its own limiters
+                result = await replica._generate_within_limits(item, cancel_event)
+            except Exception as exc:
+                if not _is_replica_failure(exc):
+                    raise
+                with self._states_lock:
+                    state.consecutive_failures += 1
+                    eject = state.consecutive_failures >= self.max_failures
+                    if eject:
+                        state.ejected_until = time.monotonic() + self.ejection_seconds
+                if eject:
+                    logger.warning(
+                        Color.warning(
+                            f"Ejecting replica {idx} for {self.ejection_seconds}s after {self.max_failures}+ consecutive failures: {exc}"
+                        )
+                    )
+                tried.add(idx)
+                if len(tried) == len(self.replicas):
+                    raise
+                continue
+            finally:
+                with self._states_lock:
+                    state.outstanding -= 1
+            with self._states_lock:
+                state.consecutive_failures = 0
+                state.ejected_until = 0.0
+                if result.completed:
+                    latency = time.monotonic() - start
+                    state.latency = (
+                        latency
+                        if state.latency is None
+                        else state.latency + 0.2 * (latency - state.latency)
+                    )
+            return result
+
+    async def close(self):
+        for replica in self.replicas:
+            await replica.close()
+        await super().close()
@@ -1,23 +1,89 @@
-from typing import Any, Sequence, Callable, Tuple
+from typing import Any, Awaitable, Sequence, Callable, Tuple
 import os
+import math
 from pathlib import Path
-from diskcache import Cache
 import platformdirs
-import hashlib
-import inspect
-from textwrap import dedent
+import time
+import httpx
 import aiohttp
 import asyncio
+import threading
+import concurrent.futures
+from dataclasses import replace
 
 from blendsql.common.logger import logger, Color
 from blendsql.common.typing import GenerationResult, GenerationItem
+from blendsql.models.cache import ModelCache, DiskCache, hash_key
+from blendsql.models.batch import BatchBackend
+from blendsql.models.usage import ModelUsage, UsageCounter, current_execution_usage
+from blendsql.models.limiter import (
+    ConcurrencyLimiter,
+    RateLimiter,
+    is_overload_error,
+    is_transient_error,
+    retry_after_seconds,
+    estimate_tokens,
+)
 from blendsql.configure import MAX_TOKENS_KEY, DEFAULT_MAX_TOKENS, add_to_global_history
 
 CONTEXT_TRUNCATION_LIMIT = 100
 
 
+def _token_logprobs(choice) -> list[float]:
+    """Returns the token logprobs from an OpenAI-style choice (or streamed chunk choice), if it has any."""
+    logprobs = getattr(choice, "logprobs", None)
+    if logprobs is None or not logprobs.content:
+        return []
+    return [token.logprob for token in logprobs.content]
+
+
+def sequence_confidence(token_logprobs: Sequence[float]) -> float | None:
+    """Probability of a whole generation, given the logprobs of its tokens."""
+    if not token_logprobs:
+        return None
+    return math.exp(sum(token_logprobs))
+
+
 class ModelBase:
-    """Parent class for all BlendSQL Models."""
+    """Parent class for all BlendSQL Models.
+
+    Args:
+        caching: Whether to cache model responses
+        cache: Where to cache model responses. Defaults to a `DiskCache` under
+            `platformdirs.user_cache_dir("blendsql")`, keyed by model name, opened on first use.
+            See `blendsql.models.cache` for the other backends.
+        limiter: Limits concurrent requests to this model, across all ingredient calls.
+            Defaults to a `ConcurrencyLimiter` starting at `BLENDSQL_ASYNC_LIMIT`,
+            which adapts to the endpoint's latency and overload errors.
+        requests_per_minute: Request quota for this model's endpoint, if any
+        tokens_per_minute: Token quota (prompt + completion) for this model's endpoint, if any.
+            Requests are admitted through `self.rate_limiter`, using an estimate of their prompt tokens.
+        max_connections: Max number of open connections to the endpoint, per event loop
+        max_keepalive_connections: Max number of idle connections kept open for reuse
+        keepalive_expiry: Seconds an idle connection is kept open. Connections are shared
+            across ingredient calls and queries, so this should outlast the gap between queries.
+            They're bound to the event loop they were opened on, so `execute()` (which runs
+            on a shared background loop) and `aexecute()` (on the caller's loop) each get their own.
+        http2: Whether to use HTTP/2. Requires `pip install httpx[http2]`
+        logprobs: Whether to request token logprobs for every generation, which fill in
+            `GenerationResult.token_logprobs` and `GenerationResult.confidence`.
+            Only supported by OpenAI-compatible endpoints.
+        batch: If set, `LLMMap` sends all the values it doesn't have cached to this `BatchBackend`
+            as a single offline job, and raises `BatchPending` until it's finished.
+            Results are cached, so re-running the query picks them up. Requires `caching=True`.
+
+    Token and call counters (`prompt_tokens`, `num_generation_calls`, etc.) read as running totals
+    since the last `reset_stats()`. Counts for a single query are kept separately, in its `SmoothieMeta`,
+    so one model can be shared by concurrent queries.
+    """
+
+    prompt_tokens = UsageCounter()
+    completion_tokens = UsageCounter()
+    cached_tokens = UsageCounter()
+    num_generation_calls = UsageCounter()
+    num_cache_hits = UsageCounter()
+    num_coalesced_calls = UsageCounter()
+    num_escalations = UsageCounter()
 
     def __init__(
         self,
@@ -27,45 +93,181 @@ class ModelBase:
         extra_body: dict | None = None,
         chat_template_kwargs: dict | None = None,
         caching: bool = False,
+        cache: ModelCache | None = None,
+        limiter: ConcurrencyLimiter | None = None,
+        requests_per_minute: float | None = None,
+        tokens_per_minute: float | None = None,
+        max_connections: int = 1000,
+        max_keepalive_connections: int = 100,
+        keepalive_expiry: float = 60.0,
+        http2: bool = False,
+        logprobs: bool = False,
+        batch: BatchBackend | None = None,
         **kwargs,
     ):
-        from openai import AsyncOpenAI
-
         self.model_name_or_path = model_name_or_path
+        self.total_usage = ModelUsage()
+        # Another model to also record our usage on, e.g. the `LoadBalancedModel` we're a replica of
+        self._usage_parent: ModelBase | None = None
         self.caching = caching
+        self.logprobs = logprobs
+        if batch is not None and not caching:
+            raise ValueError(
+                "Batch mode delivers results through the model cache, so it requires `caching=True`"
+            )
+        self.batch = batch
         self.extra_body = extra_body or dict()
-        self.client = AsyncOpenAI(base_url=base_url, api_key=api_key)
+        self.max_connections = max_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.base_url = base_url
+        self.api_key = api_key
+        self._http_client_kwargs = dict(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            http2=http2,
+        )
+        # One client (and connection pool) per event loop, for the lifetime of the model. See `client`
+        self._clients: dict[asyncio.AbstractEventLoop | None, Any] = {}
+        self._clients_lock = threading.Lock()
+        self._client_override: Any | None = None
         if chat_template_kwargs is None:
             self.chat_template_kwargs = {}
         if "chat_template_kwargs" in self.extra_body:
             self.chat_template_kwargs = self.extra_body.pop("chat_template_kwargs")
-        self.cache = Cache(
-            Path(platformdirs.user_cache_dir("blendsql"))
-            / f"{self.model_name_or_path}.diskcache"
+        # The default `DiskCache` is only opened when first used, since wrappers like
+        #   `LoadBalancedModel` usually leave caching to the models they wrap. See `cache`
+        self._cache = cache
+        self._cache_lock = threading.Lock()
+        self.limiter = limiter or ConcurrencyLimiter()
+        self.rate_limiter = RateLimiter(
+            requests_per_minute=requests_per_minute,
+            tokens_per_minute=tokens_per_minute,
         )
+        # Used to fetch images and audio. Like `self.http_client`, it's long-lived,
+        #   but an aiohttp session is bound to the event loop it was created on.
         self._session: aiohttp.ClientSession | None = None
+        self._session_loop: asyncio.AbstractEventLoop | None = None
+        # Generations currently in flight, by cache key. See `limited_generate()`
+        self._in_flight: dict[str, concurrent.futures.Future] = {}
+        self._in_flight_lock = threading.Lock()
+
+    def _create_http_client(self) -> httpx.AsyncClient:
+        from openai import DefaultAsyncHttpxClient
+
+        return DefaultAsyncHttpxClient(**self._http_client_kwargs)
+
+    def _create_client(self, http_client: httpx.AsyncClient):
+        from openai import AsyncOpenAI
+
+        return AsyncOpenAI(
+            base_url=self.base_url, api_key=self.api_key, http_client=http_client
+        )
+
+    @property
+    def cache(self) -> ModelCache:
+        if self._cache is None:
+            with self._cache_lock:
+                if self._cache is None:
+                    self._cache = DiskCache(
+                        Path(platformdirs.user_cache_dir("blendsql"))
+                        / f"{self.model_name_or_path}.diskcache"
+                    )
+        return self._cache
 
-        # Initialize counters
-        self.prompt_tokens: int = 0
-        self.completion_tokens: int = 0
-        self.cached_tokens: int = 0
-        self.num_generation_calls: int = 0
-        self.num_cache_hits: int = 0
+    @cache.setter
+    def cache(self, cache: ModelCache):
+        self._cache = cache
+
+    @property
+    def client(self):
+        """The API client for the running event loop.
+
+        httpx connections only work on the event loop that opened them, so each loop
+        gets its own client and connection pool, like the aiohttp session in `_get_session()`.
+        """
+        if self._client_override is not None:
+            return self._client_override
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        with self._clients_lock:
+            client = self._clients.get(loop)
+            if client is None:
+                # Connections of a closed loop can't be used (or closed) anymore
+                for closed_loop in [
+                    other
+                    for other in self._clients
+                    if other is not None and other.is_closed()
+                ]:
+                    del self._clients[closed_loop]
+                client = self._create_client(self._create_http_client())
+                self._clients[loop] = client
+            return client
+
+    @client.setter
+    def client(self, client):
+        """Uses `client` on every event loop, instead of creating our own."""
+        self._client_override = client
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """The connection pool of `client`, for the running event loop."""
+        return self.client._client
 
     async def _get_session(self) -> aiohttp.ClientSession:
-        if self._session is None or self._session.closed:
-            self._session = aiohttp.ClientSession()
+        loop = asyncio.get_running_loop()
+        if (
+            self._session is None
+            or self._session.closed
+            or self._session_loop is not loop
+        ):
+            self._close_session_on_its_loop()
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.max_connections,
+                    keepalive_timeout=self.keepalive_expiry,
+                )
+            )
+            self._session_loop = loop
         return self._session
 
+    def _close_session_on_its_loop(self) -> None:
+        session, loop = self._session, self._session_loop
+        self._session = self._session_loop = None
+        if session is None or session.closed or loop is None or loop.is_closed():
+            return
+        if loop.is_running():
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+
     async def close(self):
-        if self._session and not self._session.closed:
+        """Closes this model's HTTP connections, on every event loop it was used from.
+        New connections are opened if the model is used again.
+        """
+        loop = asyncio.get_running_loop()
+        if self._session is not None and self._session_loop is loop:
             await self._session.close()
+            self._session = self._session_loop = None
+        self._close_session_on_its_loop()
+        with self._clients_lock:
+            clients, self._clients = self._clients, {}
+        for client_loop, client in clients.items():
+            # A client made outside of an event loop hasn't opened any connections yet
+            if client_loop is loop or client_loop is None:
+                await client.close()
+            elif client_loop.is_running():
+                asyncio.run_coroutine_threadsafe(client.close(), client_loop)
 
     async def __aenter__(self):
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        await self.close()
+        # Connections are kept open across ingredient calls and queries.
+        #   Call `close()` to release them.
+        pass
 
     async def generate(
         self,
@@ -75,113 +277,287 @@ class ModelBase:
     ):
         extra_body = dict(self.extra_body)
         messages, extra_body = await self._format_inputs(extra_body, item)
+        if item.prefix is not None:
+            messages = [{"role": "system", "content": item.prefix}] + messages
 
-        last_exc: Exception | None = None
-        for attempt in range(max_retries):
-            buffer = ""
-            # Snapshot stats so we can roll back on failure
-            prompt_tokens_before = self.prompt_tokens
-            completion_tokens_before = self.completion_tokens
-            cached_tokens_before = self.cached_tokens
-            num_generation_calls_before = self.num_generation_calls
+        estimated_tokens = estimate_tokens(item)
+        # Streaming is only worth its per-chunk overhead if we might need to stop early,
+        #   or if the output could be long
+        stream_kwargs = {}
+        if cancel_event is not None or not item.short_output:
+            stream_kwargs = {"stream": True, "stream_options": {"include_usage": True}}
+        request_logprobs = self.logprobs or item.logprobs
+        logprob_kwargs = {"logprobs": True} if request_logprobs else {}
 
-            stream = await self.client.chat.completions.create(
+        async def attempt() -> GenerationResult:
+            response = await self.client.chat.completions.create(
                 model=self.model_name_or_path,
                 messages=messages,
-                stream=True,
-                stream_options={"include_usage": True},
                 extra_body=extra_body,
                 max_tokens=int(os.getenv(MAX_TOKENS_KEY, DEFAULT_MAX_TOKENS)),
+                **stream_kwargs,
+                **logprob_kwargs,
             )
-            self.num_generation_calls += 1
-
-            try:
-                async for chunk in stream:
-                    if cancel_event and cancel_event.is_set():
-                        return GenerationResult(
-                            item.identifier, buffer, completed=False
-                        )
-
-                    if chunk.choices and chunk.choices[0].delta.content:
-                        buffer += chunk.choices[0].delta.content
-
-                    if hasattr(chunk, "usage") and chunk.usage is not None:
-                        self.prompt_tokens += chunk.usage.prompt_tokens
-                        self.completion_tokens += chunk.usage.completion_tokens
-                        if chunk.usage.prompt_tokens_details is not None:
-                            self.cached_tokens += (
-                                chunk.usage.prompt_tokens_details.cached_tokens
+            if not stream_kwargs:
+                self._record_usage(response.usage, estimated_tokens)
+                value = response.choices[0].message.content or ""
+                token_logprobs = _token_logprobs(response.choices[0])
+            else:
+                chunks: list[str] = []
+                token_logprobs = []
+                usage = None
+                try:
+                    async for chunk in response:
+                        if cancel_event and cancel_event.is_set():
+                            value = "".join(chunks)
+                            self._record_usage(usage, estimated_tokens, value)
+                            return GenerationResult(
+                                item.identifier, value, completed=False
                             )
 
+                        if chunk.choices and chunk.choices[0].delta.content:
+                            chunks.append(chunk.choices[0].delta.content)
+                        if request_logprobs and chunk.choices:
+                            token_logprobs.extend(_token_logprobs(chunk.choices[0]))
+
+                        if getattr(chunk, "usage", None) is not None:
+                            usage = chunk.usage
+                finally:
+                    await response.close()
+                value = "".join(chunks)
+                self._record_usage(usage, estimated_tokens, value)
+            add_to_global_history(
+                f"[USER]{item.prefix or ''}{item.prompt}[/USER]\n\n[ASSISTANT]{value}[/ASSISTANT]"
+            )
+            return GenerationResult(
+                item.identifier,
+                value,
+                completed=True,
+                confidence=sequence_confidence(token_logprobs),
+                token_logprobs=token_logprobs or None,
+            )
+
+        return await self._generate_with_retries(attempt, estimated_tokens, max_retries)
+
+    async def _generate_with_retries(
+        self,
+        attempt: Callable[[], Awaitable[GenerationResult]],
+        estimated_tokens: int,
+        max_retries: int,
+    ) -> GenerationResult:
+        """Sends a request by calling `attempt()`, once `self.rate_limiter` admits its `estimated_tokens`.
+
+        Rate limits, overloads and dropped connections (see `is_transient_error()`) are retried
+        with backoff, up to `max_retries` attempts. A failed attempt's reserved tokens are given back,
+        so retries don't use up the budget. `attempt()` reconciles the tokens of a request that was served.
+        """
+        for attempt_idx in range(max_retries):
+            await self.rate_limiter.acquire(estimated_tokens)
+            try:
+                return await attempt()
             except Exception as exc:
-                # Roll back counters so a failed attempt isn't counted
-                self.prompt_tokens = prompt_tokens_before
-                self.completion_tokens = completion_tokens_before
-                self.cached_tokens = cached_tokens_before
-                self.num_generation_calls = num_generation_calls_before
-                last_exc = exc
-                if attempt < max_retries - 1:
-                    wait = 2**attempt
-                    logger.warning(
-                        Color.warning(
-                            f"Generation failed (attempt {attempt + 1}/{max_retries}), retrying in {wait}s: {exc}"
-                        )
+                self.rate_limiter.reconcile(estimated_tokens, 0)
+                if attempt_idx == max_retries - 1 or not is_transient_error(exc):
+                    raise
+                retry_after = retry_after_seconds(exc)
+                wait = retry_after if retry_after is not None else 2**attempt_idx
+                logger.warning(
+                    Color.warning(
+                        f"Generation failed (attempt {attempt_idx + 1}/{max_retries}), retrying in {wait}s: {exc}"
                     )
+                )
+                # On the last attempt, `_generate_within_limits()` reports the overload
+                if is_overload_error(exc):
+                    self.limiter.on_overload()
+                if retry_after is not None or getattr(exc, "status_code", None) == 429:
+                    # Other requests to this model would be throttled too, so hold them all
+                    self.rate_limiter.pause(wait)
+                else:
                     await asyncio.sleep(wait)
-                continue
-            finally:
-                await stream.close()
 
-            add_to_global_history(
-                f"[USER]{item.prompt}[/USER]\n\n[ASSISTANT]{buffer}[/ASSISTANT]"
+    async def _request_body(self, item: GenerationItem) -> dict:
+        """Returns the request body for `item`, e.g. for a batch job in `self.batch`."""
+        extra_body = dict(self.extra_body)
+        messages, extra_body = await self._format_inputs(extra_body, item)
+        if item.prefix is not None:
+            messages = [{"role": "system", "content": item.prefix}] + messages
+        return {
+            "model": self.model_name_or_path,
+            "messages": messages,
+            "max_tokens": int(os.getenv(MAX_TOKENS_KEY, DEFAULT_MAX_TOKENS)),
+            **extra_body,
+        }
+
+    def record_usage(self, **counts: int) -> None:
+        """Adds `counts` (keyed by `ModelUsage` field) to our running totals,
+        and to the current execution's usage, if any.
+        """
+        self.total_usage.add(**counts)
+        execution_usage = current_execution_usage()
+        if execution_usage is not None:
+            execution_usage.for_model(self).add(**counts)
+        if self._usage_parent is not None:
+            self._usage_parent.record_usage(**counts)
+
+    def execution_usage(self) -> ModelUsage:
+        """Returns our usage during the current execution,
+        or our running totals if we're not within one.
+        """
+        execution_usage = current_execution_usage()
+        if execution_usage is None:
+            return self.total_usage
+        return execution_usage.for_model(self)
+
+    def tier_usage(self) -> list[dict] | None:
+        """Returns the usage of each model we pass requests on to (e.g. the tiers of a `CascadeModel`)
+        during the current execution, or `None` if we answer requests ourselves.
+        """
+        return None
+
+    def _record_usage(self, usage, estimated_tokens: int, output: str = "") -> None:
+        """Records a generation call, with the token counts from its OpenAI-style `usage` object (if any).
+        Without a `usage` (e.g. a stream we stopped early), the tokens are estimated from the `output` we got.
+        """
+        if usage is None:
+            self.record_usage(num_generation_calls=1)
+            # ~4 characters per token, like `estimate_tokens()`
+            self.rate_limiter.reconcile(
+                estimated_tokens, estimated_tokens + len(output) // 4
             )
-            return GenerationResult(item.identifier, buffer, completed=True)
+            return
+        cached_tokens = 0
+        if getattr(usage, "prompt_tokens_details", None) is not None:
+            cached_tokens = usage.prompt_tokens_details.cached_tokens or 0
+        self.record_usage(
+            num_generation_calls=1,
+            prompt_tokens=usage.prompt_tokens,
+            completion_tokens=usage.completion_tokens,
+            cached_tokens=cached_tokens,
+        )
+        self.rate_limiter.reconcile(
+            estimated_tokens, usage.prompt_tokens + usage.completion_tokens
+        )
 
-        raise last_exc
+    async def limited_generate(
+        self,
+        item: GenerationItem,
+        cancel_event: asyncio.Event | None = None,
+    ) -> GenerationResult:
+        """Calls `generate()` once `self.limiter` has a free slot,
+        and reports how the request went back to the limiter.
+
+        Items with a `cache_key` are coalesced: if an identical generation is already
+        in flight (e.g. from a concurrent query, which also missed the cache), we
+        wait on its result instead of sending another request.
+        """
+        if item.cache_key is None:
+            return await self._generate_within_limits(item, cancel_event)
+        with self._in_flight_lock:
+            shared = self._in_flight.get(item.cache_key)
+            is_leader = shared is None
+            if is_leader:
+                shared = concurrent.futures.Future()
+                self._in_flight[item.cache_key] = shared
+        if not is_leader:
+            self.record_usage(num_coalesced_calls=1)
+            # The leader may be on another event loop. Shield it,
+            #   so that cancelling us doesn't cancel it for everyone else.
+            result = await asyncio.shield(asyncio.wrap_future(shared))
+            if result is not None and result.completed:
+                return replace(result, identifier=item.identifier)
+            if cancel_event is not None and cancel_event.is_set():
+                return GenerationResult(item.identifier, "", completed=False)
+            # The leader was cancelled before finishing, so try again ourselves
+            return await self.limited_generate(item, cancel_event)
+        try:
+            result = await self._generate_within_limits(item, cancel_event)
+        except asyncio.CancelledError:
+            shared.set_result(None)
+            raise
+        except Exception as exc:
+            shared.set_exception(exc)
+            raise
+        else:
+            shared.set_result(result)
+        finally:
+            with self._in_flight_lock:
+                self._in_flight.pop(item.cache_key, None)
+        return result
+
+    async def _generate_within_limits(
+        self,
+        item: GenerationItem,
+        cancel_event: asyncio.Event | None = None,
+    ) -> GenerationResult:
+        await self.limiter.acquire()
+        start = time.monotonic()
+        try:
+            result = await self.generate(item, cancel_event)
+            # Requests cut short by `cancel_event` don't tell us anything about latency
+            if result.completed:
+                self.limiter.on_success(time.monotonic() - start)
+            return result
+        except Exception as exc:
+            if is_overload_error(exc):
+                self.limiter.on_overload()
+            raise
+        finally:
+            self.limiter.release()
 
     def _create_key(
         self, *args, funcs: Sequence[Callable] | None = None, **kwargs
     ) -> str:
-        """Generates a hash to use in diskcache Cache.
+        """Generates a hash to use as a key in `self.cache`.
         This way, we don't need to send our prompts to the same Model
         if our context of Model + args + kwargs is the same.
 
+        Prefer passing precomputed grammar strings in `args` over grammar functions in `funcs`.
+        Functions are identified by a fingerprint of their source, which is memoized per code object.
+
         Returns:
-            md5 hash used as key in diskcache
+            blake2b hash of a canonical encoding of the above
         """
-        hasher = hashlib.md5()
-        params_str = ""
-        if len(kwargs) > 0:
-            params_str += str(sorted([(k, str(v)) for k, v in kwargs.items()]))
-        if len(args) > 0:
-            params_str += str([arg for arg in args])
-        if funcs:
-            params_str += "\n".join([dedent(inspect.getsource(func)) for func in funcs])
-        combined_str = "{}||{}".format(
-            f"{self.model_name_or_path}||{type(self)}",
-            params_str,
-        ).encode()
-        hasher.update(combined_str)
-        return hasher.hexdigest()
+        return hash_key(
+            self.model_name_or_path,
+            f"{type(self).__module__}.{type(self).__qualname__}",
+            args,
+            kwargs,
+            funcs or (),
+        )
 
     def check_cache(
         self, *args, funcs: Sequence[Callable] | None = None, **kwargs
     ) -> Tuple[Any, str]:
         response: dict[str, str] = None  # type: ignore
         key: str = self._create_key(funcs=funcs, *args, **kwargs)
-        if key in self.cache:
-            self.num_cache_hits += 1
+        response = self.cache.get(key)  # type: ignore
+        if response is not None:
+            self.record_usage(num_cache_hits=1)
             logger.debug(
                 Color.model_or_data_update(
                     f"Using model cache ({self.num_cache_hits})..."
                 )
             )
-            response = self.cache.get(key)  # type: ignore
         return (response, key)
 
+    def check_cache_many(self, keys: Sequence[str]) -> dict[str, Any]:
+        """Looks up a batch of keys from `_create_key()` in a single cache round-trip.
+
+        Returns:
+            Mapping from each key with a cached response to that response
+        """
+        responses = {
+            k: v for k, v in self.cache.get_many(keys).items() if v is not None
+        }
+        if responses:
+            self.record_usage(num_cache_hits=len(responses))
+            logger.debug(
+                Color.model_or_data_update(
+                    f"Using model cache ({self.num_cache_hits})..."
+                )
+            )
+        return responses
+
     def reset_stats(self):
-        self.prompt_tokens = 0
-        self.completion_tokens = 0
-        self.cached_tokens = 0
-        self.num_generation_calls = 0
-        self.num_cache_hits = 0
+        """Resets our running totals. Usage of executions in progress is unaffected."""
+        self.total_usage.reset()
@@ -0,0 +1,99 @@
+"""Token and call accounting for models.
+
+A model can be shared by many concurrent queries (threads, or `BlendSQL.aexecute()` tasks),
+so counts for a single query can't live on the model itself. Instead, each `BlendSQL.execute()`
+binds an `ExecutionUsage` to its context via `track_usage()`, and models record into both
+that and their own running total (`ModelBase.total_usage`).
+"""
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field, fields
+from typing import Iterator
+
+_EXECUTION_USAGE: ContextVar["ExecutionUsage | None"] = ContextVar(
+    "blendsql_execution_usage", default=None
+)
+
+
+@dataclass
+class ModelUsage:
+    prompt_tokens: int = field(default=0)
+    completion_tokens: int = field(default=0)
+    cached_tokens: int = field(default=0)
+    num_generation_calls: int = field(default=0)
+    num_cache_hits: int = field(default=0)
+    # Number of calls which shared an identical, in-flight generation
+    num_coalesced_calls: int = field(default=0)
+    # Number of results passed on to a bigger model by a `CascadeModel`
+    num_escalations: int = field(default=0)
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, repr=False, compare=False
+    )
+
+    def add(self, **counts: int) -> None:
+        with self._lock:
+            for name, count in counts.items():
+                setattr(self, name, getattr(self, name) + count)
+
+    def reset(self) -> None:
+        with self._lock:
+            for name in self._counter_names():
+                setattr(self, name, 0)
+
+    def as_dict(self) -> dict[str, int]:
+        with self._lock:
+            return {name: getattr(self, name) for name in self._counter_names()}
+
+    def _counter_names(self) -> list[str]:
+        return [f.name for f in fields(self) if f.name != "_lock"]
+
+
+class ExecutionUsage:
+    """Usage recorded by each model during a single execution."""
+
+    def __init__(self):
+        self._by_model: dict[int, ModelUsage] = {}
+        self._lock = threading.Lock()
+
+    def for_model(self, model) -> ModelUsage:
+        with self._lock:
+            return self._by_model.setdefault(id(model), ModelUsage())
+
+
+@contextmanager
+def track_usage() -> Iterator[ExecutionUsage]:
+    """Record usage from all models called within the context into a fresh `ExecutionUsage`.
+    The context carries over to coroutines submitted via `run_coroutine()`,
+    including the work ingredient calls hand to `defer()`.
+    """
+    usage = ExecutionUsage()
+    token = _EXECUTION_USAGE.set(usage)
+    try:
+        yield usage
+    finally:
+        _EXECUTION_USAGE.reset(token)
+
+
+def current_execution_usage() -> ExecutionUsage | None:
+    return _EXECUTION_USAGE.get()
+
+
+class UsageCounter:
+    """Exposes a `ModelUsage` counter as a model attribute, reading as the model's running total.
+
+    Assigning to it (e.g. `self.prompt_tokens += n` in a custom model's `generate()`)
+    records the difference, so it's counted towards the current execution too.
+    Prefer `ModelBase.record_usage()`, which is safe to call from many threads at once.
+    """
+
+    def __set_name__(self, owner, name: str):
+        self.name = name
+
+    def __get__(self, model, owner=None):
+        if model is None:
+            return self
+        return getattr(model.total_usage, self.name)
+
+    def __set__(self, model, value: int) -> None:
+        model.record_usage(**{self.name: value - getattr(model.total_usage, self.name)})
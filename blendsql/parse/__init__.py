@@ -10,3 +10,4 @@ from . import transforms as transform
 from . import checks as check
 from .parse import get_reversed_subqueries, get_scope_nodes
 from .utils import get_first_child
+from .plan_cache import PLAN_CACHE, PlanCache, QueryPlan
@@ -194,6 +194,11 @@ class BlendSQLPostgres(Postgres, BlendSQLDialect):
     class Tokenizer(BlendSQLDialect.Tokenizer, Postgres.Tokenizer):
         pass
 
+    class Generator(Postgres.Generator):
+        def placeholder_sql(self, expression: exp.Placeholder) -> str:
+            # We execute via sqlalchemy's `text()`, which expects `:name`, not `%(name)s`
+            return f":{expression.name}" if expression.name else "?"
+
 
 class BlendSQLSQLite(SQLite, BlendSQLDialect):
     class Tokenizer(BlendSQLDialect.Tokenizer, SQLite.Tokenizer):
@@ -0,0 +1,161 @@
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Collection, Hashable
+from dataclasses import dataclass, field
+
+import sqlglot
+from sqlglot import exp
+
+from blendsql.configure import PLAN_CACHE_SIZE_KEY, DEFAULT_PLAN_CACHE_SIZE
+from blendsql.parse.parse import get_reversed_subqueries
+
+
+def get_schema_fingerprint(schema: dict | None) -> int:
+    """Cheap, order-independent fingerprint of a `sqlglot_schema` dict."""
+    if not schema:
+        return 0
+    return hash(
+        frozenset(
+            (tablename, frozenset((c, str(t)) for c, t in columns.items()))
+            for tablename, columns in schema.items()
+        )
+    )
+
+
+@dataclass
+class QueryPlan:
+    """The output of parsing + preprocessing a BlendSQL query, before
+    any ingredient is executed.
+
+    The stored AST is never handed out directly, since `_blend()` mutates
+    its copy of the tree (e.g. when replacing `JOIN` clauses). Instead,
+    `instantiate()` returns a fresh copy on each call.
+    """
+
+    node: exp.Expression = field()
+    query: str = field()
+    ingredient_alias_to_parsed_dict: dict[str, dict] = field()
+    # Position of each subquery within `node.find_all((exp.Select, exp.Paren))`,
+    #   in the order we want to execute them
+    subquery_order: list[int] = field(default_factory=list)
+
+    @classmethod
+    def from_node(
+        cls,
+        node: exp.Expression,
+        query: str,
+        ingredient_alias_to_parsed_dict: dict[str, dict],
+        default_model=None,
+    ) -> "QueryPlan":
+        node_positions = {
+            id(n): idx for idx, n in enumerate(node.find_all((exp.Select, exp.Paren)))
+        }
+        # The default model is bound at execution time, so we don't
+        #   hold a reference to it in the cached plan.
+        template = {}
+        for alias, d in ingredient_alias_to_parsed_dict.items():
+            kwargs_dict = dict(d["kwargs_dict"])
+            if kwargs_dict.get("model", None) is default_model:
+                kwargs_dict.pop("model", None)
+            template[alias] = {**d, "kwargs_dict": kwargs_dict}
+        return cls(
+            node=node.copy(),
+            query=query,
+            ingredient_alias_to_parsed_dict=template,
+            subquery_order=[
+                node_positions[id(n)] for n in get_reversed_subqueries(node)
+            ],
+        )
+
+    def instantiate(
+        self, default_model=None
+    ) -> tuple[exp.Expression, str, dict[str, dict], list[exp.Expression]]:
+        """Returns a (node, query, ingredient_alias_to_parsed_dict, subqueries) tuple
+        which is safe to modify during execution.
+        """
+        node = self.node.copy()
+        subquery_nodes = list(node.find_all((exp.Select, exp.Paren)))
+        ingredient_alias_to_parsed_dict = {
+            alias: {
+                **d,
+                "kwargs_dict": {"model": default_model, **d["kwargs_dict"]},
+            }
+            for alias, d in self.ingredient_alias_to_parsed_dict.items()
+        }
+        return (
+            node,
+            self.query,
+            ingredient_alias_to_parsed_dict,
+            [subquery_nodes[idx] for idx in self.subquery_order],
+        )
+
+
+class PlanCache:
+    """Thread-safe, bounded LRU cache of `QueryPlan` objects.
+
+    Keyed on (normalized query text, dialect, schema fingerprint, ingredient set), so
+    that executing the same query repeatedly skips the sqlglot parsing and
+    preprocessing work.
+    The maximum size is read from the `BLENDSQL_PLAN_CACHE_SIZE` environment variable,
+    which can be set via `blendsql.config.set_plan_cache_size()`. A size of 0 disables the cache.
+    """
+
+    def __init__(self, maxsize: int | None = None):
+        self._maxsize = maxsize
+        self._plans: OrderedDict[Hashable, QueryPlan] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    @property
+    def maxsize(self) -> int:
+        if self._maxsize is not None:
+            return self._maxsize
+        return int(os.getenv(PLAN_CACHE_SIZE_KEY, DEFAULT_PLAN_CACHE_SIZE))
+
+    @staticmethod
+    def make_key(
+        query: str,
+        dialect: sqlglot.Dialect,
+        schema: dict | None,
+        ingredients: Collection,
+    ) -> Hashable:
+        return (
+            query.strip(),
+            dialect,
+            get_schema_fingerprint(schema),
+            frozenset(ingredients),
+        )
+
+    def get(self, key: Hashable) -> QueryPlan | None:
+        with self._lock:
+            plan = self._plans.get(key, None)
+            if plan is None:
+                self.misses += 1
+                return None
+            self._plans.move_to_end(key)
+            self.hits += 1
+            return plan
+
+    def put(self, key: Hashable, plan: QueryPlan) -> None:
+        maxsize = self.maxsize
+        if maxsize <= 0:
+            return
+        with self._lock:
+            self._plans[key] = plan
+            self._plans.move_to_end(key)
+            while len(self._plans) > maxsize:
+                self._plans.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._plans.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._plans)
+
+
+PLAN_CACHE = PlanCache()
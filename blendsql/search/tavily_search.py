@@ -7,6 +7,7 @@ import httpx
 import asyncio
 
 from blendsql.search.searcher import Searcher
+from blendsql.common.concurrency import run_coroutine
 
 
 @dataclass(kw_only=True)
@@ -37,7 +38,6 @@ class TavilySearch(Searcher):
         return [i for i in await asyncio.gather(*responses)]
 
     def __call__(self, query: list[str] | str, k: int | None = None) -> list[list[str]]:
-        asyncio.set_event_loop(asyncio.new_event_loop())
         is_single_query = isinstance(query, str)
         queries = [query] if is_single_query else query
-        return asyncio.run(self._search(queries, self.k or k))
+        return run_coroutine(self._search(queries, self.k or k))
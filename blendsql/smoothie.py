@@ -19,6 +19,10 @@ class SmoothieMeta:
     db_type: str = field()
     contains_ingredient: bool = field(default=True)
     process_time_seconds: float = field(default="N.A.")
+    # The default model's adaptive concurrency limit, after execution
+    concurrency_limit: int | None = field(default=None)
+    # Usage of each tier, if the default model is a `CascadeModel`
+    tier_usage: list[dict] | None = field(default=None)
 
 
 @dataclass
@@ -77,6 +81,23 @@ class Smoothie:
             ),
         )
 
+        if self.meta.tier_usage:
+            tier_table = Table(show_header=True, header_style="bold")
+            tier_table.add_column("Tier")
+            tier_table.add_column("# Generation Calls")
+            tier_table.add_column("Prompt Tokens")
+            tier_table.add_column("Completion Tokens")
+            tier_table.add_column("# Escalated")
+            for tier in self.meta.tier_usage:
+                tier_table.add_row(
+                    tier["model"],
+                    f"{tier['num_generation_calls']:,}",
+                    f"{tier['prompt_tokens']:,}",
+                    f"{tier['completion_tokens']:,}",
+                    f"{tier['num_escalations']:,}",
+                )
+            table = Group(table, tier_table)
+
         # Create side-by-side panels for query and result
         query_panel = Panel(query_syntax, title="Query", border_style="blue")
 
@@ -0,0 +1,137 @@
+"""Measures the client-side CPU cost of streamed vs. non-streamed requests
+for short, constrained outputs (like LLMMap's booleans).
+
+Runs a fake OpenAI-compatible server in a separate process, so only the
+BlendSQL side of each request is counted towards CPU time.
+
+Usage:
+    python research/benchmark-non-streaming.py [--requests 2000] [--concurrency 32]
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import socket
+import statistics
+import time
+
+from aiohttp import web
+
+from blendsql.models import VLLM
+from blendsql.common.typing import GenerationItem
+
+ANSWER = "True"
+USAGE = {"prompt_tokens": 200, "completion_tokens": 2, "total_tokens": 202}
+
+
+def _chunk(delta: dict, finish_reason: str | None = None, usage=None) -> bytes:
+    body = {
+        "id": "chatcmpl-0",
+        "object": "chat.completion.chunk",
+        "created": 0,
+        "model": "fake",
+        "choices": (
+            []
+            if usage
+            else [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+        ),
+        "usage": usage,
+    }
+    return f"data: {json.dumps(body)}\n\n".encode()
+
+
+async def chat_completions(request: web.Request) -> web.StreamResponse:
+    body = await request.json()
+    if not body.get("stream"):
+        return web.json_response(
+            {
+                "id": "chatcmpl-0",
+                "object": "chat.completion",
+                "created": 0,
+                "model": "fake",
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": ANSWER},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": USAGE,
+            }
+        )
+    # Same chunk sequence vLLM sends for a short answer
+    response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+    await response.prepare(request)
+    await response.write(_chunk({"role": "assistant", "content": ""}))
+    await response.write(_chunk({"content": ANSWER}))
+    await response.write(_chunk({}, finish_reason="stop"))
+    await response.write(_chunk({}, usage=USAGE))
+    await response.write(b"data: [DONE]\n\n")
+    await response.write_eof()
+    return response
+
+
+def serve(port: int) -> None:
+    app = web.Application()
+    app.router.add_post("/v1/chat/completions", chat_completions)
+    web.run_app(app, port=port, print=None)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        return s.getsockname()[1]
+
+
+async def run(model: VLLM, short_output: bool, n: int, concurrency: int) -> float:
+    """Returns the client CPU seconds spent per request."""
+    semaphore = asyncio.Semaphore(concurrency)
+    item = GenerationItem(
+        prompt="Is this a name? Alice", grammar=None, short_output=short_output
+    )
+
+    async def one():
+        async with semaphore:
+            await model.generate(item)
+
+    start = time.process_time()
+    await asyncio.gather(*(one() for _ in range(n)))
+    return (time.process_time() - start) / n
+
+
+async def main(n: int, concurrency: int, rounds: int) -> None:
+    port = free_port()
+    server = multiprocessing.Process(target=serve, args=(port,), daemon=True)
+    server.start()
+    try:
+        model = VLLM("fake", base_url=f"http://localhost:{port}/v1/")
+        for _ in range(50):
+            try:
+                await run(model, True, 1, 1)
+                break
+            except Exception:
+                await asyncio.sleep(0.1)
+        results = {"streaming": [], "non-streaming": []}
+        for _ in range(rounds):
+            results["streaming"].append(await run(model, False, n, concurrency))
+            results["non-streaming"].append(await run(model, True, n, concurrency))
+        streaming = statistics.median(results["streaming"])
+        non_streaming = statistics.median(results["non-streaming"])
+        print(f"{n:,} requests x {rounds} rounds, concurrency {concurrency}")
+        print(f"streaming:     {streaming * 1e6:8.1f} µs CPU / request")
+        print(f"non-streaming: {non_streaming * 1e6:8.1f} µs CPU / request")
+        print(
+            f"saved:         {(streaming - non_streaming) * 1e6:8.1f} µs CPU / request"
+            f" ({1 - non_streaming / streaming:.0%})"
+        )
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.rounds))
@@ -0,0 +1,80 @@
+"""Measures how long it takes to write a temp table (as done for each map output
+and abstracted subquery) with the dialect's bulk loader, vs. the generic `pd.to_sql()` path.
+
+Usage:
+    python research/benchmark-temp-tables.py [--rows 1000000] [--postgres user:password@localhost/db]
+"""
+import argparse
+import statistics
+import tempfile
+import sqlite3
+import time
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+
+from blendsql.db import SQLite
+from blendsql.db.sqlalchemy import SQLAlchemyDatabase
+
+
+def make_df(num_rows: int) -> pl.DataFrame:
+    rng = np.random.default_rng(0)
+    return pl.DataFrame(
+        {
+            "id": np.arange(num_rows),
+            "score": rng.random(num_rows),
+            "name": [f"value {i}" for i in range(num_rows)],
+            "flag": rng.random(num_rows) > 0.5,
+        }
+    )
+
+
+def time_load(db: SQLAlchemyDatabase, df: pl.DataFrame, repeats: int) -> list[float]:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        db.to_temp_table(df, "benchmark_temp")
+        timings.append(time.perf_counter() - start)
+    (num_rows,) = db.execute_to_list('SELECT COUNT(*) FROM "benchmark_temp"')
+    assert num_rows == len(df)
+    return timings
+
+
+def report(name: str, timings: list[float]):
+    print(
+        f"{name:<24} median {statistics.median(timings):.2f}s  min {min(timings):.2f}s"
+    )
+
+
+def benchmark(db: SQLAlchemyDatabase, df: pl.DataFrame, repeats: int):
+    label = type(db).__name__
+    report(f"{label} bulk loader", time_load(db, df, repeats))
+    # The generic path, which every dialect used before
+    bulk_insert = type(db)._bulk_insert
+    type(db)._bulk_insert = SQLAlchemyDatabase._bulk_insert
+    try:
+        report(f"{label} pd.to_sql", time_load(db, df, repeats))
+    finally:
+        type(db)._bulk_insert = bulk_insert
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument(
+        "--postgres", help="Also benchmark PostgreSQL, e.g. user:password@localhost/db"
+    )
+    args = parser.parse_args()
+
+    df = make_df(args.rows)
+    print(f"Writing {args.rows:,} rows, {args.repeats} times each\n")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = Path(tmpdir) / "benchmark.db"
+        sqlite3.connect(db_path).close()
+        benchmark(SQLite(str(db_path)), df, args.repeats)
+    if args.postgres:
+        from blendsql.db import PostgreSQL
+
+        benchmark(PostgreSQL(args.postgres), df, args.repeats)
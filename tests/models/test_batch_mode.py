@@ -0,0 +1,177 @@
+import sys
+import json
+import time
+import asyncio
+import subprocess
+import pytest
+from types import SimpleNamespace
+
+from blendsql.models import OpenAI, MemoryCache, LocalBatch, OpenAIBatch
+from blendsql.common.exceptions import BatchPending
+from blendsql.common.typing import GenerationItem
+from tests.utils import names_bsql
+
+NAMES = ["Alice", "Bob", "Carl"]
+
+QUERY = "SELECT name, {{LLMMap('Does this name start with A?', w.name, return_type='bool')}} AS a FROM w ORDER BY name"
+
+
+def _answer(body: dict) -> str:
+    """Plays the batch API, answering from the value in the request."""
+    prompt = body["messages"][-1]["content"]
+    return "true" if "Alice" in prompt else "false"
+
+
+@pytest.fixture
+def batch_model(tmp_path):
+    model = OpenAI(
+        "gpt-4o-mini",
+        api_key="N/A",
+        caching=True,
+        cache=MemoryCache(),
+        batch=LocalBatch(tmp_path),
+    )
+
+    async def generate(*args, **kwargs):
+        raise AssertionError("Batch mode shouldn't make interactive requests")
+
+    model.generate = generate
+    return model
+
+
+def test_batch_round_trip(batch_model):
+    bsql = names_bsql(batch_model, NAMES)
+    with pytest.raises(BatchPending) as exc_info:
+        bsql.execute(QUERY)
+    (job_id,) = exc_info.value.job_ids
+    input_path = batch_model.batch.directory / f"{job_id}.input.jsonl"
+    assert len(input_path.read_text().splitlines()) == len(NAMES)
+
+    # Still running, so re-running doesn't submit anything new
+    with pytest.raises(BatchPending) as exc_info:
+        bsql.execute(QUERY)
+    assert exc_info.value.job_ids == [job_id]
+
+    batch_model.batch.complete(_answer)
+    smoothie = bsql.execute(QUERY)
+    assert list(smoothie.df()["a"]) == [True, False, False]
+    assert smoothie.meta.num_generation_calls == len(NAMES)
+    # Results are cached, so the job handles are no longer needed
+    assert json.loads(batch_model.batch.jobs_path.read_text()) == {}
+    assert list(bsql.execute(QUERY).df()["a"]) == [True, False, False]
+
+
+def test_missing_results_are_resubmitted(batch_model):
+    bsql = names_bsql(batch_model, NAMES)
+    with pytest.raises(BatchPending) as exc_info:
+        bsql.execute(QUERY)
+    (job_id,) = exc_info.value.job_ids
+    # Only the first request succeeded
+    batch_model.batch.complete(
+        lambda body: _answer(body) if "Alice" in str(body) else None
+    )
+    output_path = batch_model.batch.directory / f"{job_id}.output.jsonl"
+    records = [json.loads(line) for line in output_path.read_text().splitlines()]
+    output_path.write_text(
+        "\n".join(json.dumps(r) for r in records if r["content"] is not None)
+    )
+
+    with pytest.raises(BatchPending) as exc_info:
+        bsql.execute(QUERY)
+    (retry_job_id,) = exc_info.value.job_ids
+    assert retry_job_id != job_id
+    retry_path = batch_model.batch.directory / f"{retry_job_id}.input.jsonl"
+    assert len(retry_path.read_text().splitlines()) == 2
+
+    batch_model.batch.complete(_answer)
+    assert list(bsql.execute(QUERY).df()["a"]) == [True, False, False]
+
+
+def test_batch_requires_caching(tmp_path):
+    with pytest.raises(ValueError):
+        OpenAI("gpt-4o-mini", api_key="N/A", batch=LocalBatch(tmp_path))
+
+
+def test_concurrent_runs_keep_each_others_jobs(batch_model):
+    batch = batch_model.batch
+    submit = batch.submit
+
+    async def slow_submit(model, requests):
+        # Give the other run a chance to interleave with this one
+        await asyncio.sleep(0.05)
+        return await submit(model, requests)
+
+    batch.submit = slow_submit
+
+    async def run_both():
+        return await asyncio.gather(
+            batch.run(batch_model, [GenerationItem("a", "", cache_key="a")]),
+            batch.run(batch_model, [GenerationItem("b", "", cache_key="b")]),
+        )
+
+    (_, (job_a,)), (_, (job_b,)) = asyncio.run(run_both())
+    assert json.loads(batch.jobs_path.read_text()) == {"a": job_a, "b": job_b}
+
+
+def test_runs_wait_for_other_processes(batch_model):
+    batch = batch_model.batch
+    holder = subprocess.Popen(
+        [
+            sys.executable,
+            "-c",
+            "import sys, time\n"
+            "from blendsql.models.batch import _lock_file\n"
+            "f = _lock_file(sys.argv[1])\n"
+            "print('locked', flush=True)\n"
+            "time.sleep(0.5)",
+            str(batch.lock_path),
+        ],
+        stdout=subprocess.PIPE,
+    )
+    try:
+        assert holder.stdout.readline().strip() == b"locked"
+        start = time.monotonic()
+        asyncio.run(batch.run(batch_model, [GenerationItem("a", "", cache_key="a")]))
+        assert time.monotonic() - start >= 0.3
+    finally:
+        holder.wait()
+    assert "a" in json.loads(batch.jobs_path.read_text())
+
+
+def test_usage_only_recorded_for_collected_outputs(tmp_path):
+    model = OpenAI("gpt-4o-mini", api_key="N/A", caching=True, cache=MemoryCache())
+    lines = [
+        json.dumps(
+            {
+                "custom_id": key,
+                "response": {
+                    "status_code": 200,
+                    "body": {
+                        "choices": [{"message": {"content": key}}],
+                        "usage": {"prompt_tokens": tokens, "completion_tokens": 1},
+                    },
+                },
+            }
+        )
+        for key, tokens in [("a", 10), ("b", 100)]
+    ]
+
+    async def retrieve(job_id):
+        return SimpleNamespace(status="completed", output_file_id="out")
+
+    async def content(file_id):
+        return SimpleNamespace(text="\n".join(lines))
+
+    model.client = SimpleNamespace(
+        batches=SimpleNamespace(retrieve=retrieve),
+        files=SimpleNamespace(content=content),
+    )
+    batch = OpenAIBatch(tmp_path)
+    batch.jobs_path.write_text(json.dumps({"a": "job", "b": "job"}))
+
+    outputs, _ = asyncio.run(batch.run(model, [GenerationItem("a", "", cache_key="a")]))
+    assert outputs == {"a": "a"}
+    assert model.total_usage.prompt_tokens == 10
+    outputs, _ = asyncio.run(batch.run(model, [GenerationItem("b", "", cache_key="b")]))
+    assert outputs == {"b": "b"}
+    assert model.total_usage.prompt_tokens == 110
@@ -0,0 +1,88 @@
+import pytest
+import pandas as pd
+
+from blendsql import BlendSQL
+from blendsql.ingredients import LLMMap, LLMJoin
+from blendsql.models import ModelBase, MemoryCache
+from blendsql.common.typing import GenerationResult
+
+
+class EchoModel(ModelBase):
+    """Offline model which answers with the upper-cased identifier of each item."""
+
+    async def generate(self, item, cancel_event=None, max_retries=3):
+        self.num_generation_calls += 1
+        return GenerationResult(
+            item.identifier, item.identifier.upper(), completed=True
+        )
+
+
+class CountingCache(MemoryCache):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.calls = []
+
+    def get(self, key, default=None):
+        self.calls.append("get")
+        return super().get(key, default)
+
+    def get_many(self, keys):
+        self.calls.append("get_many")
+        return super().get_many(keys)
+
+    def set(self, key, value, expire=None):
+        self.calls.append("set")
+        return super().set(key, value, expire)
+
+    def set_many(self, mapping, expire=None):
+        self.calls.append("set_many")
+        return super().set_many(mapping, expire)
+
+
+@pytest.fixture
+def model() -> EchoModel:
+    return EchoModel("echo", caching=True, cache=CountingCache())
+
+
+@pytest.fixture
+def bsql(model) -> BlendSQL:
+    return BlendSQL(
+        {
+            "w": pd.DataFrame({"name": ["Alice", "Bob", "Anne", "Carl"]}),
+            "v": pd.DataFrame({"name": ["CARL", "ANNE", "BOB", "ALICE"]}),
+        },
+        model=model,
+        ingredients={LLMMap, LLMJoin},
+    )
+
+
+def test_llmmap_batches_cache_lookups(bsql, model):
+    query = (
+        "SELECT name, {{LLMMap('Repeat the name', w.name)}} AS out FROM w ORDER BY name"
+    )
+    first = bsql.execute(query)
+    assert first.meta.num_generation_calls == 4
+    assert model.cache.calls == ["get_many", "set_many"]
+
+    model.cache.calls.clear()
+    second = bsql.execute(query)
+    assert second.meta.num_generation_calls == 0
+    assert model.cache.calls == ["get_many"]
+    assert list(second.df()["out"]) == list(first.df()["out"])
+
+
+def test_llmjoin_batches_cache_lookups(bsql, model):
+    query = """
+    SELECT w.name AS left_name, v.name AS right_name FROM w
+    JOIN v ON {{LLMJoin(w.name, v.name)}}
+    ORDER BY left_name
+    """
+    first = bsql.execute(query)
+    assert list(first.df()["right_name"]) == ["ALICE", "ANNE", "BOB", "CARL"]
+    assert model.cache.calls == ["get_many", "set_many"]
+
+    model.cache.calls.clear()
+    second = bsql.execute(query)
+    assert second.meta.num_generation_calls == 0
+    assert model.cache.calls == ["get_many"]
+    assert second.df().equals(first.df())
@@ -0,0 +1,113 @@
+import time
+import inspect
+import pytest
+
+from blendsql.models import VLLM, MemoryCache, DiskCache, KeyValueCache
+from blendsql.models.cache import LocalKeyValueStore, hash_key, fingerprint_callable
+
+
+@pytest.fixture(params=["memory", "disk", "kv"])
+def cache(request, tmp_path):
+    if request.param == "memory":
+        cache = MemoryCache()
+    elif request.param == "disk":
+        cache = DiskCache(tmp_path / "cache")
+    else:
+        cache = KeyValueCache(LocalKeyValueStore())
+    yield cache
+    cache.close()
+
+
+def test_cache_roundtrip(cache):
+    assert "a" not in cache
+    assert cache.get("a") is None
+    cache["a"] = ["x", 1, True]
+    cache.set("b", {"k": "v"})
+    assert "a" in cache
+    assert cache["a"] == ["x", 1, True]
+    assert cache.get("b") == {"k": "v"}
+    with pytest.raises(KeyError):
+        cache["c"]
+    assert cache.delete("a")
+    assert not cache.delete("a")
+    cache.clear()
+    assert "b" not in cache
+
+
+def test_cache_get_set_many(cache):
+    cache.set_many({f"key{i}": i for i in range(5)})
+    assert cache.get_many(["key0", "key3", "missing"]) == {"key0": 0, "key3": 3}
+    assert cache.get_many([]) == {}
+    assert cache["key4"] == 4
+
+
+def test_cache_ttl(cache):
+    cache.ttl = 0.05
+    cache["a"] = "short-lived"
+    cache.set("b", "long-lived", expire=60)
+    assert cache["a"] == "short-lived"
+    time.sleep(0.1)
+    assert "a" not in cache
+    assert cache["b"] == "long-lived"
+
+
+def test_memory_cache_byte_budget():
+    cache = MemoryCache(max_bytes=200)
+    for i in range(10):
+        cache[f"key{i}"] = "x" * 40
+        # Touch the first key, so it's always the most recently used
+        assert cache.get("key0") is not None
+    assert cache.num_bytes <= 200
+    assert "key0" in cache
+    assert "key1" not in cache
+    assert "key9" in cache
+    # Entries larger than the whole budget are never stored
+    cache["huge"] = "x" * 1000
+    assert "huge" not in cache
+
+
+def test_kv_cache_maxmemory_and_namespaces():
+    store = LocalKeyValueStore(maxmemory=300)
+    first, second = KeyValueCache(store, namespace="a"), KeyValueCache(
+        store, namespace="b"
+    )
+    first["k"] = "first"
+    second["k"] = "second"
+    assert (first["k"], second["k"]) == ("first", "second")
+    first.clear()
+    assert "k" not in first and second["k"] == "second"
+    for i in range(20):
+        first[f"key{i}"] = "x" * 20
+    assert store.used_memory <= 300
+    assert "key0" not in first and "key19" in first
+
+
+def test_model_uses_given_cache():
+    cache = MemoryCache()
+    model = VLLM("test-model", caching=True, cache=cache)
+    assert model.cache is cache
+    response, key = model.check_cache("prompt")
+    assert response is None
+    model.cache[key] = "answer"
+    assert model.check_cache("prompt") == ("answer", key)
+    assert model.num_cache_hits == 1
+
+
+def test_hash_key_is_canonical():
+    assert hash_key({"b", "a"}, {"x": 1, "y": 2}) == hash_key(
+        {"a", "b"}, {"y": 2, "x": 1}
+    )
+    assert hash_key("1") != hash_key(1)
+    assert hash_key(("a", "b")) != hash_key(("ab",))
+    assert hash_key(None) != hash_key("None")
+
+
+def test_grammar_fingerprint_is_memoized(monkeypatch):
+    def make_grammar(o):
+        return lambda _, o=o: o
+
+    first = fingerprint_callable(make_grammar("x"))
+    # New closures share a code object, so we shouldn't read the source again
+    monkeypatch.setattr(inspect, "getsource", lambda _: pytest.fail())
+    assert fingerprint_callable(make_grammar("x")) == first
+    assert fingerprint_callable(make_grammar("y")) != first
@@ -0,0 +1,124 @@
+import asyncio
+import pytest
+import pandas as pd
+
+from blendsql import BlendSQL
+from blendsql.ingredients import LLMMap
+from blendsql.models import ModelBase, ConcurrencyLimiter
+from blendsql.models.limiter import is_overload_error
+from blendsql.common.typing import GenerationResult
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+class LoadedModel(ModelBase):
+    """Offline model which is rate limited above `capacity` concurrent requests."""
+
+    def __init__(self, *args, capacity: int = 1000, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.capacity = capacity
+        self.active = 0
+        self.peak = 0
+
+    async def generate(self, item, cancel_event=None, max_retries=3):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            if self.active > self.capacity:
+                raise RateLimitError()
+            await asyncio.sleep(0.01)
+            return GenerationResult(item.identifier, "True", completed=True)
+        finally:
+            self.active -= 1
+
+
+def test_is_overload_error():
+    assert is_overload_error(RateLimitError())
+    assert is_overload_error(asyncio.TimeoutError())
+    assert not is_overload_error(ValueError())
+
+    class ServerError(Exception):
+        status = 503
+
+    assert is_overload_error(ServerError())
+
+
+def test_limiter_grows_and_backs_off():
+    limiter = ConcurrencyLimiter(initial_limit=4, max_limit=6)
+    for _ in range(100):
+        limiter._in_flight = limiter.limit
+        limiter.on_success(1.0)
+    assert limiter.limit == 6
+
+    limiter.on_overload()
+    assert limiter.limit == 3
+    # Errors from the same round of requests only back off once
+    limiter.on_overload()
+    assert limiter.limit == 3
+
+    # Doesn't grow while latency climbs
+    limiter._in_flight = limiter.limit
+    for latency in range(2, 20):
+        limiter.on_success(float(latency))
+    assert limiter.limit == 3
+
+
+def test_limiter_caps_concurrent_requests():
+    limiter = ConcurrencyLimiter(initial_limit=2, min_limit=2, max_limit=2)
+    active, peak = 0, 0
+
+    async def request():
+        nonlocal active, peak
+        await limiter.acquire()
+        try:
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+        finally:
+            limiter.release()
+
+    async def main():
+        tasks = [asyncio.create_task(request()) for _ in range(10)]
+        # Cancelling a waiting request shouldn't leak its slot
+        await asyncio.sleep(0)
+        tasks[-1].cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    asyncio.run(main())
+    assert peak == 2
+    assert limiter.in_flight == 0
+
+
+def test_llmmap_shares_model_limiter():
+    model = LoadedModel("loaded", limiter=ConcurrencyLimiter(initial_limit=3))
+    bsql = BlendSQL(
+        {"w": pd.DataFrame({"name": [f"name{i}" for i in range(30)]})},
+        model=model,
+        ingredients={LLMMap},
+    )
+    smoothie = bsql.execute(
+        "SELECT COUNT(*) AS c FROM w WHERE {{LLMMap('Is this a name?', w.name)}} = TRUE"
+    )
+    assert smoothie.df()["c"][0] == 30
+    assert model.peak <= model.limiter.max_limit
+    assert smoothie.meta.concurrency_limit == model.limiter.limit >= 3
+
+
+def test_llmmap_backs_off_on_rate_limits():
+    model = LoadedModel(
+        "loaded", capacity=2, limiter=ConcurrencyLimiter(initial_limit=8)
+    )
+    bsql = BlendSQL(
+        {"w": pd.DataFrame({"name": [f"name{i}" for i in range(30)]})},
+        model=model,
+        ingredients={LLMMap},
+    )
+    with pytest.raises(Exception):
+        bsql.execute(
+            "SELECT * FROM w WHERE {{LLMMap('Is this a name?', w.name)}} = TRUE"
+        )
+    assert model.limiter.num_backoffs >= 1
+    assert model.limiter.limit < 8
@@ -0,0 +1,82 @@
+import math
+import pandas as pd
+from types import SimpleNamespace
+
+from blendsql import BlendSQL
+from blendsql.models import VLLM, MemoryCache
+from tests.utils import fake_completion, fake_openai_model, names_bsql
+
+# Probability the fake model gives its answer for each name
+CONFIDENCE = {"Alice": 0.95, "Bob": 0.6, "Anne": 0.99, "Carl": 0.3}
+
+
+class LogprobCompletions:
+    """Answers 'True' to everything, with logprobs (if asked for) from `CONFIDENCE`."""
+
+    def __init__(self):
+        self.requested_logprobs = []
+
+    async def create(self, messages: list[dict], stream: bool = False, **kwargs):
+        self.requested_logprobs.append(kwargs.get("logprobs", False))
+        name = next(n for n in CONFIDENCE if n in messages[-1]["content"])
+        logprobs = None
+        if kwargs.get("logprobs"):
+            logprobs = SimpleNamespace(
+                content=[
+                    SimpleNamespace(token="True", logprob=math.log(CONFIDENCE[name]))
+                ]
+            )
+        return fake_completion("True", logprobs=logprobs)
+
+
+def _bsql() -> tuple[BlendSQL, VLLM]:
+    model = fake_openai_model(LogprobCompletions(), caching=True, cache=MemoryCache())
+    return names_bsql(model, list(CONFIDENCE)), model
+
+
+def test_low_confidence_answers_are_null():
+    bsql, model = _bsql()
+    smoothie = bsql.execute(
+        "SELECT name, {{LLMMap('Is this a name?', w.name, return_type='bool', min_confidence=0.9)}} AS answer FROM w"
+    )
+    answers = dict(zip(smoothie.df()["name"], smoothie.df()["answer"]))
+    assert answers["Alice"] and answers["Anne"]
+    assert pd.isna(answers["Bob"]) and pd.isna(answers["Carl"])
+    assert all(model.client.chat.completions.requested_logprobs)
+    # Answers are cached with their confidence, so nothing is asked again
+    smoothie = bsql.execute(
+        "SELECT * FROM w WHERE {{LLMMap('Is this a name?', w.name, min_confidence=0.9)}} = TRUE"
+    )
+    assert set(smoothie.df()["name"]) == {"Alice", "Anne"}
+    assert len(model.client.chat.completions.requested_logprobs) == 4
+    # ...and a different threshold is checked against the cached confidence
+    smoothie = bsql.execute(
+        "SELECT * FROM w WHERE {{LLMMap('Is this a name?', w.name, min_confidence=0.5)}} = TRUE"
+    )
+    assert set(smoothie.df()["name"]) == {"Alice", "Anne", "Bob"}
+    assert len(model.client.chat.completions.requested_logprobs) == 4
+
+
+def test_logprobs_only_requested_when_needed():
+    bsql, model = _bsql()
+    smoothie = bsql.execute(
+        "SELECT * FROM w WHERE {{LLMMap('Is this a name?', w.name)}} = TRUE"
+    )
+    assert len(smoothie.df()) == 4
+    assert not any(model.client.chat.completions.requested_logprobs)
+
+
+def test_return_confidence():
+    bsql, model = _bsql()
+    smoothie = bsql.execute(
+        "SELECT name, {{LLMMap('Is this a name?', w.name, return_type='bool', return_confidence=True)}} AS confidence FROM w"
+    )
+    confidences = dict(zip(smoothie.df()["name"], smoothie.df()["confidence"]))
+    for name, confidence in CONFIDENCE.items():
+        assert math.isclose(confidences[name], confidence)
+    # Shares its cached answers with `min_confidence`
+    smoothie = bsql.execute(
+        "SELECT name FROM w WHERE {{LLMMap('Is this a name?', w.name, return_type='bool', min_confidence=0.9)}} = TRUE"
+    )
+    assert set(smoothie.df()["name"]) == {"Alice", "Anne"}
+    assert len(model.client.chat.completions.requested_logprobs) == 4
@@ -0,0 +1,64 @@
+import time
+import asyncio
+
+from blendsql.models import VLLM
+from blendsql.common.concurrency import shared_event_loop, run_coroutine
+
+
+def test_pool_limits_are_configurable():
+    model = VLLM("fake-model", max_connections=7, keepalive_expiry=30.0)
+    assert model.client._client is model.http_client
+    pool = model.http_client._transport._pool
+    assert pool._max_connections == 7
+    assert pool._keepalive_expiry == 30.0
+
+
+def test_executions_share_one_event_loop():
+    assert shared_event_loop() is shared_event_loop()
+    assert shared_event_loop().is_running()
+
+
+def test_session_outlives_ingredient_calls():
+    model = VLLM("fake-model")
+    loop = shared_event_loop()
+
+    async def ingredient_call():
+        async with model:
+            return await model._get_session()
+
+    first = asyncio.run_coroutine_threadsafe(ingredient_call(), loop).result()
+    second = asyncio.run_coroutine_threadsafe(ingredient_call(), loop).result()
+    assert first is second and not first.closed
+
+    # A session can't be used from another event loop, so we get a new one there
+    other = run_coroutine(ingredient_call())
+    assert other is not first
+    asyncio.run_coroutine_threadsafe(model.close(), loop).result()
+    assert first.closed
+
+
+def test_one_client_per_event_loop():
+    model = VLLM("fake-model")
+    loop = shared_event_loop()
+
+    async def get_client():
+        return model.client
+
+    shared = asyncio.run_coroutine_threadsafe(get_client(), loop).result()
+    assert asyncio.run_coroutine_threadsafe(get_client(), loop).result() is shared
+
+    async def use_from_another_loop():
+        # httpx connections only work on the loop that opened them
+        other = model.client
+        assert other is not shared
+        await model.close()
+        return other
+
+    other = asyncio.run(use_from_another_loop())
+    assert other.is_closed()
+    # The shared loop's client is closed on its own loop
+    for _ in range(100):
+        if shared.is_closed():
+            break
+        time.sleep(0.01)
+    assert shared.is_closed()
@@ -0,0 +1,74 @@
+import asyncio
+import threading
+
+from blendsql.ingredients import LLMMap
+from blendsql.models import ModelBase, MemoryCache
+from blendsql.common.typing import GenerationResult
+from tests.utils import names_bsql
+
+NAMES = [f"{'x' * (i % 7)}name{i}" for i in range(50)] + ["Al"]
+
+
+class RecordingModel(ModelBase):
+    """Offline model which answers 'True' for values in `yes`, recording each value it's asked about."""
+
+    def __init__(self, *args, yes=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.yes = yes
+        self.values = []
+        self.lock = threading.Lock()
+
+    async def generate(self, item, cancel_event=None, max_retries=3):
+        with self.lock:
+            self.values.append(item.identifier)
+        await asyncio.sleep(0.05)
+        if cancel_event is not None and cancel_event.is_set():
+            return GenerationResult(item.identifier, "", completed=False)
+        answer = self.yes is None or item.identifier in self.yes
+        return GenerationResult(item.identifier, str(answer), completed=True)
+
+
+QUERY = "SELECT * FROM w WHERE {{LLMMap('Is this a name?', w.name)}} = TRUE LIMIT %d"
+
+
+def test_in_flight_sized_to_remaining_values():
+    model = RecordingModel("fake")
+    smoothie = names_bsql(model, NAMES).execute(QUERY % 2)
+    assert len(smoothie.df()) == 2
+    # With nothing to go on, we assume half the values satisfy the predicate
+    assert len(model.values) <= 4
+
+
+def test_shortest_values_first():
+    model = RecordingModel("fake")
+    names_bsql(model, NAMES).execute(QUERY % 1)
+    assert model.values[0] == "Al"
+
+
+def test_custom_priority():
+    promising = {NAMES[10], NAMES[20]}
+    model = RecordingModel("fake", yes=promising)
+    smoothie = names_bsql(
+        model,
+        NAMES,
+        {LLMMap.from_args(early_exit_priority=lambda v: 0 if v in promising else 1)},
+    ).execute(QUERY % 2)
+    assert set(smoothie.df()["name"]) == promising
+    assert len(model.values) <= 4
+
+
+def test_cached_values_count_towards_exit():
+    model = RecordingModel("fake", caching=True, cache=MemoryCache())
+    names_bsql(model, NAMES[:2]).execute(QUERY % 2)
+    model.values.clear()
+    smoothie = names_bsql(model, NAMES).execute(QUERY % 2)
+    assert len(smoothie.df()) == 2
+    assert model.values == []
+
+
+def test_results_line_up_with_values():
+    model = RecordingModel("fake", yes={NAMES[3]})
+    smoothie = names_bsql(model, NAMES).execute(
+        "SELECT name FROM w WHERE {{LLMMap('Is this a name?', w.name)}} = TRUE LIMIT 1"
+    )
+    assert list(smoothie.df()["name"]) == [NAMES[3]]
@@ -0,0 +1,109 @@
+import asyncio
+import pytest
+
+from blendsql.models import ModelBase, LoadBalancedModel, ConcurrencyLimiter
+from blendsql.common.typing import GenerationItem, GenerationResult
+from tests.utils import names_bsql
+
+
+class FakeReplica(ModelBase):
+    """Offline replica which answers 'True', or fails with a connection error if `down`."""
+
+    def __init__(self, *args, down: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.down = down
+        self.prompts = []
+        self.in_flight = self.max_in_flight = 0
+
+    async def generate(self, item, cancel_event=None, max_retries=3):
+        if self.down:
+            raise ConnectionError("replica is down")
+        self.prompts.append(item.prompt)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        self.num_generation_calls += 1
+        self.prompt_tokens += 10
+        return GenerationResult(item.identifier, "True", completed=True)
+
+
+def _balanced(*down: bool, **kwargs) -> LoadBalancedModel:
+    return LoadBalancedModel(
+        [FakeReplica("fake", down=d) for d in down],
+        **kwargs,
+    )
+
+
+def _generate_all(model: ModelBase, items: list[GenerationItem]):
+    async def main():
+        return await asyncio.gather(*(model.generate(i) for i in items))
+
+    return asyncio.run(main())
+
+
+@pytest.mark.parametrize("strategy", ["least_outstanding", "latency"])
+def test_requests_are_spread_and_counted(strategy):
+    model = _balanced(False, False, False, strategy=strategy)
+    items = [GenerationItem(prompt=f"p{i}", grammar=None) for i in range(30)]
+    _generate_all(model, items)
+    assert all(len(r.prompts) >= 5 for r in model.replicas)
+    assert model.num_generation_calls == 30
+    assert model.prompt_tokens == 300
+    model.reset_stats()
+    assert model.num_generation_calls == 0
+    _generate_all(model, items[:3])
+    assert model.num_generation_calls == 3
+
+
+def test_shared_prefix_is_pinned_to_one_replica():
+    model = _balanced(False, False, False)
+    for prefix in ["instructions A", "instructions B"]:
+        for i in range(5):
+            asyncio.run(
+                model.generate(
+                    GenerationItem(prompt=f"{prefix}/{i}", prefix=prefix, grammar=None)
+                )
+            )
+    for prefix in ["instructions A", "instructions B"]:
+        assert (
+            sum(any(p.startswith(prefix) for p in r.prompts) for r in model.replicas)
+            == 1
+        )
+
+
+def test_unhealthy_replica_is_ejected():
+    model = _balanced(True, False, max_failures=2)
+    items = [GenerationItem(prompt=f"p{i}", grammar=None) for i in range(10)]
+    results = _generate_all(model, items)
+    assert all(r.completed for r in results)
+    assert len(model.replicas[1].prompts) == 10
+    assert model._states[0].ejected_until > 0
+    with pytest.raises(ConnectionError):
+        asyncio.run(_balanced(True, True).generate(items[0]))
+
+
+def test_smoothie_meta_aggregates_replicas():
+    model = _balanced(False, False)
+    bsql = names_bsql(model, ["Alice", "Bob", "Anne", "Carl"])
+    smoothie = bsql.execute(
+        "SELECT * FROM w WHERE {{LLMMap('Is this a name?', w.name)}} = TRUE"
+    )
+    assert len(smoothie.df()) == 4
+    assert smoothie.meta.num_generation_calls == 4
+    assert smoothie.meta.prompt_tokens == 40
+
+
+def test_replicas_admit_through_their_own_limiters():
+    replicas = [
+        FakeReplica("fake", limiter=ConcurrencyLimiter(initial_limit=1, max_limit=1))
+        for _ in range(2)
+    ]
+    model = LoadBalancedModel(replicas)
+    _generate_all(
+        model, [GenerationItem(prompt=f"p{i}", grammar=None) for i in range(10)]
+    )
+    assert [r.max_in_flight for r in replicas] == [1, 1]
+    assert all(r.limiter.in_flight == 0 for r in replicas)
+    # Without caching, the wrapper never opens a `DiskCache` of its own
+    assert model._cache is None
@@ -0,0 +1,64 @@
+import re
+import json
+import pytest
+import pandas as pd
+
+from blendsql import BlendSQL
+from blendsql.ingredients import LLMMap
+from blendsql.models import ModelBase
+from blendsql.common.typing import GenerationResult
+
+NAMES = ["Alice", "Bob", "Anne", "Carl", "Amy", "Dan", "Ava"]
+
+
+class StartsWithAModel(ModelBase):
+    """Offline model answering whether each value starts with 'A'.
+    Batched prompts get a JSON array, unless `break_batches`."""
+
+    def __init__(self, *args, break_batches: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.break_batches = break_batches
+        self.prompts = []
+
+    async def generate(self, item, cancel_event=None, max_retries=3):
+        self.num_generation_calls += 1
+        self.prompts.append(item.prompt)
+        batch_values = re.findall(r'INPUT \d+:\n.*?"name": ?"(\w+)"', item.prompt, re.S)
+        if batch_values:
+            answers = [v.startswith("A") for v in batch_values]
+            value = "not json" if self.break_batches else json.dumps(answers)
+        else:
+            value = str(item.identifier.startswith("A"))
+        return GenerationResult(item.identifier, value, completed=True)
+
+
+def _execute(model: ModelBase, batch_size: int | None, query: str | None = None):
+    bsql = BlendSQL(
+        {"w": pd.DataFrame({"name": NAMES})},
+        model=model,
+        ingredients={LLMMap.from_args(batch_size=batch_size)},
+    )
+    return bsql.execute(
+        query
+        or "SELECT name FROM w WHERE {{LLMMap('Does this start with A?', w.name)}} = TRUE ORDER BY name"
+    )
+
+
+@pytest.mark.parametrize("batch_size", [None, 3, 10])
+def test_batched_map_matches_unbatched(batch_size):
+    model = StartsWithAModel("fake")
+    smoothie = _execute(model, batch_size)
+    assert list(smoothie.df()["name"]) == ["Alice", "Amy", "Anne", "Ava"]
+    assert smoothie.meta.num_values_passed == len(NAMES)
+    expected_calls = len(NAMES) if batch_size is None else -(-len(NAMES) // batch_size)
+    assert len(model.prompts) == expected_calls
+
+
+def test_batched_map_falls_back_per_row():
+    model = StartsWithAModel("fake", break_batches=True)
+    smoothie = _execute(model, batch_size=3)
+    assert list(smoothie.df()["name"]) == ["Alice", "Amy", "Anne", "Ava"]
+    # 2 failed batches of 3, then 6 individual retries, plus the last lone value
+    assert len(model.prompts) == 2 + 6 + 1
+    # Retried values were already counted with their batch
+    assert smoothie.meta.num_values_passed == len(NAMES)
@@ -0,0 +1,92 @@
+import asyncio
+import math
+from types import SimpleNamespace
+
+from blendsql.models import ModelBase, CascadeModel
+from blendsql.common.typing import GenerationItem, GenerationResult
+from tests.utils import fake_completion, fake_openai_model, names_bsql
+
+
+class FakeTier(ModelBase):
+    """Offline model answering 'True', with low confidence for values in `unsure`."""
+
+    def __init__(self, *args, unsure=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.unsure = set(unsure)
+        self.values = []
+        self.requested_logprobs = []
+
+    async def generate(self, item, cancel_event=None, max_retries=3):
+        self.values.append(item.identifier)
+        self.requested_logprobs.append(item.logprobs)
+        self.record_usage(num_generation_calls=1, prompt_tokens=10)
+        confidence = 0.5 if item.identifier in self.unsure else 0.99
+        return GenerationResult(
+            item.identifier, "True", completed=True, confidence=confidence
+        )
+
+
+NAMES = ["Alice", "Bob", "Anne", "Carl"]
+
+
+QUERY = "SELECT * FROM w WHERE {{LLMMap('Is this a name?', w.name)}} = TRUE"
+
+
+def test_only_uncertain_items_escalate():
+    small, large = FakeTier("small", unsure={"Bob"}), FakeTier("large")
+    model = CascadeModel([small, large], min_confidence=0.9)
+    smoothie = names_bsql(model, NAMES).execute(QUERY)
+    assert len(smoothie.df()) == 4
+    assert sorted(small.values) == sorted(NAMES)
+    assert large.values == ["Bob"]
+    assert smoothie.meta.num_generation_calls == 5
+    small_usage, large_usage = smoothie.meta.tier_usage
+    assert small_usage["model"] == "small"
+    assert small_usage["num_generation_calls"] == 4
+    assert small_usage["num_escalations"] == 1
+    assert large_usage["num_generation_calls"] == 1
+    assert large_usage["prompt_tokens"] == 10
+    # Only requests to the first tier ask for logprobs, and the tiers themselves are left alone
+    assert all(small.requested_logprobs)
+    assert not any(large.requested_logprobs)
+    assert not small.logprobs
+
+
+def test_verifier_decides_escalation():
+    small, large = FakeTier("small"), FakeTier("large")
+
+    async def verifier(item: GenerationItem, result: GenerationResult) -> bool:
+        return item.identifier.startswith("A")
+
+    model = CascadeModel([small, large], verifier=verifier)
+    names_bsql(model, NAMES).execute(QUERY)
+    assert sorted(large.values) == ["Bob", "Carl"]
+    # Logprobs are only needed without a verifier
+    assert not any(small.requested_logprobs)
+
+
+def test_confidence_from_logprobs():
+    class LogprobCompletions:
+        async def create(self, messages: list[dict], stream: bool = False, **kwargs):
+            assert kwargs["logprobs"] is True
+            return fake_completion(
+                "True",
+                logprobs=SimpleNamespace(
+                    content=[
+                        SimpleNamespace(token="Tr", logprob=math.log(0.8)),
+                        SimpleNamespace(token="ue", logprob=0.0),
+                    ]
+                ),
+            )
+
+    small = fake_openai_model(LogprobCompletions(), "small")
+    large = FakeTier("large")
+    model = CascadeModel([small, large], min_confidence=[0.7])
+    assert not small.logprobs
+    item = GenerationItem(prompt="p", grammar=None, identifier="x", short_output=True)
+    result = asyncio.run(model.generate(item))
+    assert math.isclose(result.confidence, 0.8)
+    assert large.values == []
+    model.min_confidence = [0.9]
+    asyncio.run(model.generate(item))
+    assert large.values == ["x"]
@@ -0,0 +1,61 @@
+import asyncio
+import pytest
+
+from blendsql import BlendSQL
+from blendsql.models import VLLM
+from blendsql.common.typing import GenerationItem
+from tests.utils import (
+    FakeStream,
+    fake_usage,
+    fake_completion,
+    fake_openai_model,
+    names_bsql,
+)
+
+
+class RecordingCompletions:
+    """Answers 'True' to everything, streamed or not, recording which was asked for."""
+
+    def __init__(self):
+        self.streamed = []
+
+    async def create(self, messages: list[dict], stream: bool = False, **kwargs):
+        self.streamed.append(stream)
+        if stream:
+            return FakeStream("True", fake_usage())
+        return fake_completion("True", fake_usage())
+
+
+@pytest.fixture
+def model() -> VLLM:
+    return fake_openai_model(RecordingCompletions())
+
+
+@pytest.fixture
+def bsql(model) -> BlendSQL:
+    return names_bsql(model, ["Alice", "Bob", "Anne", "Carl"])
+
+
+def test_short_outputs_skip_streaming(bsql, model):
+    smoothie = bsql.execute(
+        "SELECT * FROM w WHERE {{LLMMap('Is this a name?', w.name)}} = TRUE"
+    )
+    assert len(smoothie.df()) == 4
+    assert model.client.chat.completions.streamed == [False] * 4
+    assert smoothie.meta.prompt_tokens == 20
+
+
+def test_early_exit_still_streams(bsql, model):
+    smoothie = bsql.execute(
+        "SELECT * FROM w WHERE {{LLMMap('Is this a name?', w.name)}} = TRUE LIMIT 1"
+    )
+    assert len(smoothie.df()) == 1
+    assert all(model.client.chat.completions.streamed)
+
+
+def test_long_outputs_stream(model):
+    result = asyncio.run(
+        model.generate(GenerationItem(prompt="Write an essay", grammar=None))
+    )
+    assert result.value == "True"
+    assert model.client.chat.completions.streamed == [True]
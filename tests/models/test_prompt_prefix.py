@@ -0,0 +1,64 @@
+import pytest
+
+from blendsql.ingredients import LLMMap
+from blendsql.models import VLLM
+from tests.utils import FakeStream, fake_usage, fake_openai_model, names_bsql
+
+
+class PrefixCachingCompletions:
+    """Mimics an OpenAI-compatible server with automatic prefix caching,
+    counting one 'token' per character of a previously seen system message."""
+
+    def __init__(self):
+        self.requests = []
+        self.seen_prefixes = set()
+
+    async def create(self, messages: list[dict], **kwargs):
+        self.requests.append(messages)
+        prompt_tokens = sum(len(m["content"]) for m in messages)
+        cached_tokens = 0
+        if messages[0]["role"] == "system":
+            if messages[0]["content"] in self.seen_prefixes:
+                cached_tokens = len(messages[0]["content"])
+            self.seen_prefixes.add(messages[0]["content"])
+        return FakeStream(
+            "true", fake_usage(prompt_tokens, cached_tokens=cached_tokens)
+        )
+
+
+@pytest.fixture
+def model() -> VLLM:
+    return fake_openai_model(PrefixCachingCompletions())
+
+
+def _execute(model: VLLM, share_prompt_prefix: bool):
+    bsql = names_bsql(
+        model,
+        ["Alice", "Bob", "Anne", "Carl"],
+        ingredients={LLMMap.from_args(share_prompt_prefix=share_prompt_prefix)},
+    )
+    return bsql.execute(
+        "SELECT name, {{LLMMap('Is this a name?', w.name)}} AS is_name FROM w"
+    )
+
+
+def test_shared_prefix_is_byte_identical(model):
+    smoothie = _execute(model, share_prompt_prefix=True)
+    requests = model.client.chat.completions.requests
+    assert len(requests) == 4
+    assert all(r[0]["role"] == "system" for r in requests)
+    assert len({r[0]["content"] for r in requests}) == 1
+    assert len({r[1]["content"] for r in requests}) == 4
+    # Only the first request misses the provider's prefix cache
+    assert smoothie.meta.cached_tokens == 3 * len(requests[0][0]["content"])
+
+
+def test_shared_prefix_matches_single_message_prompt(model):
+    _execute(model, share_prompt_prefix=False)
+    _execute(model, share_prompt_prefix=True)
+    requests = model.client.chat.completions.requests
+    single, split = requests[:4], requests[4:]
+    assert all(len(r) == 1 for r in single)
+    assert sorted(r[0]["content"] for r in single) == sorted(
+        r[0]["content"] + r[1]["content"] for r in split
+    )
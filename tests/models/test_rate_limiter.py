@@ -0,0 +1,192 @@
+import time
+import asyncio
+import pytest
+from types import SimpleNamespace
+
+from blendsql.models import Anthropic
+from blendsql.models.limiter import RateLimiter, retry_after_seconds
+from blendsql.common.typing import GenerationItem
+from tests.utils import FakeStream, fake_usage, fake_openai_model
+
+
+class ThrottledError(Exception):
+    def __init__(self, headers: dict):
+        super().__init__("429 Too Many Requests")
+        self.status_code = 429
+        self.response = SimpleNamespace(headers=headers)
+
+
+class ThrottlingCompletions:
+    """Rejects the first `num_throttled` requests with a `Retry-After` hint."""
+
+    def __init__(self, num_throttled: int, retry_after: str):
+        self.num_throttled = num_throttled
+        self.retry_after = retry_after
+        self.request_times = []
+
+    async def create(self, messages: list[dict], **kwargs):
+        self.request_times.append(time.monotonic())
+        if len(self.request_times) <= self.num_throttled:
+            raise ThrottledError({"retry-after": self.retry_after})
+        return FakeStream(usage=fake_usage(10))
+
+
+def test_retry_after_seconds():
+    assert retry_after_seconds(ThrottledError({"retry-after": "2"})) == 2.0
+    assert retry_after_seconds(ThrottledError({"retry-after-ms": "250"})) == 0.25
+    assert (
+        retry_after_seconds(
+            ThrottledError({"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"})
+        )
+        == 0.0
+    )
+    assert retry_after_seconds(ThrottledError({})) is None
+    assert retry_after_seconds(ValueError()) is None
+
+
+def test_generate_honors_retry_after():
+    completions = ThrottlingCompletions(num_throttled=1, retry_after="0.2")
+    model = fake_openai_model(completions)
+    result = asyncio.run(model.generate(GenerationItem(prompt="hi", grammar=None)))
+    assert result.value == "ok"
+    assert len(completions.request_times) == 2
+    assert completions.request_times[1] - completions.request_times[0] >= 0.2
+    assert model.num_generation_calls == 1
+
+
+def test_generate_gives_up_after_max_retries():
+    completions = ThrottlingCompletions(num_throttled=5, retry_after="0")
+    model = fake_openai_model(completions)
+    with pytest.raises(ThrottledError):
+        asyncio.run(
+            model.generate(GenerationItem(prompt="hi", grammar=None), max_retries=2)
+        )
+    assert len(completions.request_times) == 2
+
+
+def test_requests_per_minute():
+    # 10 requests per second, bursting at most 2
+    limiter = RateLimiter(requests_per_minute=600, burst_seconds=0.2)
+
+    async def main():
+        start = time.monotonic()
+        for _ in range(6):
+            await limiter.acquire()
+        return time.monotonic() - start
+
+    elapsed = asyncio.run(main())
+    assert 0.35 <= elapsed < 1.0
+
+
+def test_tokens_per_minute_reconciles_actual_usage():
+    # 1,000 tokens per second, bursting at most 100
+    limiter = RateLimiter(tokens_per_minute=60_000, burst_seconds=0.1)
+
+    async def main():
+        await limiter.acquire(10)
+        # The request actually used 210 tokens, so we're now 120 tokens in debt
+        limiter.reconcile(10, 210)
+        start = time.monotonic()
+        await limiter.acquire(10)
+        return time.monotonic() - start
+
+    elapsed = asyncio.run(main())
+    assert 0.1 <= elapsed < 0.5
+
+
+class FailingStream(FakeStream):
+    """Raises `exc` partway through, like a connection dropped by an overloaded server."""
+
+    def __init__(self, exc: Exception):
+        super().__init__()
+        self.exc = exc
+
+    async def _iter(self):
+        yield self.chunks[0]
+        raise self.exc
+
+
+class FailingStreamCompletions:
+    """The first stream fails, and the second succeeds."""
+
+    def __init__(self):
+        self.num_requests = 0
+
+    async def create(self, messages: list[dict], **kwargs):
+        self.num_requests += 1
+        if self.num_requests == 1:
+            return FailingStream(ThrottledError({"retry-after": "0"}))
+        return FakeStream(usage=fake_usage(10))
+
+
+def test_failed_stream_backs_off_and_refunds_tokens():
+    model = fake_openai_model(FailingStreamCompletions(), tokens_per_minute=60_000)
+    item = GenerationItem(prompt="hi" * 400, grammar=None)
+    capacity = model.rate_limiter._tokens.capacity
+    result = asyncio.run(model.generate(item))
+    assert result.value == "ok"
+    assert model.limiter.num_backoffs == 1
+    # Only the successful attempt's 11 tokens are charged
+    assert model.rate_limiter._tokens.level >= capacity - 11
+
+
+class CancelledStream(FakeStream):
+    """Streams a long chunk, then is cancelled before usage is reported."""
+
+    def __init__(self, cancel_event: asyncio.Event):
+        super().__init__("x" * 400)
+        self.cancel_event = cancel_event
+
+    async def _iter(self):
+        yield self.chunks[0]
+        self.cancel_event.set()
+        yield self.chunks[1]
+
+
+def test_cancelled_stream_reconciles_tokens():
+    cancel_event = asyncio.Event()
+
+    async def create(messages: list[dict], **kwargs):
+        return CancelledStream(cancel_event)
+
+    model = fake_openai_model(SimpleNamespace(create=create), tokens_per_minute=60_000)
+    capacity = model.rate_limiter._tokens.capacity
+    result = asyncio.run(
+        model.generate(
+            GenerationItem(prompt="hi", grammar=None), cancel_event=cancel_event
+        )
+    )
+    assert not result.completed
+    # No usage was reported, so the ~100 tokens we received are charged on top of the estimate
+    assert model.rate_limiter._tokens.level <= capacity - 100
+
+
+class ThrottlingMessages:
+    """Anthropic's `messages`, rejecting the first request with a `Retry-After` hint."""
+
+    def __init__(self):
+        self.num_requests = 0
+
+    async def create(self, **kwargs):
+        self.num_requests += 1
+        if self.num_requests == 1:
+            raise ThrottledError({"retry-after": "0"})
+        return SimpleNamespace(
+            content=[SimpleNamespace(type="text", text="ok")],
+            usage=SimpleNamespace(
+                input_tokens=10, output_tokens=1, cache_read_input_tokens=0
+            ),
+        )
+
+
+def test_anthropic_retries_and_refunds_tokens():
+    model = Anthropic("fake-model", api_key="N/A", tokens_per_minute=60_000)
+    model.client = SimpleNamespace(messages=ThrottlingMessages())
+    item = GenerationItem(prompt="hi" * 400, grammar=None, short_output=True)
+    capacity = model.rate_limiter._tokens.capacity
+    result = asyncio.run(model.generate(item))
+    assert result.value == "ok"
+    assert model.client.messages.num_requests == 2
+    assert model.limiter.num_backoffs == 1
+    # Only the successful attempt's 11 tokens are charged
+    assert model.rate_limiter._tokens.level >= capacity - 11
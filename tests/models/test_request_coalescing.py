@@ -0,0 +1,89 @@
+import asyncio
+import threading
+import pandas as pd
+
+from blendsql import BlendSQL
+from blendsql.ingredients import LLMMap, LLMQA
+from blendsql.models import ModelBase, MemoryCache
+from blendsql.common.typing import GenerationItem, GenerationResult
+
+
+class SlowModel(ModelBase):
+    """Offline model which takes a while to answer with the upper-cased identifier."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.requests = []
+        self.lock = threading.Lock()
+
+    async def generate(self, item, cancel_event=None, max_retries=3):
+        with self.lock:
+            self.requests.append(item.prompt)
+        await asyncio.sleep(0.2)
+        if cancel_event is not None and cancel_event.is_set():
+            return GenerationResult(item.identifier, "", completed=False)
+        return GenerationResult(
+            item.identifier, (item.identifier or "'A'").upper(), completed=True
+        )
+
+
+def _model() -> SlowModel:
+    return SlowModel("slow", caching=True, cache=MemoryCache())
+
+
+def test_concurrent_identical_items_share_one_request():
+    model = _model()
+
+    async def main():
+        items = [
+            GenerationItem(prompt="p", grammar=None, identifier=f"id{i}", cache_key="k")
+            for i in range(5)
+        ]
+        return await asyncio.gather(*(model.limited_generate(i) for i in items))
+
+    results = asyncio.run(main())
+    assert len(model.requests) == 1
+    assert model.num_coalesced_calls == 4
+    # Each caller gets the result under its own identifier
+    assert [r.identifier for r in results] == [f"id{i}" for i in range(5)]
+    assert {r.value for r in results} == {"ID0"}
+
+
+def test_follower_retries_when_leader_is_cancelled():
+    model = _model()
+    cancel_event = asyncio.Event()
+
+    async def main():
+        leader = GenerationItem(prompt="p", grammar=None, identifier="a", cache_key="k")
+        follower = GenerationItem(
+            prompt="p", grammar=None, identifier="b", cache_key="k"
+        )
+        leader_task = asyncio.create_task(model.limited_generate(leader, cancel_event))
+        await asyncio.sleep(0)
+        follower_task = asyncio.create_task(model.limited_generate(follower))
+        await asyncio.sleep(0.05)
+        cancel_event.set()
+        return await asyncio.gather(leader_task, follower_task)
+
+    leader_result, follower_result = asyncio.run(main())
+    assert not leader_result.completed
+    assert follower_result.completed and follower_result.value == "B"
+    assert len(model.requests) == 2
+
+
+def test_concurrent_queries_coalesce():
+    model = _model()
+    bsql = BlendSQL(
+        {"w": pd.DataFrame({"name": ["Alice", "Bob", "Anne", "Carl"]})},
+        model=model,
+        ingredients={LLMMap, LLMQA},
+    )
+    query = "SELECT name, {{LLMMap('Repeat the name', w.name)}} AS out FROM w"
+
+    async def main():
+        return await asyncio.gather(bsql.aexecute(query), bsql.aexecute(query))
+
+    first, second = asyncio.run(main())
+    # Both queries miss the cache, but only one of them sends requests
+    assert len(model.requests) == 4
+    assert first.df().equals(second.df())
@@ -0,0 +1,94 @@
+import asyncio
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+
+from blendsql import BlendSQL
+from blendsql.ingredients import LLMJoin
+from blendsql.models import VLLM
+from blendsql.common.typing import GenerationItem
+from tests.utils import (
+    FakeStream,
+    fake_usage,
+    fake_completion,
+    fake_openai_model,
+    names_bsql,
+)
+
+
+class SlowCompletions:
+    """Answers 'True' after a short wait, charging 5 prompt tokens per request."""
+
+    async def create(self, messages: list[dict], stream: bool = False, **kwargs):
+        await asyncio.sleep(0.05)
+        return fake_completion("True", fake_usage())
+
+
+def _model() -> VLLM:
+    return fake_openai_model(SlowCompletions())
+
+
+def _bsql(model: VLLM, num_rows: int) -> BlendSQL:
+    return names_bsql(model, [f"name{i}" for i in range(num_rows)])
+
+
+QUERY = "SELECT * FROM w WHERE {{LLMMap('Is this a name?', w.name)}} = TRUE"
+
+
+def test_concurrent_queries_get_their_own_counts():
+    model = _model()
+    small, large = _bsql(model, 3), _bsql(model, 5)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(b.execute, QUERY) for b in [small, large] * 2]
+        smoothies = [f.result() for f in futures]
+    for smoothie, num_rows in zip(smoothies, [3, 5] * 2):
+        assert smoothie.meta.num_generation_calls == num_rows
+        assert smoothie.meta.prompt_tokens == 5 * num_rows
+        assert smoothie.meta.completion_tokens == num_rows
+    # Running totals on the model span all queries
+    assert model.num_generation_calls == 16
+    assert model.prompt_tokens == 80
+
+
+def test_concurrent_aexecute_get_their_own_counts():
+    model = _model()
+    small, large = _bsql(model, 2), _bsql(model, 4)
+
+    async def main():
+        return await asyncio.gather(small.aexecute(QUERY), large.aexecute(QUERY))
+
+    first, second = asyncio.run(main())
+    assert first.meta.num_generation_calls == 2
+    assert second.meta.num_generation_calls == 4
+    assert model.num_generation_calls == 6
+
+
+def test_reset_stats_leaves_other_executions_alone():
+    model = _model()
+    asyncio.run(
+        model.generate(GenerationItem(prompt="p", grammar=None, short_output=True))
+    )
+    assert model.num_generation_calls == 1
+    model.reset_stats()
+    assert model.num_generation_calls == 0
+    smoothie = _bsql(model, 3).execute(QUERY)
+    assert smoothie.meta.num_generation_calls == 3
+
+
+def test_join_counts_each_call_once():
+    class JoinCompletions:
+        async def create(self, messages: list[dict], stream: bool = False, **kwargs):
+            return FakeStream('": -', fake_usage())
+
+    model = fake_openai_model(JoinCompletions())
+    bsql = BlendSQL(
+        {
+            "a": pd.DataFrame({"x": ["apple", "pear", "plum"]}),
+            "b": pd.DataFrame({"y": ["fruit one", "fruit two"]}),
+        },
+        model=model,
+        ingredients={LLMJoin},
+    )
+    smoothie = bsql.execute("SELECT * FROM a JOIN b ON {{LLMJoin(a.x, b.y)}}")
+    # One call per value in the smaller table
+    assert smoothie.meta.num_generation_calls == 2
+    assert model.num_generation_calls == 2
@@ -0,0 +1,101 @@
+import pytest
+import pandas as pd
+
+from blendsql import BlendSQL
+from blendsql.parse import PLAN_CACHE
+from tests.utils import test_starts_with, get_length, select_first_sorted
+
+
+@pytest.fixture(scope="module")
+def bsql() -> BlendSQL:
+    return BlendSQL(
+        {
+            "w": pd.DataFrame(
+                {
+                    "name": ["Alice", "Amy", "Bob", "Carol", "Anne"],
+                    "age": [23, 26, 19, 31, 40],
+                }
+            ),
+        },
+        ingredients={test_starts_with, get_length, select_first_sorted},
+    )
+
+
+@pytest.fixture(autouse=True)
+def clear_plan_cache():
+    PLAN_CACHE.clear()
+    yield
+    PLAN_CACHE.clear()
+
+
+@pytest.mark.cpu_only
+def test_repeated_query_uses_plan_cache(bsql):
+    query = """
+    SELECT name FROM w
+    WHERE {{test_starts_with('A', w.name)}} = TRUE
+    AND age > 20
+    ORDER BY name
+    """
+    first = bsql.execute(query)
+    assert PLAN_CACHE.misses == 1 and PLAN_CACHE.hits == 0
+    second = bsql.execute(query)
+    assert PLAN_CACHE.hits == 1
+    assert first.df().equals(second.df())
+    assert list(second.df()["name"]) == ["Alice", "Amy", "Anne"]
+
+
+@pytest.mark.cpu_only
+def test_plan_cache_is_not_mutated_by_execution(bsql):
+    # The early exit condition gets written into the ingredient kwargs during execution
+    # This shouldn't leak into the cached plan
+    query = """
+    SELECT name FROM w
+    WHERE {{test_starts_with('A', w.name)}} = TRUE
+    LIMIT 1
+    """
+    first = bsql.execute(query)
+    second = bsql.execute(query)
+    assert PLAN_CACHE.hits == 1
+    assert first.df().equals(second.df())
+    (plan,) = PLAN_CACHE._plans.values()
+    for d in plan.ingredient_alias_to_parsed_dict.values():
+        assert "exit_condition_func" not in d["kwargs_dict"]
+        assert "model" not in d["kwargs_dict"]
+
+
+@pytest.mark.cpu_only
+def test_plan_cache_with_subqueries(bsql):
+    query = """
+    SELECT name, {{get_length(w.name)}} AS l FROM w
+    WHERE name = {{select_first_sorted(options=w.name)}}
+    OR age IN (SELECT age FROM w WHERE {{test_starts_with('C', w.name)}})
+    ORDER BY name
+    """
+    first = bsql.execute(query)
+    second = bsql.execute(query)
+    assert PLAN_CACHE.hits >= 1
+    assert first.df().equals(second.df())
+
+
+@pytest.mark.cpu_only
+def test_plan_cache_keyed_on_ingredients(bsql):
+    query = "SELECT name FROM w WHERE {{test_starts_with('B', w.name)}} = TRUE"
+    _ = bsql.execute(query)
+    _ = bsql.execute(query, ingredients={test_starts_with})
+    assert PLAN_CACHE.hits == 0
+    assert PLAN_CACHE.misses == 2
+
+
+@pytest.mark.cpu_only
+def test_plan_cache_reused_across_params(bsql):
+    query = """
+    SELECT name FROM w
+    WHERE {{test_starts_with('A', w.name)}} = TRUE
+    AND age > ?
+    ORDER BY name
+    """
+    first = bsql.execute(query, params=[20])
+    second = bsql.execute(query, params=[25])
+    assert PLAN_CACHE.misses == 1 and PLAN_CACHE.hits == 1
+    assert list(first.df()["name"]) == ["Alice", "Amy", "Anne"]
+    assert list(second.df()["name"]) == ["Amy", "Anne"]
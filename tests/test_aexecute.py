@@ -0,0 +1,157 @@
+import asyncio
+import pytest
+import pandas as pd
+
+from blendsql import BlendSQL
+from blendsql.ingredients import MapIngredient
+
+DF = pd.DataFrame({"name": ["Alice", "Amy", "Bob", "Carol", "Anne"]})
+
+
+class async_is_short(MapIngredient):
+    """Records the event loop each `run()` was awaited on,
+    and the most `run()` calls in flight at once.
+    """
+
+    loops = []
+    in_flight = 0
+    max_in_flight = 0
+
+    async def run(self, values: list[str], **kwargs) -> list[bool]:
+        async_is_short.loops.append(asyncio.get_running_loop())
+        async_is_short.in_flight += 1
+        async_is_short.max_in_flight = max(
+            async_is_short.max_in_flight, async_is_short.in_flight
+        )
+        await asyncio.sleep(0.05)
+        async_is_short.in_flight -= 1
+        return [len(v) <= 3 for v in values]
+
+
+QUERY = (
+    "SELECT name FROM w WHERE {{async_is_short('short?', w.name)}} = TRUE ORDER BY name"
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_loops():
+    async_is_short.loops.clear()
+    async_is_short.max_in_flight = 0
+
+
+def _bsql() -> BlendSQL:
+    return BlendSQL({"w": DF}, ingredients={async_is_short})
+
+
+def test_aexecute_uses_callers_event_loop():
+    bsql = _bsql()
+
+    async def main():
+        smoothie = await bsql.aexecute(QUERY)
+        return smoothie, asyncio.get_running_loop()
+
+    smoothie, loop = asyncio.run(main())
+    assert list(smoothie.df()["name"]) == ["Amy", "Bob"]
+    assert async_is_short.loops == [loop]
+
+
+def test_aexecute_concurrent_queries():
+    instances = [_bsql() for _ in range(4)]
+
+    async def main():
+        return await asyncio.gather(*[bsql.aexecute(QUERY) for bsql in instances])
+
+    smoothies = asyncio.run(main())
+    assert all(list(s.df()["name"]) == ["Amy", "Bob"] for s in smoothies)
+    # Every ingredient call shared the one loop
+    assert len(async_is_short.loops) == 4
+    assert len(set(async_is_short.loops)) == 1
+
+
+def test_aexecute_same_instance_is_serialized():
+    bsql = _bsql()
+
+    async def main():
+        return await asyncio.gather(
+            bsql.aexecute(QUERY),
+            bsql.prepare(
+                "SELECT name FROM w WHERE {{async_is_short('short?', w.name)}} = TRUE AND name != ?"
+            ).aexecute(["Bob"]),
+        )
+
+    first, second = asyncio.run(main())
+    assert list(first.df()["name"]) == ["Amy", "Bob"]
+    assert list(second.df()["name"]) == ["Amy"]
+
+
+def test_execute_shares_one_loop_per_query():
+    bsql = _bsql()
+    smoothie = bsql.execute(
+        """
+        SELECT name FROM w
+        WHERE {{async_is_short('short?', w.name)}} = TRUE
+        AND name IN (SELECT name FROM w WHERE {{async_is_short('also short?', w.name)}} = TRUE)
+        """
+    )
+    assert set(smoothie.df()["name"]) == {"Amy", "Bob"}
+    assert len(async_is_short.loops) == 2
+    assert len(set(async_is_short.loops)) == 1
+
+
+def test_aexecute_same_sqlite_instance_runs_concurrently(tmp_path):
+    import sqlite3
+
+    db_path = tmp_path / "concurrent.db"
+    with sqlite3.connect(db_path) as con:
+        DF.to_sql("w", con, index=False)
+    bsql = BlendSQL(str(db_path), ingredients={async_is_short})
+    # Each execution materializes the CTE to a temp table named `t`,
+    #   which only its own leased connection can see
+    prepared = bsql.prepare(
+        """
+        WITH t AS (SELECT name FROM w WHERE {{async_is_short('short?', w.name)}} = TRUE)
+        SELECT name FROM t WHERE name != ? ORDER BY name
+        """
+    )
+    excluded = ["Amy", "Bob", "Carol", "Zed"]
+
+    async def main():
+        return await asyncio.gather(*[prepared.aexecute([name]) for name in excluded])
+
+    smoothies = asyncio.run(main())
+    assert [list(s.df()["name"]) for s in smoothies] == [
+        ["Bob"],
+        ["Amy"],
+        ["Amy", "Bob"],
+        ["Amy", "Bob"],
+    ]
+    assert len(async_is_short.loops) == len(excluded)
+    # Executions weren't serialized
+    assert async_is_short.max_in_flight > 1
+    # Leased connections are returned to the pool without their temp tables
+    with bsql.db.lease():
+        assert not bsql.db.has_temp_table("t")
+
+
+def test_aexecute_in_memory_sqlite():
+    from sqlalchemy import text
+    from blendsql.db import SQLite
+
+    db = SQLite(":memory:")
+    db.con.execute(text("CREATE TABLE w (name TEXT)"))
+    db.con.execute(
+        text("INSERT INTO w VALUES (:name)"), [{"name": name} for name in DF["name"]]
+    )
+    db.con.commit()
+    bsql = BlendSQL(db, ingredients={async_is_short})
+    num_resets = []
+    reset_connection = db._reset_connection
+    db._reset_connection = lambda: num_resets.append(1) or reset_connection()
+
+    async def main():
+        # The database only exists on one connection, so these take turns on it
+        return await asyncio.gather(bsql.aexecute(QUERY), bsql.aexecute(QUERY))
+
+    smoothies = asyncio.run(main())
+    assert all(list(s.df()["name"]) == ["Amy", "Bob"] for s in smoothies)
+    assert len(num_resets) == 2
@@ -0,0 +1,162 @@
+import asyncio
+import threading
+import pytest
+import pandas as pd
+
+from blendsql import BlendSQL
+from blendsql.ingredients import MapIngredient, QAIngredient
+from blendsql.common.concurrency import defer, run_interleaved
+
+DB = {
+    "w": pd.DataFrame(
+        {
+            "name": ["Alice", "Amy", "Bob", "Carol", "Anne"],
+            "city": ["Paris", "Rome", "Oslo", "Paris", "Lima"],
+        }
+    ),
+    "v": pd.DataFrame({"city": ["Paris", "Rome", "Oslo", "Lima", "Kyiv"]}),
+}
+
+
+class Tracker:
+    """Records the peak number of concurrent `run()` calls."""
+
+    active = 0
+    peak = 0
+
+    @classmethod
+    async def track(cls, delay: float = 0.1):
+        cls.active += 1
+        cls.peak = max(cls.peak, cls.active)
+        await asyncio.sleep(delay)
+        cls.active -= 1
+
+
+class slow_first(QAIngredient):
+    async def run(self, options: set, **kwargs) -> str:
+        await Tracker.track()
+        return f"'{sorted(options)[0]}'"
+
+
+class slow_last(QAIngredient):
+    async def run(self, options: set, **kwargs) -> str:
+        await Tracker.track()
+        return f"'{sorted(options)[-1]}'"
+
+
+class slow_is_short(MapIngredient):
+    async def run(self, values: list[str], **kwargs) -> list[bool]:
+        await Tracker.track()
+        return [len(v) <= 4 for v in values]
+
+
+class slow_starts_with_a(MapIngredient):
+    async def run(self, values: list[str], **kwargs) -> list[bool]:
+        await Tracker.track()
+        return [v.startswith("A") for v in values]
+
+
+@pytest.fixture(autouse=True)
+def reset_tracker():
+    Tracker.active = Tracker.peak = 0
+
+
+@pytest.fixture
+def bsql() -> BlendSQL:
+    return BlendSQL(
+        DB, ingredients={slow_first, slow_last, slow_is_short, slow_starts_with_a}
+    )
+
+
+def test_qa_ingredients_run_concurrently(bsql):
+    smoothie = bsql.execute(
+        """
+        SELECT name FROM w
+        WHERE name = {{slow_first('first?', options=w.name)}}
+        OR name = {{slow_last('last?', options=w.name)}}
+        ORDER BY name
+        """
+    )
+    assert list(smoothie.df()["name"]) == ["Alice", "Carol"]
+    assert Tracker.peak == 2
+
+
+def test_map_ingredients_run_concurrently(bsql):
+    smoothie = bsql.execute(
+        """
+        SELECT w.name FROM w JOIN v ON w.city = v.city
+        WHERE {{slow_starts_with_a('starts with A?', w.name)}} = TRUE
+        AND {{slow_is_short('short?', v.city)}} = TRUE
+        ORDER BY w.name
+        """
+    )
+    assert list(smoothie.df()["name"]) == ["Amy", "Anne"]
+    assert Tracker.peak == 2
+
+
+def test_cascade_filter_maps_run_sequentially(bsql):
+    smoothie = bsql.execute(
+        """
+        SELECT name FROM w
+        WHERE {{slow_starts_with_a('starts with A?', w.name)}} = TRUE
+        AND {{slow_is_short('short?', w.city)}} = TRUE
+        ORDER BY name
+        """
+    )
+    assert list(smoothie.df()["name"]) == ["Amy", "Anne"]
+    assert Tracker.peak == 1
+
+
+def test_async_limit_of_one_runs_sequentially(bsql, monkeypatch):
+    monkeypatch.setenv("BLENDSQL_ASYNC_LIMIT", "1")
+    smoothie = bsql.execute(
+        """
+        SELECT name FROM w
+        WHERE name = {{slow_first('first?', options=w.name)}}
+        OR name = {{slow_last('last?', options=w.name)}}
+        ORDER BY name
+        """
+    )
+    assert list(smoothie.df()["name"]) == ["Alice", "Carol"]
+    assert Tracker.peak == 1
+
+
+def test_run_interleaved_preserves_order_and_raises():
+    async def double(i: int) -> int:
+        await asyncio.sleep(0.01 * (5 - i))
+        return i * 2
+
+    async def call(i: int) -> int:
+        return await defer(double(i))
+
+    assert run_interleaved([call(i) for i in range(5)]) == [0, 2, 4, 6, 8]
+
+    async def fail():
+        raise ValueError("boom")
+
+    async def call_fail():
+        return await defer(fail())
+
+    with pytest.raises(ValueError):
+        run_interleaved([call(1), call_fail()])
+
+
+def test_ingredient_calls_stay_on_executing_thread():
+    threads = set()
+
+    class sync_is_short(MapIngredient):
+        def run(self, values: list[str], **kwargs) -> list[bool]:
+            threads.add(threading.current_thread())
+            return [len(v) <= 4 for v in values]
+
+    bsql = BlendSQL(DB, ingredients={slow_starts_with_a, sync_is_short})
+    smoothie = bsql.execute(
+        """
+        SELECT w.name FROM w JOIN v ON w.city = v.city
+        WHERE {{slow_starts_with_a('starts with A?', w.name)}} = TRUE
+        AND {{sync_is_short('short?', v.city)}} = TRUE
+        ORDER BY w.name
+        """
+    )
+    assert list(smoothie.df()["name"]) == ["Amy", "Anne"]
+    assert threads == {threading.current_thread()}
@@ -0,0 +1,86 @@
+import sqlite3
+import pytest
+import pandas as pd
+
+from blendsql import BlendSQL
+from tests.utils import test_starts_with, get_length
+
+DF = pd.DataFrame(
+    {
+        "name": ["Alice", "Amy", "Bob", "Carol", "Anne"],
+        "age": [23, 26, 19, 31, 40],
+    }
+)
+
+
+@pytest.fixture(params=["pandas", "sqlite"], scope="module")
+def bsql(request, tmp_path_factory) -> BlendSQL:
+    if request.param == "pandas":
+        db = {"w": DF}
+    else:
+        db = str(tmp_path_factory.mktemp("db") / "w.db")
+        with sqlite3.connect(db) as con:
+            DF.to_sql("w", con, index=False)
+    return BlendSQL(db, ingredients={test_starts_with, get_length})
+
+
+def test_prepared_query_binds_driver_params(bsql):
+    prepared = bsql.prepare(
+        "SELECT name, {{get_length(w.name)}} AS l FROM w WHERE age > ? ORDER BY name"
+    )
+    assert prepared.num_params == 1
+    assert prepared.inlined_param_idxs == set()
+    for age in [20, 25, 30]:
+        query, db_params = prepared.bind([age])
+        # The query text doesn't change, so the plan is reused
+        assert query == prepared.named_query
+        assert list(db_params.values()) == [age]
+        smoothie = prepared.execute([age])
+        assert list(smoothie.df()["name"]) == sorted(DF[DF["age"] > age]["name"])
+    assert prepared.plan_cache.misses == 1
+    assert prepared.plan_cache.hits == 2
+    # Bound params shouldn't outlive the execution
+    assert bsql.db.bound_params is None
+
+
+def test_prepared_query_inlines_ingredient_args(bsql):
+    prepared = bsql.prepare(
+        """
+        SELECT name FROM w
+        WHERE {{test_starts_with(?, w.name)}} = TRUE
+        AND age > ?
+        ORDER BY name LIMIT ?
+        """
+    )
+    assert prepared.inlined_param_idxs == {0, 2}
+    assert list(prepared.execute(["A", 20, 5]).df()["name"]) == [
+        "Alice",
+        "Amy",
+        "Anne",
+    ]
+    assert list(prepared.execute(["A", 25, 1]).df()["name"]) == ["Amy"]
+    assert list(prepared.execute(["C", 1, 5]).df()["name"]) == ["Carol"]
+
+
+def test_prepared_query_tuple_param(bsql):
+    prepared = bsql.prepare("SELECT name FROM w WHERE age > ? AND name IN ?")
+    smoothie = prepared.execute([20, ("Amy", "Bob", "Carol")])
+    assert set(smoothie.df()["name"]) == {"Amy", "Carol"}
+
+
+def test_prepared_query_matches_execute(bsql):
+    query = (
+        "SELECT name FROM w WHERE {{test_starts_with('A', w.name)}} = TRUE AND age < ?"
+    )
+    assert (
+        bsql.prepare(query)
+        .execute([30])
+        .df()
+        .equals(bsql.execute(query, params=[30]).df())
+    )
+
+
+def test_prepared_query_wrong_num_params(bsql):
+    prepared = bsql.prepare("SELECT name FROM w WHERE age > ? AND age < ?")
+    with pytest.raises(ValueError):
+        prepared.execute([20])
@@ -50,8 +50,6 @@ def test_num_values_passed_map(bsql, model):
     total_num_values_to_process = bsql.db.execute_to_list(
         "SELECT COUNT(DISTINCT Name) FROM People", to_type=int
     )[0]
-    assert model.completion_tokens == 0
-    assert model.prompt_tokens == 0
     smoothie = bsql.execute(
         """
         SELECT {{LLMMap('Is a famous singer?', p.Name, options=('y', 'n'))}} FROM People p
@@ -60,6 +58,8 @@ def test_num_values_passed_map(bsql, model):
     )
     assert smoothie.meta.num_values_passed == total_num_values_to_process
     assert smoothie.meta.num_generation_calls == total_num_values_to_process
+    # The model keeps running totals across executions
+    assert model.num_generation_calls >= smoothie.meta.num_generation_calls
     # assert smoothie.meta.completion_tokens < 30
 
 
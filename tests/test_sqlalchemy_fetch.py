@@ -0,0 +1,55 @@
+import sqlite3
+import polars as pl
+import pytest
+
+from blendsql.db import SQLite
+
+
+@pytest.fixture
+def db(tmp_path) -> SQLite:
+    db_path = tmp_path / "fetch.db"
+    con = sqlite3.connect(db_path)
+    con.execute("CREATE TABLE w (name TEXT, age INTEGER)")
+    con.executemany("INSERT INTO w VALUES (?, ?)", [("Alice", 30), ("Bob", None)])
+    con.commit()
+    con.close()
+    return SQLite(str(db_path))
+
+
+def test_duplicate_columns_are_renamed(db):
+    df = db.execute_to_df(
+        "SELECT w.name, x.name, x.name FROM w JOIN w AS x ON w.name = x.name ORDER BY w.name",
+        lazy=False,
+    )
+    assert df.columns == ["name", "name_1", "name_2"]
+    assert df["name_2"].to_list() == ["Alice", "Bob"]
+
+
+def test_column_types(db):
+    df = db.execute_to_df("SELECT name, age, NULL AS missing FROM w", lazy=False)
+    assert df.schema == pl.Schema(
+        {"name": pl.String, "age": pl.Int64, "missing": pl.String}
+    )
+    assert df["age"].to_list() == [30, None]
+
+
+def test_empty_result(db):
+    df = db.execute_to_df("SELECT name, age FROM w WHERE age > 100").collect()
+    assert df.height == 0
+    assert df.schema == pl.Schema({"name": pl.String, "age": pl.String})
+
+
+def test_mixed_type_column(tmp_path):
+    db_path = tmp_path / "mixed.db"
+    con = sqlite3.connect(db_path)
+    # Columns without a declared type keep whatever type each value has
+    con.execute("CREATE TABLE t (id INTEGER, v)")
+    con.executemany(
+        "INSERT INTO t VALUES (?, ?)",
+        [(1, 7), (2, b"blob"), (3, "text"), (4, 2.5), (5, None)],
+    )
+    con.commit()
+    con.close()
+    df = SQLite(str(db_path)).execute_to_df("SELECT * FROM t ORDER BY id", lazy=False)
+    assert df.schema == pl.Schema({"id": pl.Int64, "v": pl.String})
+    assert df["v"].to_list() == ["7", "blob", "text", "2.5", None]
@@ -0,0 +1,183 @@
+import sqlite3
+import datetime
+import polars as pl
+import pytest
+
+from blendsql.db import SQLite
+from blendsql.db.sqlalchemy import SQLAlchemyDatabase
+
+
+@pytest.fixture
+def db(tmp_path) -> SQLite:
+    db_path = tmp_path / "temp_tables.db"
+    sqlite3.connect(db_path).close()
+    return SQLite(str(db_path))
+
+
+def test_bulk_loader_matches_pandas(db, monkeypatch):
+    df = pl.DataFrame(
+        {
+            "i": [1, None],
+            "s": ["x", ""],
+            "b": [True, None],
+            "f": [1.5, None],
+            "d": [datetime.date(2020, 1, 2), None],
+            "dt": [datetime.datetime(2020, 1, 2, 3, 4, 5), None],
+            "c": ["u", "v"],
+        },
+        schema_overrides={"c": pl.Categorical},
+    )
+    db.to_temp_table(df, "bulk")
+    monkeypatch.setattr(SQLite, "_bulk_insert", SQLAlchemyDatabase._bulk_insert)
+    db.to_temp_table(df, "pandas")
+    assert (
+        db.con.exec_driver_sql("SELECT * FROM bulk").fetchall()
+        == db.con.exec_driver_sql("SELECT * FROM pandas").fetchall()
+    )
+
+
+def test_nested_columns_fall_back_to_pandas(db):
+    df = pl.DataFrame({"i": [1, 2], "l": [[1], [2, 3]]})
+    db.to_temp_table(df, "nested")
+    assert db.execute_to_list("SELECT i FROM nested") == [1, 2]
+
+
+def test_empty_temp_table(db):
+    db.to_temp_table(pl.DataFrame({"i": []}, schema={"i": pl.Int64}), "empty")
+    assert db.has_temp_table("empty")
+    assert db.execute_to_list("SELECT COUNT(*) FROM empty") == [0]
+
+
+def test_duckdb_registered_temp_tables():
+    import pandas as pd
+    from blendsql import BlendSQL
+    from blendsql.ingredients import LLMMap
+    from blendsql.models import ModelBase
+    from blendsql.common.typing import GenerationResult
+
+    class StartsWithA(ModelBase):
+        async def generate(self, item, cancel_event=None, max_retries=3):
+            answer = item.identifier.startswith("A")
+            return GenerationResult(item.identifier, str(answer), completed=True)
+
+    query = """
+        SELECT name, {{LLMMap('Does this start with A?', w.name, return_type='bool')}} AS a
+        FROM w WHERE age > 1 AND name != 'Zed' ORDER BY name
+    """
+    results = []
+    for register_temp_tables in (False, True):
+        bsql = BlendSQL(
+            {"w": pd.DataFrame({"name": ["Alice", "Bob", "Anne"], "age": [2, 3, 1]})},
+            model=StartsWithA("fake"),
+            ingredients={LLMMap},
+        )
+        bsql.db.register_temp_tables = register_temp_tables
+        results.append(bsql.execute(query).df())
+        # Temp tables (or views) are released after each query
+        assert bsql.db.tables() == ["w"]
+    pd.testing.assert_frame_equal(*results)
+    assert list(results[1]["a"]) == [True, False]
+
+
+def test_duckdb_filters_on_registered_strings():
+    import duckdb
+    from blendsql.db import DuckDB
+
+    db = DuckDB(con=duckdb.connect(), register_temp_tables=True)
+    db.to_temp_table(
+        pl.DataFrame({"name": ["Alice", "Bob", "Carl"], "b": [None, True, False]}), "v"
+    )
+    assert db.execute_to_list("SELECT name FROM v WHERE b = TRUE LIMIT 1") == ["Bob"]
+    db._reset_connection()
+    assert not db.has_temp_table("v")
+
+
+@pytest.mark.parametrize("dialect", ["duckdb", "sqlite"])
+def test_map_side_tables(dialect, tmp_path):
+    import pandas as pd
+    from blendsql import BlendSQL
+    from blendsql.ingredients import LLMMap
+    from blendsql.models import ModelBase
+    from blendsql.common.typing import GenerationResult
+
+    class StartsWithA(ModelBase):
+        async def generate(self, item, cancel_event=None, max_retries=3):
+            answer = "Alice" in item.identifier or "Anne" in item.identifier
+            return GenerationResult(item.identifier, str(answer), completed=True)
+
+    w = pd.DataFrame(
+        {"name": ["Alice", "Bob", "Anne", None, "Bob"], "age": [2, 3, 1, 4, 3]}
+    )
+    if dialect == "duckdb":
+        data = {"w": w}
+    else:
+        db_path = tmp_path / "side_tables.db"
+        with sqlite3.connect(db_path) as con:
+            w.to_sql("w", con, index=False)
+        data = str(db_path)
+    queries = [
+        """SELECT name, age, {{LLMMap('Does this start with A?', w.name, return_type='bool')}} AS a
+        FROM w WHERE age > 1 ORDER BY age, name""",
+        """SELECT name, {{LLMMap('Is this Alice or Anne?', w.name, w.age, return_type='bool')}} AS a,
+        {{LLMMap('Does this start with A?', w.name, return_type='bool')}} AS b
+        FROM w ORDER BY age, name""",
+        """SELECT name FROM w WHERE {{LLMMap('Does this start with A?', w.name, return_type='bool')}} = TRUE
+        OR age IN (SELECT age FROM w WHERE age > 2 AND {{LLMMap('Does this start with A?', w.name, return_type='bool')}} = FALSE)
+        ORDER BY name""",
+    ]
+    for query in queries:
+        results = []
+        for enable_map_side_tables in (False, True):
+            bsql = BlendSQL(
+                data,
+                model=StartsWithA("fake"),
+                ingredients={LLMMap},
+                enable_map_side_tables=enable_map_side_tables,
+            )
+            results.append(bsql.execute(query).df())
+            # Side tables and views are released after each query
+            assert bsql.db.tables() == ["w"]
+        pd.testing.assert_frame_equal(*results)
+        assert len(results[0]) > 0
+
+
+@pytest.mark.parametrize("dialect", ["duckdb", "sqlite"])
+@pytest.mark.parametrize("register_temp_tables", [False, True])
+def test_deterministic_order_follows_rows(dialect, register_temp_tables, tmp_path):
+    import pandas as pd
+    from blendsql import BlendSQL
+    from blendsql.ingredients import LLMMap
+    from blendsql.models import ModelBase
+    from blendsql.common.typing import GenerationResult
+
+    seen = []
+
+    class Recorder(ModelBase):
+        async def generate(self, item, cancel_event=None, max_retries=3):
+            seen.append(item.identifier)
+            return GenerationResult(item.identifier, "true", completed=True)
+
+    w = pd.DataFrame({"name": ["Dan", "Carl", "Bob", "Alice"], "age": [1, 2, 3, 4]})
+    if dialect == "duckdb":
+        data = {"w": w}
+    else:
+        db_path = tmp_path / "order.db"
+        with sqlite3.connect(db_path) as con:
+            w.to_sql("w", con, index=False)
+        data = str(db_path)
+    bsql = BlendSQL(
+        data,
+        model=Recorder("fake", batch_size=1),
+        ingredients={LLMMap},
+        enable_map_side_tables=True,
+    )
+    bsql.db.register_temp_tables = register_temp_tables
+    # The first LLMMap reads a filtered temp table, the second the side table
+    # view holding the first map's outputs
+    bsql.execute(
+        """SELECT name FROM w WHERE age > 1
+        AND {{LLMMap('Is this a name?', w.name, return_type='bool')}} = TRUE
+        AND {{LLMMap('Is this a person?', w.name, return_type='bool')}} = TRUE"""
+    )
+    # Values reach the model in row order, not sorted by value
+    assert seen == ["Carl", "Bob", "Alice"] * 2
@@ -1,8 +1,10 @@
 from collections.abc import Collection
 from typing import Iterable, Union
+from types import SimpleNamespace
 import pandas as pd
 from typing import Callable
 
+from blendsql import BlendSQL
 from blendsql.db.utils import single_quote_escape
 from blendsql.ingredients import (
     AliasIngredient,
@@ -10,7 +12,9 @@ from blendsql.ingredients import (
     JoinIngredient,
     MapIngredient,
     QAIngredient,
+    LLMMap,
 )
+from blendsql.models import VLLM, ModelBase
 
 
 class test_starts_with(MapIngredient):
@@ -173,3 +177,71 @@ class do_join(JoinIngredient):
 
     def run(self, left_values: list[str], right_values: list[str], **kwargs) -> dict:
         return {left_value: left_value for left_value in left_values}
+
+
+def fake_usage(
+    prompt_tokens: int = 5, completion_tokens: int = 1, cached_tokens: int | None = None
+) -> SimpleNamespace:
+    """Token usage, as reported by an OpenAI-compatible server."""
+    return SimpleNamespace(
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        prompt_tokens_details=(
+            None
+            if cached_tokens is None
+            else SimpleNamespace(cached_tokens=cached_tokens)
+        ),
+    )
+
+
+def fake_completion(content: str, usage=None, logprobs=None) -> SimpleNamespace:
+    """A non-streamed chat completion."""
+    return SimpleNamespace(
+        choices=[
+            SimpleNamespace(message=SimpleNamespace(content=content), logprobs=logprobs)
+        ],
+        usage=usage,
+    )
+
+
+class FakeStream:
+    """A streamed chat completion, sending `content` in one chunk, and then `usage`."""
+
+    def __init__(self, content: str = "ok", usage=None):
+        self.chunks = [
+            SimpleNamespace(
+                choices=[SimpleNamespace(delta=SimpleNamespace(content=content))],
+                usage=None,
+            ),
+            SimpleNamespace(choices=[], usage=usage),
+        ]
+
+    def __aiter__(self):
+        return self._iter()
+
+    async def _iter(self):
+        for chunk in self.chunks:
+            yield chunk
+
+    async def close(self):
+        pass
+
+
+def fake_openai_model(
+    completions, model_name_or_path: str = "fake-model", **kwargs
+) -> VLLM:
+    """An OpenAI-compatible model, whose chat completion requests go to `completions.create()`."""
+    model = VLLM(model_name_or_path, **kwargs)
+    model.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return model
+
+
+def names_bsql(
+    model: ModelBase, names: list[str], ingredients: set | None = None
+) -> BlendSQL:
+    """A BlendSQL connection over a single table `w`, with a `name` column holding `names`."""
+    return BlendSQL(
+        {"w": pd.DataFrame({"name": names})},
+        model=model,
+        ingredients=ingredients or {LLMMap},
+    )